@@ -0,0 +1,493 @@
+#!/usr/bin/env python3
+"""Pattoo asyncio HTTP data classes.
+
+Allows a single process to have many posts to the pattoo server in flight at
+the same time on one event loop. Data that cannot be posted is cached exactly
+as in the synchronous pattoo_shared.phttp module so that either module can
+purge it later.
+
+"""
+
+# Standard libraries
+import ssl
+import asyncio
+import weakref
+from urllib.parse import urlsplit
+
+# Pattoo libraries
+from pattoo_shared import log
+from pattoo_shared import codec
+from pattoo_shared import phttp
+from pattoo_shared import converter
+from pattoo_shared.configuration import Config, BaseConfig
+
+# Define global variable for the HTTP transports of each event loop
+TRANSPORTS = weakref.WeakKeyDictionary()
+
+
+class _Connection():
+    """A single keep-alive HTTP/1.1 connection."""
+
+    def __init__(self, reader, writer):
+        """Initialize the class.
+
+        Args:
+            reader: asyncio.StreamReader object
+            writer: asyncio.StreamWriter object
+
+        Returns:
+            None
+
+        """
+        # Initialize key variables
+        self.reader = reader
+        self.writer = writer
+        self.reusable = True
+        self.reused = False
+
+    def close(self):
+        """Close the connection.
+
+        Args:
+            None
+
+        Returns:
+            None
+
+        """
+        # Close
+        self.reusable = False
+        self.writer.close()
+
+
+class AsyncTransport():
+    """Pooled keep-alive HTTP/1.1 client for an asyncio event loop."""
+
+    def __init__(self, concurrency=100, config=None):
+        """Initialize the class.
+
+        Args:
+            concurrency: Maximum number of requests in flight at once
+            config: BaseConfig object. Read from pattoo.yaml if None
+
+        Returns:
+            None
+
+        """
+        # Initialize key variables
+        if config is None:
+            config = BaseConfig()
+        self.concurrency = concurrency
+        self.connect_timeout = config.http_connect_timeout()
+        self.read_timeout = config.http_read_timeout()
+        self.compression = config.http_compression()
+        self.compression_threshold = config.http_compression_threshold()
+        self.compression_level = config.http_compression_level()
+        self.codec = codec.codec(config.http_codec())
+        self.pool_size = config.http_pool_size()
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._idle = {}
+
+    async def post(self, url, body, headers=None):
+        """Post a request body to a URL.
+
+        Args:
+            url: URL to receive posted data
+            body: Bytes to post
+            headers: Dict of additional HTTP headers
+
+        Returns:
+            status: HTTP status code of the response
+
+        """
+        # Initialize key variables
+        parts = urlsplit(url)
+        https = parts.scheme == 'https'
+        port = parts.port if parts.port else (443 if https else 80)
+        key = (parts.hostname, port, https)
+        path = parts.path if bool(parts.path) else '/'
+        if bool(parts.query) is True:
+            path = '{}?{}'.format(path, parts.query)
+
+        # Compress the body if it is large enough to benefit
+        _headers = {
+            'Host': parts.netloc,
+            'Content-Type': 'application/json',
+            'Connection': 'keep-alive'}
+        if self.compression is not None and (
+                len(body) >= self.compression_threshold):
+            (body, encoding) = phttp.compress(
+                body, self.compression, self.compression_level)
+            _headers.update(encoding)
+
+        # Create the request
+        _headers['Content-Length'] = str(len(body))
+        if bool(headers) is True:
+            _headers.update(headers)
+        request = ['POST {} HTTP/1.1'.format(path)]
+        request.extend(
+            ['{}: {}'.format(key_, value) for key_, value in _headers.items()])
+        request = '{}\r\n\r\n'.format('\r\n'.join(request)).encode() + body
+
+        # Send the request over a pooled connection
+        async with self._semaphore:
+            while True:
+                connection = await self._connection(key)
+                try:
+                    connection.writer.write(request)
+                    await asyncio.wait_for(
+                        connection.writer.drain(), self.read_timeout)
+                    status = await asyncio.wait_for(
+                        self._response(connection), self.read_timeout)
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    # The server may have silently closed an idle
+                    # connection. Try again once on a new one.
+                    connection.close()
+                    if connection.reused is True:
+                        continue
+                    raise
+                except:
+                    connection.close()
+                    raise
+                break
+
+            # Keep up to pool_size idle connections for each server
+            idle = self._idle.setdefault(key, [])
+            if connection.reusable is True and len(idle) < self.pool_size:
+                connection.reused = True
+                idle.append(connection)
+            else:
+                connection.close()
+
+        return status
+
+    async def close(self):
+        """Close all pooled connections.
+
+        Args:
+            None
+
+        Returns:
+            None
+
+        """
+        # Close idle connections
+        for connections in self._idle.values():
+            for connection in connections:
+                connection.close()
+        self._idle = {}
+
+    async def _connection(self, key):
+        """Get an idle connection to a server or create a new one.
+
+        Args:
+            key: Tuple of (hostname, port, https)
+
+        Returns:
+            connection: _Connection object
+
+        """
+        # Reuse idle connections that the server hasn't closed
+        connections = self._idle.get(key, [])
+        while bool(connections) is True:
+            connection = connections.pop()
+            if connection.reader.at_eof() is False:
+                return connection
+            connection.close()
+
+        # Create a new connection
+        (hostname, port, https) = key
+        context = ssl.create_default_context() if https is True else None
+        (reader, writer) = await asyncio.wait_for(
+            asyncio.open_connection(hostname, port, ssl=context),
+            self.connect_timeout)
+        connection = _Connection(reader, writer)
+        return connection
+
+    async def _response(self, connection):
+        """Read an HTTP/1.1 response from a connection.
+
+        Args:
+            connection: _Connection object
+
+        Returns:
+            status: HTTP status code of the response
+
+        """
+        # Read the status line and headers
+        reader = connection.reader
+        line = await reader.readline()
+        if bool(line) is False:
+            raise ConnectionError('Connection closed by server')
+        (version, status) = line.decode('latin-1').split()[:2]
+        status = int(status)
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in [b'\r\n', b'\n', b'']:
+                break
+            (name, _, value) = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        # Decide whether the connection can be used again
+        if 'close' in headers.get('connection', '').lower() or (
+                version == 'HTTP/1.0' and 'keep-alive' not in headers.get(
+                    'connection', '').lower()):
+            connection.reusable = False
+
+        # Read the body so the connection is ready for the next request
+        if 'chunked' in headers.get('transfer-encoding', '').lower():
+            while True:
+                size = int((await reader.readline()).split(b';')[0], 16)
+                await reader.readexactly(size + 2)
+                if size == 0:
+                    break
+        elif 'content-length' in headers:
+            await reader.readexactly(int(headers['content-length']))
+        elif status not in [204, 304] and status >= 200:
+            await reader.read()
+            connection.reusable = False
+
+        return status
+
+
+class AsyncPost():
+    """Class to prepare data for posting to remote pattoo server."""
+
+    def __init__(self, identifier, data):
+        """Initialize the class.
+
+        Args:
+            identifier: Agent identifier
+            data: Data from agent
+
+        Returns:
+            None
+
+        """
+        # Initialize key variables
+        self.config = Config()
+        self._data = data
+        self._identifier = identifier
+
+        # URL to post to API server
+        self._url = self.config.agent_api_server_url(identifier)
+
+    async def post(self):
+        """Post data to central server.
+
+        Args:
+            None
+
+        Returns:
+            success: True: if successful
+
+        """
+        # Initialize key variables
+        success = False
+
+        # Post data
+        if bool(self._data) is True:
+            success = await post(self._url, self._data, self._identifier)
+        else:
+            log_message = ('''\
+Blank data. No data to post from identifier {}.'''.format(self._identifier))
+            log.log2warning(1089, log_message)
+
+        return success
+
+    async def purge(self):
+        """Purge data from cache by posting to central server.
+
+        Args:
+            None
+
+        Returns:
+            None
+
+        """
+        # Initialize key variables
+        await purge(self._url, self._identifier)
+
+
+class AsyncPostAgent(AsyncPost):
+    """Class to post AgentPolledData to remote pattoo server."""
+
+    def __init__(self, agentdata):
+        """Initialize the class.
+
+        Args:
+            agentdata: AgentPolledData object
+
+        Returns:
+            None
+
+        """
+        # Get extracted data
+        identifier = agentdata.agent_id
+        _data = converter.agentdata_to_post(agentdata)
+        data = converter.posting_data_points(_data)
+
+        # Log message that ties the identifier to an agent_program
+        phttp._log(agentdata.agent_program, identifier)
+
+        # Don't post if agent data is invalid
+        if agentdata.valid is False:
+            data = None
+
+        # Initialize key variables
+        AsyncPost.__init__(self, identifier, data)
+
+
+def transport():
+    """Get the HTTP transport of the running event loop.
+
+    Args:
+        None
+
+    Returns:
+        result: AsyncTransport object
+
+    """
+    # Create transport if it doesn't already exist
+    loop = asyncio.get_event_loop()
+    result = TRANSPORTS.get(loop)
+    if result is None:
+        result = AsyncTransport()
+        TRANSPORTS[loop] = result
+    return result
+
+
+async def post(url, data, identifier, save=True):
+    """Post data to central server.
+
+    Args:
+        url: URL to receive posted data
+        identifier: Unique identifier for the source of the data. (AgentID)
+        data: Data dict to post
+        save: When True, save data to cache directory if posting fails
+
+    Returns:
+        success: True: if successful
+
+    """
+    # Initialize key variables
+    success = False
+    status = None
+    _breaker = phttp.breaker(url)
+    loop = asyncio.get_event_loop()
+
+    # Fail if nothing to post
+    if isinstance(data, dict) is False or bool(data) is False:
+        return success
+
+    # Cache the data without contacting a server that keeps failing. Data is
+    # saved in the default executor so that other posts aren't blocked while
+    # it is written
+    if _breaker.allow() is False:
+        phttp._skip(url, identifier)
+        if save is True:
+            await loop.run_in_executor(
+                None, phttp._save_data, data, identifier)
+        return success
+
+    # Post data save to cache if this fails
+    try:
+        _transport = transport()
+        status = await _transport.post(
+            url, _transport.codec.encode(data),
+            {'Content-Type': _transport.codec.content_type})
+    except:
+        _breaker.failure()
+        if save is True:
+            # Save data to cache
+            await loop.run_in_executor(
+                None, phttp._save_data, data, identifier)
+
+    # Define success
+    if status is not None:
+        phttp._update(_breaker, status)
+    if status == 200:
+        success = True
+    elif status is not None:
+        log_message = ('''\
+HTTP {} error for identifier "{}" posted to server {}\
+'''.format(status, identifier, url))
+        log.log2warning(1086, log_message)
+        # Save data to cache, remote webserver isn't
+        # working properly
+        if save is True:
+            await loop.run_in_executor(
+                None, phttp._save_data, data, identifier)
+
+    # Log message
+    if success is True:
+        log_message = ('''\
+Data for identifier "{}" posted to server {}\
+'''.format(identifier, url))
+        log.log2debug(1087, log_message)
+    else:
+        log_message = ('''\
+Data for identifier "{}" failed to post to server {}\
+'''.format(identifier, url))
+        log.log2warning(1088, log_message)
+
+    # Return
+    return success
+
+
+async def post_many(posts):
+    """Post many AsyncPost objects concurrently.
+
+    Args:
+        posts: List of AsyncPost objects
+
+    Returns:
+        result: List of post results in the same order as posts
+
+    """
+    # Post
+    result = await asyncio.gather(*[_post.post() for _post in posts])
+    return list(result)
+
+
+async def purge(url, identifier):
+    """Purge data from cache by posting to central server.
+
+    Cached data of an identifier is posted one record after another, oldest
+    first, to preserve its order. Purges of different identifiers run
+    concurrently.
+
+    Args:
+        url: URL to receive posted data
+        identifier: Unique identifier for the source of the data. (AgentID)
+
+    Returns:
+        None
+
+    """
+    # Don't read the cache while the server keeps failing
+    if phttp.breaker(url).blocked() is True:
+        return
+
+    # Read cached data. Files are read in the default executor so that
+    # other posts aren't blocked while they are read
+    loop = asyncio.get_event_loop()
+    files = phttp._read_cached(identifier)
+    try:
+        while True:
+            cached = await loop.run_in_executor(None, next, files, None)
+            if cached is None:
+                break
+            (entry, data, _) = cached
+            if data is None:
+                continue
+
+            # Stop at the first failure to keep the remaining data in order
+            success = await post(url, data, identifier, save=False)
+            if success is False:
+                break
+            await loop.run_in_executor(
+                None, phttp._remove_cached, [entry], url)
+    finally:
+        files.close()
@@ -0,0 +1,939 @@
+#!/usr/bin/env python3
+"""Pattoo agent cache library.
+
+Data that could not be posted is appended to a spool of segment files in
+each agent cache directory. Cache files of older versions, one JSON file per
+failed post, are kept in an index so that they can be found without listing
+the directory.
+
+"""
+
+# Standard libraries
+import os
+import zlib
+import fcntl
+import struct
+import threading
+import collections
+
+# Pattoo libraries
+from pattoo_shared import log
+from pattoo_shared import codec
+from pattoo_shared import converter
+
+# Define global variables for the manifests and spools of each cache directory
+MANIFESTS = {}
+SPOOLS = {}
+_LOCK = threading.Lock()
+
+# Spool records start with the length and CRC32 of the JSON data
+_HEADER = struct.Struct('>II')
+
+# Position of the end of a spool record. The inode identifies the segment
+# file the record was read from
+Position = collections.namedtuple(
+    'Position', 'directory sequence offset inode')
+
+
+class Manifest():
+    """Append-only index of the cache files of an agent cache directory.
+
+    Each line of the manifest file is a filename prefixed with '+' when the
+    file is added, or '-' when it is removed. The manifest is rewritten
+    without the removed files once they make up most of it.
+
+    """
+
+    def __init__(self, cache_dir):
+        """Initialize the class.
+
+        Args:
+            cache_dir: Agent cache directory
+
+        Returns:
+            None
+
+        """
+        # Initialize key variables
+        self.cache_dir = cache_dir
+        self.filepath = os.path.join(cache_dir, '.manifest')
+        self._lockfile = os.path.join(cache_dir, '.manifest.lock')
+        self._entries = {}
+        self._removed = 0
+        self._inode = None
+        self._offset = 0
+        self._lock = threading.Lock()
+
+    def add(self, filename):
+        """Add a cache file to the manifest.
+
+        Files must be complete before they are added so that readers of the
+        manifest never see partially written files.
+
+        Args:
+            filename: Name of the cache file without the directory
+
+        Returns:
+            None
+
+        """
+        # Add
+        self._append(['+{}'.format(filename)])
+
+    def remove(self, filenames):
+        """Remove cache files from the manifest.
+
+        Args:
+            filenames: List of names of cache files without the directory
+
+        Returns:
+            None
+
+        """
+        # Remove
+        if bool(filenames) is True:
+            self._append(['-{}'.format(_) for _ in filenames])
+
+    def filenames(self):
+        """Get the names of the cache files in the manifest.
+
+        Only lines added since the last call are read from the manifest file.
+
+        Args:
+            None
+
+        Returns:
+            result: Sorted list of names of cache files. The timestamp
+                prefix of the names makes this oldest first
+
+        """
+        # Read new entries
+        with self._lock, _FileLock(self._lockfile):
+            if os.path.isfile(self.filepath) is False:
+                self._rebuild()
+            self._read()
+            result = sorted(self._entries)
+
+            # Drop removed files from the manifest file
+            if self._removed > max(len(self._entries), 1000):
+                self._compact()
+        return result
+
+    def _append(self, lines):
+        """Append lines to the manifest file.
+
+        Args:
+            lines: List of lines to append
+
+        Returns:
+            None
+
+        """
+        # Create the manifest from the directory contents if it is missing
+        with self._lock, _FileLock(self._lockfile):
+            if os.path.isfile(self.filepath) is False:
+                self._rebuild()
+            with open(self.filepath, 'a') as f_handle:
+                f_handle.write(''.join(['{}\n'.format(_) for _ in lines]))
+
+    def _read(self):
+        """Read lines added to the manifest file since the last read.
+
+        Args:
+            None
+
+        Returns:
+            None
+
+        """
+        with open(self.filepath, 'rb') as f_handle:
+            # Start again if the manifest was rewritten by another process
+            inode = os.fstat(f_handle.fileno()).st_ino
+            if inode != self._inode:
+                self._inode = inode
+                self._offset = 0
+                self._entries = {}
+                self._removed = 0
+
+            # Update the entries. Incomplete lines are read next time
+            f_handle.seek(self._offset)
+            for line in f_handle:
+                if line.endswith(b'\n') is False:
+                    break
+                self._offset += len(line)
+                filename = line[1:-1].decode()
+                if line.startswith(b'+') is True:
+                    self._entries[filename] = None
+                elif line.startswith(b'-') is True:
+                    self._entries.pop(filename, None)
+                    self._removed += 1
+
+    def _rebuild(self):
+        """Create the manifest file from the files in the cache directory.
+
+        This is only needed for cache directories created before manifests
+        were used.
+
+        Args:
+            None
+
+        Returns:
+            None
+
+        """
+        # Add the existing cache files
+        filenames = sorted([
+            filename for filename in os.listdir(self.cache_dir) if (
+                filename.endswith('.json') and os.path.isfile(
+                    os.path.join(self.cache_dir, filename)))])
+        _replace(
+            self.filepath, ['+{}'.format(_) for _ in filenames])
+
+    def _compact(self):
+        """Rewrite the manifest file without the removed files.
+
+        Args:
+            None
+
+        Returns:
+            None
+
+        """
+        # Rewrite
+        _replace(
+            self.filepath, ['+{}'.format(_) for _ in sorted(self._entries)])
+        self._inode = os.stat(self.filepath).st_ino
+        self._offset = os.path.getsize(self.filepath)
+        self._removed = 0
+
+
+class Spool():
+    """Append-only log of data that could not be posted.
+
+    Data is appended as records to numbered segment files in the spool
+    directory. A new segment is started when the current one is full. Records
+    are read from the position saved in a checkpoint file, and segments are
+    deleted once all their records have been read and committed.
+
+    The number and size of the records that haven't been committed are kept
+    in a totals file so that the spool can be kept within its budget without
+    reading the segments. When the budget is exceeded room is made using one
+    of these policies:
+
+        drop_oldest: Discard the oldest records
+        drop_newest: Discard the record being appended
+        downsample: Discard every other record, oldest segment first
+
+    """
+
+    def __init__(self, cache_dir, segment_bytes=16777216, max_bytes=0,
+                 max_records=0, policy='drop_oldest', codec_='json'):
+        """Initialize the class.
+
+        Args:
+            cache_dir: Agent cache directory
+            segment_bytes: Size in bytes at which a new segment is started
+            max_bytes: Maximum size in bytes of the records. 0 if unlimited
+            max_records: Maximum number of records. 0 if unlimited
+            policy: Eviction policy used when the budget is exceeded
+            codec_: Name of the codec used to encode appended data. Records
+                encoded by any codec can be read
+
+        Returns:
+            None
+
+        """
+        # Initialize key variables
+        self.directory = os.path.join(cache_dir, 'spool')
+        self.segment_bytes = segment_bytes
+        self.max_bytes = max_bytes
+        self.max_records = max_records
+        self.policy = policy
+        self.codec = codec_
+        self.evicted_records = 0
+        self.evicted_bytes = 0
+        self._lockfile = os.path.join(self.directory, '.lock')
+        self._checkpoint = os.path.join(self.directory, 'checkpoint')
+        self._totals = os.path.join(self.directory, 'totals')
+        self._sequence = None
+        self._lock = threading.Lock()
+
+        # Create directory if it doesn't exist
+        os.makedirs(self.directory, exist_ok=True)
+
+    def append(self, data):
+        """Append data to the spool.
+
+        Args:
+            data: Dict to append, or bytes of JSON to append unchanged
+
+        Returns:
+            result: True if the data was appended. False if it was discarded
+                to keep the spool within its budget
+
+        """
+        # Create the record without joining its chunks into a single copy
+        if isinstance(data, bytes) is True:
+            chunks = [data]
+        elif self.codec == 'json':
+            chunks = list(converter.iterencode(data))
+        else:
+            chunks = [codec.codec(self.codec).encode(data)]
+        (length, crc) = (0, 0)
+        for chunk in chunks:
+            length += len(chunk)
+            crc = zlib.crc32(chunk, crc)
+        header = _HEADER.pack(length, crc)
+        _size = len(header) + length
+
+        with self._lock, _FileLock(self._lockfile):
+            # Make room for the record
+            (records, size) = self._read_totals()
+            if self._fits(records + 1, size + _size) is False:
+                if self._evict(records + 1, size + _size, _size) is False:
+                    return False
+                (records, size) = self._read_totals()
+
+            # Start a new segment if the current one is full, or another
+            # process may have left an incomplete record at its end
+            sequences = self._sequences()
+            if bool(sequences) is False:
+                sequence = self._read_checkpoint()[0] + 1
+            else:
+                sequence = sequences[-1]
+                filepath = self._filepath(sequence)
+                filesize = os.path.getsize(filepath)
+                if filesize >= self.segment_bytes:
+                    sequence += 1
+                elif sequence != self._sequence and (
+                        _records_end(filepath) != filesize):
+                    sequence += 1
+            self._sequence = sequence
+
+            # Append. Remove the incomplete record if this fails to protect
+            # against full file systems
+            filepath = self._filepath(sequence)
+            with open(filepath, 'ab') as f_handle:
+                offset = f_handle.tell()
+                try:
+                    f_handle.write(header)
+                    for chunk in chunks:
+                        f_handle.write(chunk)
+                    f_handle.flush()
+                except:
+                    f_handle.truncate(offset)
+                    log_message = ('''\
+Removing incomplete record from cache spool segment {}.\
+'''.format(filepath))
+                    log.log2warning(1037, log_message)
+                    raise
+            self._write_totals(records + 1, size + _size)
+        return True
+
+    def read(self):
+        """Read the records after the checkpoint, oldest first.
+
+        Args:
+            None
+
+        Returns:
+            None
+
+        Yields:
+            result: Tuple of (Position, data, size in bytes). data is None if
+                the record was corrupted
+
+        """
+        # Initialize key variables
+        (sequence, offset) = self._read_checkpoint()
+        sequences = [_ for _ in self._sequences() if _ >= sequence]
+
+        for sequence_ in sequences:
+            start = offset if sequence_ == sequence else 0
+            filepath = self._filepath(sequence_)
+            try:
+                f_handle = open(filepath, 'rb')
+            except FileNotFoundError:
+                # Deleted by another process purging the spool
+                continue
+
+            # Return the records
+            with f_handle:
+                inode = os.fstat(f_handle.fileno()).st_ino
+                for (end, record) in _records(
+                        f_handle, start, sequence_ == sequences[-1]):
+                    try:
+                        data = codec.decode(record[_HEADER.size:])
+                    except:
+                        data = None
+                    yield (
+                        Position(self.directory, sequence_, end, inode),
+                        data, len(record))
+
+    def commit(self, position):
+        """Save the position of the last record that was successfully posted.
+
+        Segments with no more records to read are deleted. The newest segment
+        is kept as data may still be appended to it.
+
+        Args:
+            position: Position of the end of the record
+
+        Returns:
+            None
+
+        """
+        # Ignore positions that were already passed, or that are in segments
+        # rewritten by downsampling after they were read
+        with self._lock, _FileLock(self._lockfile):
+            if (position.sequence, position.offset) <= (
+                    self._read_checkpoint()):
+                return
+            filepath = self._filepath(position.sequence)
+            try:
+                if os.stat(filepath).st_ino != position.inode:
+                    return
+            except FileNotFoundError:
+                pass
+
+            # Save the checkpoint
+            self._advance(position.sequence, position.offset)
+
+    def pending(self):
+        """Get the number and size of the records that haven't been posted.
+
+        Args:
+            None
+
+        Returns:
+            result: Tuple of (records, size in bytes)
+
+        """
+        # Read
+        with self._lock, _FileLock(self._lockfile):
+            result = self._read_totals()
+        return result
+
+    def _fits(self, records, size):
+        """Determine whether records fit within the budget of the spool.
+
+        Args:
+            records: Number of records
+            size: Size in bytes of the records
+
+        Returns:
+            result: True if the records fit
+
+        """
+        # Check
+        result = (
+            (bool(self.max_records) is False or records <= self.max_records)
+            and (bool(self.max_bytes) is False or size <= self.max_bytes))
+        return result
+
+    def _evict(self, records, size, record_size):
+        """Make room for a record by discarding data.
+
+        Args:
+            records: Number of records including the new one
+            size: Size in bytes of the records including the new one
+            record_size: Size in bytes of the new record
+
+        Returns:
+            result: True if the new record can be appended
+
+        """
+        # Initialize key variables
+        result = True
+        evicted = (0, 0)
+
+        # Discard every other record, oldest first
+        if self.policy == 'downsample':
+            for sequence in self._sequences():
+                if self._fits(records, size) is True:
+                    break
+                (count, nbytes) = self._downsample(sequence)
+                (records, size) = (records - count, size - nbytes)
+                evicted = (evicted[0] + count, evicted[1] + nbytes)
+
+        # Discard the oldest records
+        if self.policy != 'drop_newest' and (
+                self._fits(records, size) is False):
+            (count, nbytes) = self._drop_oldest(records, size)
+            (records, size) = (records - count, size - nbytes)
+            evicted = (evicted[0] + count, evicted[1] + nbytes)
+
+        # Discard the new record if there still isn't room
+        if self._fits(records, size) is False:
+            evicted = (evicted[0] + 1, evicted[1] + record_size)
+            (records, size) = (records - 1, size - record_size)
+            result = False
+
+        # Log
+        self.evicted_records += evicted[0]
+        self.evicted_bytes += evicted[1]
+        log_message = ('''\
+Evicted {} records ({} bytes) from cache spool {} using the {} policy. {} \
+records ({} bytes) remain. {} records ({} bytes) evicted since startup.\
+'''.format(evicted[0], evicted[1], self.directory, self.policy, records, size,
+           self.evicted_records, self.evicted_bytes))
+        log.log2warning(1110, log_message)
+        return result
+
+    def _drop_oldest(self, records, size):
+        """Discard the oldest records until the rest fit within the budget.
+
+        Args:
+            records: Number of records including the new one
+            size: Size in bytes of the records including the new one
+
+        Returns:
+            result: Tuple of (records, size in bytes) discarded
+
+        """
+        # Initialize key variables
+        (count, nbytes) = (0, 0)
+        position = None
+        (sequence, offset) = self._read_checkpoint()
+
+        # Find the position of the first record to keep
+        for sequence_ in self._sequences():
+            if sequence_ < sequence:
+                continue
+            start = offset if sequence_ == sequence else 0
+            with open(self._filepath(sequence_), 'rb') as f_handle:
+                for (end, record_size) in _record_ends(f_handle, start):
+                    if self._fits(records - count, size - nbytes) is True:
+                        break
+                    count += 1
+                    nbytes += record_size
+                    position = (sequence_, end)
+            if self._fits(records - count, size - nbytes) is True:
+                break
+
+        # Discard the records
+        if position is not None:
+            self._advance(*position)
+        return (count, nbytes)
+
+    def _downsample(self, sequence):
+        """Discard every other record of a segment after the checkpoint.
+
+        Args:
+            sequence: Sequence number of the segment
+
+        Returns:
+            result: Tuple of (records, size in bytes) discarded
+
+        """
+        # Initialize key variables
+        (count, nbytes) = (0, 0)
+        kept = []
+        checkpoint = self._read_checkpoint()
+        if sequence < checkpoint[0]:
+            return (count, nbytes)
+        start = checkpoint[1] if sequence == checkpoint[0] else 0
+        filepath = self._filepath(sequence)
+
+        # Keep the first record and every other one after it
+        with open(filepath, 'rb') as f_handle:
+            for (index, (_, record)) in enumerate(_records(
+                    f_handle, start, sequence == self._sequences()[-1])):
+                if index % 2 == 0:
+                    kept.append(record)
+                else:
+                    count += 1
+                    nbytes += len(record)
+        if bool(count) is False:
+            return (count, nbytes)
+
+        # Rewrite the segment. The posted records before the checkpoint are
+        # no longer needed
+        temp_filepath = '{}.tmp'.format(filepath)
+        with open(temp_filepath, 'wb') as f_handle:
+            f_handle.write(b''.join(kept))
+        os.replace(temp_filepath, filepath)
+        if sequence == checkpoint[0]:
+            self._write_checkpoint(sequence, 0)
+        (records, size) = self._read_totals()
+        self._write_totals(records - count, size - nbytes)
+        return (count, nbytes)
+
+    def _advance(self, sequence, offset):
+        """Move the checkpoint forward, deleting the segments that were read.
+
+        Args:
+            sequence: Sequence number of the segment of the new checkpoint
+            offset: Offset of the new checkpoint in the segment
+
+        Returns:
+            None
+
+        """
+        # Initialize key variables
+        (count, nbytes) = (0, 0)
+        checkpoint = self._read_checkpoint()
+        sequences = self._sequences()
+
+        # Count the records being passed
+        for sequence_ in sequences:
+            if sequence_ < checkpoint[0] or sequence_ > sequence:
+                continue
+            start = checkpoint[1] if sequence_ == checkpoint[0] else 0
+            with open(self._filepath(sequence_), 'rb') as f_handle:
+                for (end, record_size) in _record_ends(f_handle, start):
+                    if sequence_ == sequence and end > offset:
+                        break
+                    count += 1
+                    nbytes += record_size
+
+        # Save the checkpoint and totals
+        self._write_checkpoint(sequence, offset)
+        (records, size) = self._read_totals()
+        self._write_totals(records - count, size - nbytes)
+
+        # Delete the segments that were read
+        for sequence_ in sequences[:-1]:
+            filepath = self._filepath(sequence_)
+            if sequence_ < sequence or (
+                    sequence_ == sequence and
+                    offset >= os.path.getsize(filepath)):
+                os.remove(filepath)
+
+    def _filepath(self, sequence):
+        """Get the name of a segment file.
+
+        Args:
+            sequence: Sequence number of the segment
+
+        Returns:
+            result: Segment filepath
+
+        """
+        # Zero padding makes the filenames sort in sequence order
+        result = os.path.join(
+            self.directory, '{:020d}.seg'.format(sequence))
+        return result
+
+    def _sequences(self):
+        """Get the sequence numbers of the segments in the spool.
+
+        Args:
+            None
+
+        Returns:
+            result: Sorted list of sequence numbers
+
+        """
+        # Get sequence numbers
+        result = sorted([
+            int(filename[:-4]) for filename in os.listdir(
+                self.directory) if filename.endswith('.seg')])
+        return result
+
+    def _read_checkpoint(self):
+        """Read the checkpoint file.
+
+        Args:
+            None
+
+        Returns:
+            result: Tuple of (segment sequence number, offset) of the first
+                record that hasn't been posted
+
+        """
+        # Read
+        try:
+            with open(self._checkpoint, 'r') as f_handle:
+                (sequence, offset) = f_handle.read().split()
+            result = (int(sequence), int(offset))
+        except:
+            result = (0, 0)
+        return result
+
+    def _write_checkpoint(self, sequence, offset):
+        """Write the checkpoint file.
+
+        Args:
+            sequence: Segment sequence number
+            offset: Offset of the first record that hasn't been posted
+
+        Returns:
+            None
+
+        """
+        # Write
+        _replace(
+            self._checkpoint, ['{} {}'.format(sequence, offset)], sync=False)
+
+    def _read_totals(self):
+        """Read the totals file.
+
+        The totals are calculated from the segments if the file is missing.
+
+        Args:
+            None
+
+        Returns:
+            result: Tuple of (records, size in bytes) that haven't been posted
+
+        """
+        # Read
+        try:
+            with open(self._totals, 'r') as f_handle:
+                (records, size) = f_handle.read().split()
+            return (int(records), int(size))
+        except:
+            pass
+
+        # Count the records after the checkpoint
+        (records, size) = (0, 0)
+        (sequence, offset) = self._read_checkpoint()
+        for sequence_ in self._sequences():
+            if sequence_ < sequence:
+                continue
+            start = offset if sequence_ == sequence else 0
+            with open(self._filepath(sequence_), 'rb') as f_handle:
+                for (_, record_size) in _record_ends(f_handle, start):
+                    records += 1
+                    size += record_size
+        self._write_totals(records, size)
+        return (records, size)
+
+    def _write_totals(self, records, size):
+        """Write the totals file.
+
+        Args:
+            records: Number of records that haven't been posted
+            size: Size in bytes of the records that haven't been posted
+
+        Returns:
+            None
+
+        """
+        # Write
+        _replace(
+            self._totals,
+            ['{} {}'.format(max(0, records), max(0, size))], sync=False)
+
+
+class _FileLock():
+    """Exclusive lock on a file shared by all processes."""
+
+    def __init__(self, filepath):
+        """Initialize the class.
+
+        Args:
+            filepath: Lock file. Created if it doesn't exist
+
+        Returns:
+            None
+
+        """
+        # Initialize key variables
+        self.filepath = filepath
+        self._f_handle = None
+
+    def __enter__(self):
+        """Acquire the lock.
+
+        Args:
+            None
+
+        Returns:
+            None
+
+        """
+        self._f_handle = open(self.filepath, 'a')
+        fcntl.flock(self._f_handle.fileno(), fcntl.LOCK_EX)
+
+    def __exit__(self, *args):
+        """Release the lock.
+
+        Args:
+            args: Exception details
+
+        Returns:
+            None
+
+        """
+        fcntl.flock(self._f_handle.fileno(), fcntl.LOCK_UN)
+        self._f_handle.close()
+
+
+def manifest(cache_dir):
+    """Get the manifest of a cache directory.
+
+    Args:
+        cache_dir: Agent cache directory
+
+    Returns:
+        result: Manifest object
+
+    """
+    # Create manifest if it doesn't already exist
+    with _LOCK:
+        result = MANIFESTS.get(cache_dir)
+        if result is None:
+            result = Manifest(cache_dir)
+            MANIFESTS[cache_dir] = result
+    return result
+
+
+def spool(cache_dir, config=None):
+    """Get the spool of a cache directory.
+
+    Args:
+        cache_dir: Agent cache directory
+        config: BaseConfig object with the segment size and budget of the
+            spool. Unchanged if None
+
+    Returns:
+        result: Spool object
+
+    """
+    # Create spool if it doesn't already exist
+    with _LOCK:
+        result = SPOOLS.get(cache_dir)
+        if result is None:
+            result = Spool(cache_dir)
+            SPOOLS[cache_dir] = result
+
+    # Apply the configuration
+    if config is not None:
+        result.segment_bytes = config.cache_segment_bytes()
+        result.max_bytes = config.cache_max_bytes()
+        result.max_records = config.cache_max_records()
+        result.policy = config.cache_eviction_policy()
+        result.codec = config.cache_codec()
+    return result
+
+
+def _records(f_handle, offset, last):
+    """Read the records of a segment.
+
+    Reading stops at the first incomplete or corrupted record. An incomplete
+    record at the end of the newest segment is still being written, so it
+    isn't logged as corrupted.
+
+    Args:
+        f_handle: Segment file handle opened in binary mode
+        offset: Offset of the first record to read
+        last: True if this is the newest segment
+
+    Returns:
+        None
+
+    Yields:
+        result: Tuple of (offset of the end of the record, record bytes)
+
+    """
+    # Read
+    f_handle.seek(offset)
+    while True:
+        header = f_handle.read(_HEADER.size)
+        if bool(header) is False:
+            break
+        complete = len(header) == _HEADER.size
+        if complete is True:
+            (length, crc) = _HEADER.unpack(header)
+            payload = f_handle.read(length)
+            complete = len(payload) == length
+
+        # Stop at incomplete or corrupted records
+        if complete is False:
+            if last is False:
+                _corrupted(f_handle.name, offset)
+            break
+        if zlib.crc32(payload) != crc:
+            _corrupted(f_handle.name, offset)
+            break
+
+        # Return the record
+        offset += _HEADER.size + length
+        yield (offset, header + payload)
+
+
+def _record_ends(f_handle, offset):
+    """Find the complete records of a segment by only reading their headers.
+
+    Args:
+        f_handle: Segment file handle opened in binary mode
+        offset: Offset of the first record
+
+    Returns:
+        None
+
+    Yields:
+        result: Tuple of (offset of the end of the record, record size)
+
+    """
+    # Skip from header to header
+    size = os.fstat(f_handle.fileno()).st_size
+    while offset + _HEADER.size <= size:
+        f_handle.seek(offset)
+        (length, _) = _HEADER.unpack(f_handle.read(_HEADER.size))
+        if offset + _HEADER.size + length > size:
+            break
+        offset += _HEADER.size + length
+        yield (offset, _HEADER.size + length)
+
+
+def _records_end(filepath):
+    """Get the position of the end of the last complete record of a segment.
+
+    Args:
+        filepath: Segment file
+
+    Returns:
+        result: Offset in bytes
+
+    """
+    # Initialize key variables
+    result = 0
+
+    # Skip from header to header
+    with open(filepath, 'rb') as f_handle:
+        for (result, _) in _record_ends(f_handle, 0):
+            pass
+    return result
+
+
+def _corrupted(filepath, offset):
+    """Log a corrupted spool segment.
+
+    Args:
+        filepath: Segment file
+        offset: Offset of the corrupted record
+
+    Returns:
+        None
+
+    """
+    # Log
+    log_message = ('''\
+Corrupted record at offset {} of cache spool segment {}. Skipping the rest \
+of the segment.'''.format(offset, filepath))
+    log.log2warning(1108, log_message)
+
+
+def _replace(filepath, lines, sync=True):
+    """Atomically replace the contents of a file.
+
+    Args:
+        filepath: File to replace
+        lines: List of lines to write
+        sync: Flush the file to disk before replacing it if True
+
+    Returns:
+        None
+
+    """
+    # Write a temporary file then rename it
+    temp_filepath = '{}.tmp'.format(filepath)
+    with open(temp_filepath, 'w') as f_handle:
+        f_handle.write(''.join(['{}\n'.format(_) for _ in lines]))
+        if sync is True:
+            f_handle.flush()
+            os.fsync(f_handle.fileno())
+    os.replace(temp_filepath, filepath)
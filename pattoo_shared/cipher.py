@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""Pattoo symmetric ciphers.
+
+Encrypted posts are symmetrically encrypted with the key negotiated during
+the key exchange. By default GnuPG is used, which starts a gpg process for
+every message. The AES-GCM cipher encrypts in-process instead. It requires
+the optional 'cryptography' package.
+
+The 256 bit AES key is derived from the negotiated key with PBKDF2. Each
+message is encrypted with a new random nonce, and is authenticated by the
+GCM tag. Messages are ASCII strings that start with PREFIX so that
+Pgpier.symmetric_decrypt() can tell the formats apart. GnuPG is still used
+for the key exchange.
+
+"""
+
+# Standard libraries
+import os
+import base64
+import binascii
+import hashlib
+import functools
+
+# pip3 libraries
+try:
+    from cryptography.exceptions import InvalidTag
+    from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+except ImportError:
+    AESGCM = None
+
+# Prefix of AES-GCM messages. ASCII armored GnuPG messages start with '-'
+PREFIX = 'pattoo-aesgcm1:'
+
+# Key derivation parameters
+_SALT = b'pattoo-aesgcm'
+_ITERATIONS = 10000
+_NONCE_BYTES = 12
+
+
+class GnuPGCipher():
+    """Encrypt and decrypt data with GnuPG."""
+
+    name = 'gnupg'
+
+    def __init__(self, gpg):
+        """Initialize the class.
+
+        Args:
+            gpg: Pgpier object
+
+        Returns:
+            None
+
+        """
+        # Initialize key variables
+        self._gpg = gpg
+
+    def encrypt(self, data, symmetric_key):
+        """Encrypt data.
+
+        Args:
+            data: String to encrypt
+            symmetric_key: Symmetric key string
+
+        Returns:
+            result: ASCII armored string
+
+        """
+        # Encrypt
+        result = self._gpg.symmetric_encrypt(data, symmetric_key)
+        return result
+
+    def decrypt(self, data, symmetric_key):
+        """Decrypt data.
+
+        Args:
+            data: String created by encrypt
+            symmetric_key: Symmetric key string
+
+        Returns:
+            result: Decrypted string
+
+        """
+        # Decrypt
+        result = self._gpg.symmetric_decrypt(data, symmetric_key)
+        return result
+
+
+class AESGCMCipher():
+    """Encrypt and decrypt data in-process with AES-GCM."""
+
+    name = 'aesgcm'
+
+    def encrypt(self, data, symmetric_key):
+        """Encrypt data.
+
+        Args:
+            data: String to encrypt
+            symmetric_key: Symmetric key string
+
+        Returns:
+            result: ASCII string starting with PREFIX
+
+        """
+        # Encrypt
+        aesgcm = _aesgcm(symmetric_key)
+        nonce = os.urandom(_NONCE_BYTES)
+        encrypted = aesgcm.encrypt(nonce, data.encode(), None)
+        result = '{}{}'.format(
+            PREFIX, base64.b64encode(nonce + encrypted).decode())
+        return result
+
+    def decrypt(self, data, symmetric_key):
+        """Decrypt data.
+
+        Args:
+            data: String created by encrypt
+            symmetric_key: Symmetric key string
+
+        Returns:
+            result: Decrypted string
+
+        """
+        # Check the format
+        if data.startswith(PREFIX) is False:
+            raise ValueError('Data is not in the pattoo AES-GCM format')
+
+        # Decrypt
+        aesgcm = _aesgcm(symmetric_key)
+        try:
+            body = base64.b64decode(data[len(PREFIX):], validate=True)
+            result = aesgcm.decrypt(
+                body[:_NONCE_BYTES], body[_NONCE_BYTES:], None).decode()
+        except (binascii.Error, InvalidTag, UnicodeDecodeError):
+            raise ValueError('Data in the pattoo AES-GCM format is corrupted')
+        return result
+
+
+def available():
+    """Determine whether the AES-GCM cipher can be used.
+
+    Args:
+        None
+
+    Returns:
+        result: True if the 'cryptography' package is installed
+
+    """
+    # Test
+    result = AESGCM is not None
+    return result
+
+
+def cipher(name, gpg):
+    """Get a cipher.
+
+    Args:
+        name: Name of the cipher. Either 'gnupg' or 'aesgcm'
+        gpg: Pgpier object
+
+    Returns:
+        result: Cipher object. GnuPGCipher if the name is unknown, or if
+            the AES-GCM cipher isn't available
+
+    """
+    # Get cipher
+    if name == AESGCMCipher.name and available() is True:
+        result = AESGCMCipher()
+    else:
+        result = GnuPGCipher(gpg)
+    return result
+
+
+@functools.lru_cache(maxsize=1024)
+def _aesgcm(symmetric_key):
+    """Get the AES-GCM object of a symmetric key.
+
+    The AES key is derived once for each symmetric key.
+
+    Args:
+        symmetric_key: Symmetric key string
+
+    Returns:
+        result: AESGCM object
+
+    """
+    # The optional package is required
+    if available() is False:
+        raise RuntimeError(
+            'The "cryptography" package is required for AES-GCM')
+
+    # Derive the key
+    key = hashlib.pbkdf2_hmac(
+        'sha256', symmetric_key.encode(), _SALT, _ITERATIONS)
+    result = AESGCM(key)
+    return result
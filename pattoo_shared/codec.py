@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+"""Pattoo serialization codecs.
+
+Data is posted and cached as JSON by default. The binary codec is a compact
+alternative. Integers and the integer IDs of key-value pairs are stored as
+variable length integers, floats as 8 bytes, and strings are length-prefixed
+and only stored once per message. Binary data starts with MAGIC so that
+decode() can tell the formats apart.
+
+The binary codec trades CPU for bandwidth and disk space. It is written in
+pure Python, so encoding and decoding it is slower than the C json module.
+Only use it when the size of the payload matters more than the CPU used to
+serialize it.
+
+Both codecs decode to the same values, which are those of the data after a
+round trip through JSON. Tuples become lists, and dict keys become strings.
+
+"""
+
+# Standard libraries
+import json
+import struct
+
+# Prefix of binary data. JSON never starts with a null byte
+MAGIC = b'\x00PTB\x01'
+
+# Type tags of values in binary data
+_NONE = 0
+_FALSE = 1
+_TRUE = 2
+_INT = 3
+_NEGATIVE_INT = 4
+_FLOAT = 5
+_STRING = 6
+_STRING_REFERENCE = 7
+_LIST = 8
+_DICT = 9
+_INT_KEY = 10
+
+_DOUBLE = struct.Struct('>d')
+
+
+class JSONCodec():
+    """Encode and decode data as JSON."""
+
+    name = 'json'
+    content_type = 'application/json'
+
+    def encode(self, _data):
+        """Encode data.
+
+        Args:
+            _data: JSON serializable data
+
+        Returns:
+            result: Bytes
+
+        """
+        # Encode
+        result = json.dumps(_data).encode()
+        return result
+
+    def decode(self, body):
+        """Decode data.
+
+        Args:
+            body: Bytes created by encode
+
+        Returns:
+            result: Decoded data
+
+        """
+        # Decode
+        result = json.loads(body.decode())
+        return result
+
+
+class BinaryCodec():
+    """Encode and decode data in the compact binary format."""
+
+    name = 'binary'
+    content_type = 'application/x-pattoo-binary'
+
+    def encode(self, _data):
+        """Encode data.
+
+        Args:
+            _data: JSON serializable data
+
+        Returns:
+            result: Bytes starting with MAGIC
+
+        """
+        # Encode
+        buffer = bytearray(MAGIC)
+        _pack(_data, buffer, {})
+        result = bytes(buffer)
+        return result
+
+    def decode(self, body):
+        """Decode data.
+
+        Args:
+            body: Bytes created by encode
+
+        Returns:
+            result: Decoded data
+
+        """
+        # Check the format
+        if body[:len(MAGIC)] != MAGIC:
+            raise ValueError('Data is not in the pattoo binary format')
+
+        # Decode
+        try:
+            (result, offset) = _unpack(body, len(MAGIC), [])
+        except (
+                IndexError, KeyError, TypeError, struct.error,
+                UnicodeDecodeError):
+            raise ValueError('Data in the pattoo binary format is corrupted')
+        if offset != len(body):
+            raise ValueError('Data in the pattoo binary format is corrupted')
+        return result
+
+
+# Define global variable for the codec of each name
+CODECS = {JSONCodec.name: JSONCodec(), BinaryCodec.name: BinaryCodec()}
+
+
+def codec(name):
+    """Get a codec.
+
+    Args:
+        name: Name of the codec. Either 'json' or 'binary'
+
+    Returns:
+        result: Codec object. JSONCodec if the name is unknown
+
+    """
+    # Get codec
+    result = CODECS.get(name, CODECS[JSONCodec.name])
+    return result
+
+
+def decode(body):
+    """Decode data created by any codec.
+
+    Args:
+        body: Bytes
+
+    Returns:
+        result: Decoded data
+
+    """
+    # Detect the format
+    if bytes(body[:len(MAGIC)]) == MAGIC:
+        result = CODECS[BinaryCodec.name].decode(body)
+    else:
+        result = CODECS[JSONCodec.name].decode(body)
+    return result
+
+
+def _pack(value, buffer, strings):
+    """Append a value to binary data.
+
+    Args:
+        value: Value to append
+        buffer: bytearray of binary data
+        strings: Dict of the indexes of strings already in the binary data
+
+    Returns:
+        None
+
+    """
+    # Append
+    if value is None:
+        buffer.append(_NONE)
+    elif value is True:
+        buffer.append(_TRUE)
+    elif value is False:
+        buffer.append(_FALSE)
+    elif isinstance(value, int) is True:
+        if value >= 0:
+            buffer.append(_INT)
+            _varint(value, buffer)
+        else:
+            buffer.append(_NEGATIVE_INT)
+            _varint(-value - 1, buffer)
+    elif isinstance(value, float) is True:
+        buffer.append(_FLOAT)
+        buffer.extend(_DOUBLE.pack(value))
+    elif isinstance(value, str) is True:
+        _pack_string(value, buffer, strings)
+    elif isinstance(value, (list, tuple)) is True:
+        buffer.append(_LIST)
+        _varint(len(value), buffer)
+        for item in value:
+            _pack(item, buffer, strings)
+    elif isinstance(value, dict) is True:
+        buffer.append(_DICT)
+        _varint(len(value), buffer)
+        for key, item in value.items():
+            # JSON keys are strings. Convert others just like json.dumps
+            if isinstance(key, str) is True:
+                _pack_string(key, buffer, strings)
+            elif isinstance(key, int) is True and (
+                    isinstance(key, bool) is False and key >= 0):
+                buffer.append(_INT_KEY)
+                _varint(key, buffer)
+            elif isinstance(key, (int, float)) is True or key is None:
+                _pack_string(json.dumps(key), buffer, strings)
+            else:
+                raise TypeError(
+                    'Keys must be str, int, float, bool or None, not {}'
+                    ''.format(type(key).__name__))
+            _pack(item, buffer, strings)
+    else:
+        raise TypeError(
+            'Object of type {} is not serializable'.format(
+                type(value).__name__))
+
+
+def _pack_string(value, buffer, strings):
+    """Append a string to binary data.
+
+    Args:
+        value: String to append
+        buffer: bytearray of binary data
+        strings: Dict of the indexes of strings already in the binary data
+
+    Returns:
+        None
+
+    """
+    # Refer to strings that have already been appended
+    index = strings.get(value)
+    if index is not None:
+        buffer.append(_STRING_REFERENCE)
+        _varint(index, buffer)
+        return
+
+    # Append
+    strings[value] = len(strings)
+    encoded = value.encode()
+    buffer.append(_STRING)
+    _varint(len(encoded), buffer)
+    buffer.extend(encoded)
+
+
+def _unpack(body, offset, strings):
+    """Read a value from binary data.
+
+    Args:
+        body: Binary data
+        offset: Offset of the value
+        strings: List of the strings already read from the binary data
+
+    Returns:
+        result: Tuple of (value, offset of the next value)
+
+    """
+    # Read the type
+    tag = body[offset]
+    offset += 1
+
+    # Read the value
+    if tag == _NONE:
+        value = None
+    elif tag == _TRUE:
+        value = True
+    elif tag == _FALSE:
+        value = False
+    elif tag == _INT:
+        (value, offset) = _read_varint(body, offset)
+    elif tag == _NEGATIVE_INT:
+        (value, offset) = _read_varint(body, offset)
+        value = -value - 1
+    elif tag == _FLOAT:
+        value = _DOUBLE.unpack_from(body, offset)[0]
+        offset += _DOUBLE.size
+    elif tag == _STRING:
+        (length, offset) = _read_varint(body, offset)
+        if offset + length > len(body):
+            raise IndexError()
+        value = bytes(body[offset:offset + length]).decode()
+        offset += length
+        strings.append(value)
+    elif tag == _STRING_REFERENCE:
+        (index, offset) = _read_varint(body, offset)
+        value = strings[index]
+    elif tag == _INT_KEY:
+        (value, offset) = _read_varint(body, offset)
+        value = str(value)
+    elif tag == _LIST:
+        (count, offset) = _read_varint(body, offset)
+        value = []
+        for _ in range(count):
+            (item, offset) = _unpack(body, offset, strings)
+            value.append(item)
+    elif tag == _DICT:
+        (count, offset) = _read_varint(body, offset)
+        value = {}
+        for _ in range(count):
+            (key, offset) = _unpack(body, offset, strings)
+            (item, offset) = _unpack(body, offset, strings)
+            value[key] = item
+    else:
+        raise KeyError(tag)
+
+    result = (value, offset)
+    return result
+
+
+def _varint(number, buffer):
+    """Append a non-negative integer as a variable length integer.
+
+    Seven bits are stored in each byte, least significant first. The high
+    bit is set in all bytes except the last.
+
+    Args:
+        number: Integer
+        buffer: bytearray of binary data
+
+    Returns:
+        None
+
+    """
+    # Append
+    while number > 0x7f:
+        buffer.append((number & 0x7f) | 0x80)
+        number >>= 7
+    buffer.append(number)
+
+
+def _read_varint(body, offset):
+    """Read a variable length integer.
+
+    Args:
+        body: Binary data
+        offset: Offset of the integer
+
+    Returns:
+        result: Tuple of (integer, offset of the next value)
+
+    """
+    # Read
+    number = 0
+    shift = 0
+    while True:
+        byte = body[offset]
+        offset += 1
+        number |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            break
+        shift += 7
+    result = (number, offset)
+    return result
@@ -283,6 +283,601 @@ class BaseConfig():
             result = str(intermediate).lower()
         return result
 
+    def http_pool_size(self):
+        """Get http_pool_size.
+
+        Args:
+            None
+
+        Returns:
+            result: Maximum number of persistent connections kept per
+                pattoo server
+
+        """
+        # Get result
+        key = 'pattoo'
+        sub_key = 'http_pool_size'
+        intermediate = search(
+            key, sub_key, self._base_yaml_configuration, die=False)
+
+        # Default to 10
+        if intermediate is None:
+            result = 10
+        else:
+            result = max(1, int(intermediate))
+        return result
+
+    def http_connect_timeout(self):
+        """Get http_connect_timeout.
+
+        Args:
+            None
+
+        Returns:
+            result: Seconds to wait for a connection to a pattoo server
+
+        """
+        # Get result
+        key = 'pattoo'
+        sub_key = 'http_connect_timeout'
+        intermediate = search(
+            key, sub_key, self._base_yaml_configuration, die=False)
+
+        # Default to 10 seconds
+        if intermediate is None:
+            result = 10.0
+        else:
+            result = float(intermediate)
+        return result
+
+    def http_read_timeout(self):
+        """Get http_read_timeout.
+
+        Args:
+            None
+
+        Returns:
+            result: Seconds to wait for a pattoo server to respond
+
+        """
+        # Get result
+        key = 'pattoo'
+        sub_key = 'http_read_timeout'
+        intermediate = search(
+            key, sub_key, self._base_yaml_configuration, die=False)
+
+        # Default to 30 seconds
+        if intermediate is None:
+            result = 30.0
+        else:
+            result = float(intermediate)
+        return result
+
+    def http_breaker_threshold(self):
+        """Get http_breaker_threshold.
+
+        Args:
+            None
+
+        Returns:
+            result: Number of consecutive failed posts to a pattoo server
+                after which posting stops until the server recovers. 0 if
+                posting never stops
+
+        """
+        # Get result
+        key = 'pattoo'
+        sub_key = 'http_breaker_threshold'
+        intermediate = search(
+            key, sub_key, self._base_yaml_configuration, die=False)
+
+        # Default to 5 failures
+        if intermediate is None:
+            result = 5
+        else:
+            result = max(0, int(intermediate))
+        return result
+
+    def http_backoff_initial(self):
+        """Get http_backoff_initial.
+
+        Args:
+            None
+
+        Returns:
+            result: Seconds to wait before posting to a failed pattoo server
+                again. Doubled every time the server fails again
+
+        """
+        # Get result
+        key = 'pattoo'
+        sub_key = 'http_backoff_initial'
+        intermediate = search(
+            key, sub_key, self._base_yaml_configuration, die=False)
+
+        # Default to 10 seconds
+        if intermediate is None:
+            result = 10.0
+        else:
+            result = max(0.0, float(intermediate))
+        return result
+
+    def http_backoff_max(self):
+        """Get http_backoff_max.
+
+        Args:
+            None
+
+        Returns:
+            result: Maximum seconds to wait before posting to a failed
+                pattoo server again
+
+        """
+        # Get result
+        key = 'pattoo'
+        sub_key = 'http_backoff_max'
+        intermediate = search(
+            key, sub_key, self._base_yaml_configuration, die=False)
+
+        # Default to 5 minutes
+        if intermediate is None:
+            result = 300.0
+        else:
+            result = max(0.0, float(intermediate))
+        return result
+
+    def http_compression(self):
+        """Get http_compression.
+
+        Args:
+            None
+
+        Returns:
+            result: Content-Encoding used to compress posted data. One of
+                'gzip' or 'deflate'. None if compression is disabled
+
+        """
+        # Get result
+        key = 'pattoo'
+        sub_key = 'http_compression'
+        intermediate = search(
+            key, sub_key, self._base_yaml_configuration, die=False)
+
+        # Default to no compression
+        result = None
+        if bool(intermediate) is True:
+            intermediate = str(intermediate).lower()
+            if intermediate in ['gzip', 'deflate']:
+                result = intermediate
+        return result
+
+    def http_compression_threshold(self):
+        """Get http_compression_threshold.
+
+        Args:
+            None
+
+        Returns:
+            result: Minimum size in bytes of posted data to compress
+
+        """
+        # Get result
+        key = 'pattoo'
+        sub_key = 'http_compression_threshold'
+        intermediate = search(
+            key, sub_key, self._base_yaml_configuration, die=False)
+
+        # Default to 1024 bytes
+        if intermediate is None:
+            result = 1024
+        else:
+            result = max(0, int(intermediate))
+        return result
+
+    def http_compression_level(self):
+        """Get http_compression_level.
+
+        Args:
+            None
+
+        Returns:
+            result: Compression level from 1 (fastest) to 9 (smallest)
+
+        """
+        # Get result
+        key = 'pattoo'
+        sub_key = 'http_compression_level'
+        intermediate = search(
+            key, sub_key, self._base_yaml_configuration, die=False)
+
+        # Default to 6
+        if intermediate is None:
+            result = 6
+        else:
+            result = min(9, max(1, int(intermediate)))
+        return result
+
+    def http_codec(self):
+        """Get http_codec.
+
+        Args:
+            None
+
+        Returns:
+            result: Format of posted data. Either 'json' or 'binary'
+
+        """
+        # Get result
+        key = 'pattoo'
+        sub_key = 'http_codec'
+        intermediate = search(
+            key, sub_key, self._base_yaml_configuration, die=False)
+
+        # Default to JSON
+        result = 'json'
+        if bool(intermediate) is True:
+            intermediate = str(intermediate).lower()
+            if intermediate in ['json', 'binary']:
+                result = intermediate
+        return result
+
+    def http_chunk_bytes(self):
+        """Get http_chunk_bytes.
+
+        Args:
+            None
+
+        Returns:
+            result: Size in bytes of the chunks of data posted with chunked
+                transfer encoding. 0 if data is posted in one piece
+
+        """
+        # Get result
+        key = 'pattoo'
+        sub_key = 'http_chunk_bytes'
+        intermediate = search(
+            key, sub_key, self._base_yaml_configuration, die=False)
+
+        # Default to 0
+        if intermediate is None:
+            result = 0
+        else:
+            result = max(0, int(intermediate))
+        return result
+
+    def http_delta_encoding(self):
+        """Get http_delta_encoding.
+
+        Args:
+            None
+
+        Returns:
+            result: True if posts only include key-value pairs that the
+                pattoo server hasn't already received from the agent
+
+        """
+        # Get result
+        key = 'pattoo'
+        sub_key = 'http_delta_encoding'
+        intermediate = search(
+            key, sub_key, self._base_yaml_configuration, die=False)
+
+        # Default to False
+        result = intermediate is True or str(
+            intermediate).lower() in ['true', 'yes', '1']
+        return result
+
+    def http_encryption_ttl(self):
+        """Get http_encryption_ttl.
+
+        Args:
+            None
+
+        Returns:
+            result: Seconds an encryption key negotiated with the pattoo
+                server is reused before a new one is negotiated
+
+        """
+        # Get result
+        key = 'pattoo'
+        sub_key = 'http_encryption_ttl'
+        intermediate = search(
+            key, sub_key, self._base_yaml_configuration, die=False)
+
+        # Default to 3600 seconds
+        if intermediate is None:
+            result = 3600.0
+        else:
+            result = max(0.0, float(intermediate))
+        return result
+
+    def http_encryption_cipher(self):
+        """Get http_encryption_cipher.
+
+        Args:
+            None
+
+        Returns:
+            result: Cipher for symmetrically encrypting posted data. Either
+                'gnupg' or 'aesgcm'
+
+        """
+        # Get result
+        key = 'pattoo'
+        sub_key = 'http_encryption_cipher'
+        intermediate = search(
+            key, sub_key, self._base_yaml_configuration, die=False)
+
+        # Default to GnuPG
+        result = 'gnupg'
+        if bool(intermediate) is True:
+            intermediate = str(intermediate).lower()
+            if intermediate in ['gnupg', 'aesgcm']:
+                result = intermediate
+        return result
+
+    def cache_purge_batch_bytes(self):
+        """Get cache_purge_batch_bytes.
+
+        Args:
+            None
+
+        Returns:
+            result: Maximum size in bytes of the cache files posted in a
+                single batch when purging the cache. 0 if cache files are
+                posted one at a time
+
+        """
+        # Get result
+        key = 'pattoo'
+        sub_key = 'cache_purge_batch_bytes'
+        intermediate = search(
+            key, sub_key, self._base_yaml_configuration, die=False)
+
+        # Default to posting files one at a time
+        if intermediate is None:
+            result = 0
+        else:
+            result = max(0, int(intermediate))
+        return result
+
+    def cache_purge_workers(self):
+        """Get cache_purge_workers.
+
+        Args:
+            None
+
+        Returns:
+            result: Number of threads reading cache files ahead of posting
+                them when purging the cache
+
+        """
+        # Get result
+        key = 'pattoo'
+        sub_key = 'cache_purge_workers'
+        intermediate = search(
+            key, sub_key, self._base_yaml_configuration, die=False)
+
+        # Default to reading files one at a time
+        if intermediate is None:
+            result = 1
+        else:
+            result = max(1, int(intermediate))
+        return result
+
+    def cache_purge_inflight_bytes(self):
+        """Get cache_purge_inflight_bytes.
+
+        Args:
+            None
+
+        Returns:
+            result: Maximum size in bytes of the cache files read ahead of
+                posting them when purging the cache
+
+        """
+        # Get result
+        key = 'pattoo'
+        sub_key = 'cache_purge_inflight_bytes'
+        intermediate = search(
+            key, sub_key, self._base_yaml_configuration, die=False)
+
+        # Default to 16MB
+        if intermediate is None:
+            result = 16777216
+        else:
+            result = max(0, int(intermediate))
+        return result
+
+    def cache_segment_bytes(self):
+        """Get cache_segment_bytes.
+
+        Args:
+            None
+
+        Returns:
+            result: Size in bytes at which a new cache spool segment file is
+                started
+
+        """
+        # Get result
+        key = 'pattoo'
+        sub_key = 'cache_segment_bytes'
+        intermediate = search(
+            key, sub_key, self._base_yaml_configuration, die=False)
+
+        # Default to 16MB
+        if intermediate is None:
+            result = 16777216
+        else:
+            result = max(1, int(intermediate))
+        return result
+
+    def cache_max_bytes(self):
+        """Get cache_max_bytes.
+
+        Args:
+            None
+
+        Returns:
+            result: Maximum size in bytes of the data cached for an agent.
+                0 if there is no limit
+
+        """
+        # Get result
+        key = 'pattoo'
+        sub_key = 'cache_max_bytes'
+        intermediate = search(
+            key, sub_key, self._base_yaml_configuration, die=False)
+
+        # Default to no limit
+        if intermediate is None:
+            result = 0
+        else:
+            result = max(0, int(intermediate))
+        return result
+
+    def cache_max_records(self):
+        """Get cache_max_records.
+
+        Args:
+            None
+
+        Returns:
+            result: Maximum number of failed posts cached for an agent.
+                0 if there is no limit
+
+        """
+        # Get result
+        key = 'pattoo'
+        sub_key = 'cache_max_records'
+        intermediate = search(
+            key, sub_key, self._base_yaml_configuration, die=False)
+
+        # Default to no limit
+        if intermediate is None:
+            result = 0
+        else:
+            result = max(0, int(intermediate))
+        return result
+
+    def cache_codec(self):
+        """Get cache_codec.
+
+        Args:
+            None
+
+        Returns:
+            result: Format of cached data. Either 'json' or 'binary'
+
+        """
+        # Get result
+        key = 'pattoo'
+        sub_key = 'cache_codec'
+        intermediate = search(
+            key, sub_key, self._base_yaml_configuration, die=False)
+
+        # Default to JSON
+        result = 'json'
+        if bool(intermediate) is True:
+            intermediate = str(intermediate).lower()
+            if intermediate in ['json', 'binary']:
+                result = intermediate
+        return result
+
+    def cache_eviction_policy(self):
+        """Get cache_eviction_policy.
+
+        Args:
+            None
+
+        Returns:
+            result: Policy used to make room in a full cache. One of
+                'drop_oldest', 'drop_newest' or 'downsample'
+
+        """
+        # Get result
+        key = 'pattoo'
+        sub_key = 'cache_eviction_policy'
+        intermediate = search(
+            key, sub_key, self._base_yaml_configuration, die=False)
+
+        # Default to dropping the oldest data
+        result = 'drop_oldest'
+        if bool(intermediate) is True:
+            intermediate = str(intermediate).lower()
+            if intermediate in ['drop_oldest', 'drop_newest', 'downsample']:
+                result = intermediate
+        return result
+
+    def passive_agent_timeout(self):
+        """Get passive_agent_timeout.
+
+        Args:
+            None
+
+        Returns:
+            result: Seconds to wait for a passive agent to respond
+
+        """
+        # Get result
+        key = 'pattoo'
+        sub_key = 'passive_agent_timeout'
+        intermediate = search(
+            key, sub_key, self._base_yaml_configuration, die=False)
+
+        # Default to 10 seconds
+        if intermediate is None:
+            result = 10.0
+        else:
+            result = float(intermediate)
+        return result
+
+    def passive_agent_passthrough(self):
+        """Get passive_agent_passthrough.
+
+        Args:
+            None
+
+        Returns:
+            result: True if JSON retrieved from passive agents is relayed
+                unchanged without being parsed
+
+        """
+        # Get result
+        key = 'pattoo'
+        sub_key = 'passive_agent_passthrough'
+        intermediate = search(
+            key, sub_key, self._base_yaml_configuration, die=False)
+
+        # Default to False
+        result = intermediate is True or str(
+            intermediate).lower() in ['true', 'yes', '1']
+        return result
+
+    def passive_agent_workers(self):
+        """Get passive_agent_workers.
+
+        Args:
+            None
+
+        Returns:
+            result: Maximum number of passive agents polled at the same time
+
+        """
+        # Get result
+        key = 'pattoo'
+        sub_key = 'passive_agent_workers'
+        intermediate = search(
+            key, sub_key, self._base_yaml_configuration, die=False)
+
+        # Default to 10
+        if intermediate is None:
+            result = 10
+        else:
+            result = max(1, int(intermediate))
+        return result
+
 
 class ServerConfig(BaseConfig):
     """Class gathers all configuration information."""
@@ -456,6 +1051,34 @@ class Config(BaseConfig):
         result = '{}/encrypted'.format(PATTOO_API_AGENT_PREFIX)
         return result
 
+    def agent_api_batch(self):
+        """Get URI to receive batches of posted data.
+
+        Args:
+            None
+
+        Returns:
+            result: result
+
+        """
+        # Return
+        result = '{}/batch'.format(PATTOO_API_AGENT_PREFIX)
+        return result
+
+    def agent_api_delta(self):
+        """Get URI to receive delta encoded posted data.
+
+        Args:
+            None
+
+        Returns:
+            result: result
+
+        """
+        # Return
+        result = '{}/delta'.format(PATTOO_API_AGENT_PREFIX)
+        return result
+
     def agent_api_server_url(self, agent_id):
         """Get pattoo server's remote URL.
 
@@ -541,6 +1164,51 @@ class Config(BaseConfig):
 
         return link
 
+    def agent_api_batch_url(self):
+        """Batch data reception point.
+
+        Args:
+            None
+
+        Returns:
+            link (str): Link of batch data receive point
+
+        """
+
+        _ip = url.url_ip_address(self.agent_api_ip_address())
+        link = (
+            'http://{}:{}{}'.format(
+                _ip,
+                self.agent_api_ip_bind_port(),
+                self.agent_api_batch()
+                )
+            )
+
+        return link
+
+    def agent_api_delta_url(self):
+        """Delta encoded data reception point.
+
+        Args:
+            None
+
+        Returns:
+            link (str): Link of delta encoded data receive point
+
+        """
+
+        _ip = url.url_ip_address(self.agent_api_ip_address())
+        link = (
+            'http://{}:{}{}'.format(
+                _ip,
+                self.agent_api_ip_bind_port(),
+                self.agent_api_delta()
+                )
+            )
+
+        return link
+
+
 def agent_config_filename(agent_program):
     """Get the configuration file name.
 
@@ -48,6 +48,27 @@ CACHE_KEYS = (
     'pattoo_agent_id', 'pattoo_datapoints', 'pattoo_agent_polling_interval',
     'pattoo_agent_timestamp')
 
+# Keys of a batch of posted data. Posts in the batch share a single
+# dict of key-value pairs
+BATCH_KEYS = ('pattoo_key_value_pairs', 'pattoo_batch')
+
+# Keys of each post in a batch
+BATCH_POST_KEYS = (
+    'pattoo_agent_id', 'pattoo_datapoint_pairs',
+    'pattoo_agent_polling_interval', 'pattoo_agent_timestamp')
+
+# Keys of delta encoded posted data. Key-value pairs are only sent the first
+# time they are used in a session
+DELTA_KEYS = (
+    'pattoo_agent_id', 'pattoo_agent_polling_interval',
+    'pattoo_agent_timestamp', 'pattoo_session', 'pattoo_session_base',
+    'pattoo_key_value_pairs', 'pattoo_datapoint_pairs',
+    'pattoo_datapoint_values')
+
+# Keys whose values change every time data is polled. They are sent with
+# each delta encoded datapoint instead of being added to the session
+DELTA_VOLATILE_KEYS = ('pattoo_value', 'pattoo_timestamp')
+
 ###############################################################################
 # Constants for pattoo Agent API
 ###############################################################################
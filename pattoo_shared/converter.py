@@ -2,7 +2,13 @@
 """Pattoo Data Converter."""
 
 # Standard imports
+import os
 import re
+import json
+import uuid
+import functools
+import collections
+from concurrent.futures import ProcessPoolExecutor
 
 # Pattoo libraries
 from .variables import (
@@ -11,9 +17,23 @@ from .variables import (
 from .constants import (
     DATA_FLOAT, DATA_INT, DATA_COUNT64, DATA_COUNT, DATA_STRING, DATA_NONE,
     MAX_KEYPAIR_LENGTH, PattooDBrecord, RESERVED_KEYS, CACHE_KEYS,
-    AGENT_METADATA_KEYS)
+    BATCH_KEYS, BATCH_POST_KEYS, DELTA_KEYS, DELTA_VOLATILE_KEYS)
 from pattoo_shared import data
 from pattoo_shared import log
+from pattoo_shared import codec
+from pattoo_shared import files
+
+# Keys, other than 'pattoo_metadata', that every datapoint must have
+_RECORD_KEYS = frozenset(RESERVED_KEYS) - {'pattoo_metadata'}
+_RESERVED_KEYS = frozenset(RESERVED_KEYS)
+_DATA_TYPES = frozenset([
+    DATA_FLOAT, DATA_INT, DATA_COUNT64, DATA_COUNT, DATA_STRING, DATA_NONE])
+
+# Maximum number of composite checksums to remember
+_CHECKSUM_CACHE_SIZE = 65536
+
+# Number of datapoints whose checksums are created together when streaming
+_RECORD_BATCH_SIZE = 1000
 
 
 class Counter():
@@ -57,32 +77,627 @@ class Counter():
         result = self.pairs[pair]
         return result
 
+    def counters(self, pairs):
+        """Get the IDs of many key-value pairs.
+
+        Equivalent to calling counter for each pair in turn, without the
+        overhead of a method call for each pair.
+
+        Args:
+            pairs: Iterable of (key, value) tuples
+
+        Returns:
+            result: List of IDs in the same order as pairs
+
+        """
+        # Initialize key variables
+        result = []
+        _pairs = self.pairs
+        inverse_pairs = self.inverse_pairs
+
+        # Assign IDs to new pairs
+        for pair in pairs:
+            pair_id = _pairs.get(pair)
+            if pair_id is None:
+                pair_id = self._count
+                _pairs[pair] = pair_id
+                inverse_pairs[pair_id] = pair
+                self._count += 1
+            result.append(pair_id)
+        return result
+
+
+class DeltaEncoder():
+    """Delta encode the posts of an agent against a session dictionary.
+
+    The agent and the pattoo server share a dictionary of key-value pairs
+    for the duration of a session. Each post only includes the pairs added
+    to the dictionary since the server last acknowledged a post, plus the
+    dictionary IDs of its datapoints. Pairs that change every time data is
+    polled are sent with each datapoint and never added to the dictionary.
+
+    """
+
+    def __init__(self, max_pairs=65536):
+        """Initialize the class.
+
+        Args:
+            max_pairs: Start a new session when the dictionary has more
+                key-value pairs than this
+
+        Returns:
+            None
+
+        """
+        # Initialize key variables
+        self.max_pairs = max_pairs
+        self.reset()
+
+    def reset(self):
+        """Start a new session with an empty dictionary.
+
+        Args:
+            None
+
+        Returns:
+            None
+
+        """
+        # Reset
+        self.session = uuid.uuid4().hex
+        self.acknowledged = 0
+        self._counter = Counter()
+
+    def encode(self, _data):
+        """Delta encode a post.
+
+        Args:
+            _data: Dict created by posting_data_points, or read from cache
+                files
+
+        Returns:
+            result: Dict keyed by DELTA_KEYS. None if invalid.
+                pattoo_session = Session ID
+                pattoo_session_base = Number of key-value pairs in the
+                    dictionary the server has acknowledged
+                pattoo_key_value_pairs = New key-value pairs keyed by ID
+                pattoo_datapoint_pairs = List of dictionary IDs of each
+                    datapoint
+                pattoo_datapoint_values = List of volatile (key, value)
+                    pairs of each datapoint
+
+        """
+        # Ignore invalid data
+        if _valid_post(_data) is False:
+            log.log2warning(1117, 'Invalid post data not delta encoded.')
+            return None
+        datapoints = _data['pattoo_datapoints']
+
+        # Start again if the dictionary has grown too large
+        if self._counter._count > self.max_pairs:
+            self.reset()
+        base = self.acknowledged
+
+        # Add each stable key-value pair to the dictionary. Cached data is
+        # keyed by string integers.
+        try:
+            key_value_pairs = {
+                int(pair_id): tuple(pair) for pair_id, pair in datapoints[
+                    'key_value_pairs'].items()}
+            datapoint_pairs = []
+            datapoint_values = []
+            for pair_ids in datapoints['datapoint_pairs']:
+                ids = []
+                values = []
+                for pair_id in pair_ids:
+                    (key, value) = key_value_pairs[pair_id]
+                    if key in DELTA_VOLATILE_KEYS:
+                        values.append((key, value))
+                    else:
+                        ids.append(self._counter.counter(key, value))
+                datapoint_pairs.append(ids)
+                datapoint_values.append(values)
+        except (ValueError, TypeError, KeyError):
+            log.log2warning(
+                1118, 'Invalid key-value pairs. Post not delta encoded.')
+            return None
+
+        result = {
+            'pattoo_agent_id': _data['pattoo_agent_id'],
+            'pattoo_agent_polling_interval': _data[
+                'pattoo_agent_polling_interval'],
+            'pattoo_agent_timestamp': _data['pattoo_agent_timestamp'],
+            'pattoo_session': self.session,
+            'pattoo_session_base': base,
+            'pattoo_key_value_pairs': {
+                pair_id: self._counter.inverse_pairs[pair_id]
+                for pair_id in range(base, self._counter._count)},
+            'pattoo_datapoint_pairs': datapoint_pairs,
+            'pattoo_datapoint_values': datapoint_values
+        }
+        return result
+
+    def acknowledge(self, _data):
+        """Record that the server received a delta encoded post.
+
+        Args:
+            _data: Dict created by encode
+
+        Returns:
+            None
+
+        """
+        # Only acknowledge posts of the current session
+        if _data['pattoo_session'] == self.session:
+            self.acknowledged = max(
+                self.acknowledged, _data['pattoo_session_base'] + len(
+                    _data['pattoo_key_value_pairs']))
+
+
+class DeltaDecoder():
+    """Decode delta encoded posts created by DeltaEncoder objects."""
+
+    def __init__(self, max_sessions=1024):
+        """Initialize the class.
+
+        Args:
+            max_sessions: Number of sessions to remember. The dictionaries of
+                the least recently used sessions are discarded first
+
+        Returns:
+            None
+
+        """
+        # Initialize key variables
+        self.max_sessions = max_sessions
+        self._sessions = collections.OrderedDict()
+
+    def decode(self, _data):
+        """Decode a delta encoded post.
+
+        Args:
+            _data: Dict created by DeltaEncoder.encode
+
+        Returns:
+            result: Dict keyed by CACHE_KEYS that can be converted with
+                cache_to_keypairs. None if the post is invalid, or if its
+                session is unknown and the agent must start a new one.
+
+        """
+        # Initialize key variables
+        _log_message = 'Invalid delta encoded data.'
+
+        # Basic validation
+        if isinstance(_data, dict) is False or (
+                sorted(_data.keys()) != sorted(DELTA_KEYS)):
+            log.log2warning(1119, _log_message)
+            return None
+        session = _data['pattoo_session']
+        base = _data['pattoo_session_base']
+        datapoint_pairs = _data['pattoo_datapoint_pairs']
+        datapoint_values = _data['pattoo_datapoint_values']
+        if False in [
+                isinstance(session, str), isinstance(base, int),
+                isinstance(_data['pattoo_key_value_pairs'], dict),
+                isinstance(datapoint_pairs, list),
+                isinstance(datapoint_values, list)] or (
+                    len(datapoint_pairs) != len(datapoint_values)):
+            log.log2warning(1120, _log_message)
+            return None
+
+        # Sessions are only created by the first post of the agent
+        pairs = self._sessions.get(session, [])
+        if session not in self._sessions and base != 0:
+            return None
+        if base > len(pairs):
+            return None
+
+        # Add the new key-value pairs to the session's dictionary. They are
+        # removed again if the post is invalid. JSON keys are strings.
+        length = len(pairs)
+        try:
+            for pair_id, pair in sorted(
+                    (int(_id), tuple(_kv)) for _id, _kv in _data[
+                        'pattoo_key_value_pairs'].items()):
+                if len(pair) != 2 or pair_id < 0:
+                    raise ValueError()
+                if pair_id == len(pairs):
+                    pairs.append(pair)
+                elif pair_id > len(pairs) or pairs[pair_id] != pair:
+                    # The agent and server disagree
+                    del pairs[length:]
+                    return None
+
+            # Recreate the post
+            counter = Counter()
+            _datapoint_pairs = []
+            for pair_ids, values in zip(datapoint_pairs, datapoint_values):
+                ids = []
+                for pair_id in pair_ids:
+                    if pair_id < 0:
+                        raise IndexError()
+                    ids.append(counter.counter(*pairs[pair_id]))
+                for key, value in values:
+                    ids.append(counter.counter(key, value))
+                _datapoint_pairs.append(ids)
+        except (ValueError, TypeError, IndexError):
+            del pairs[length:]
+            log.log2warning(1121, _log_message)
+            return None
+
+        # Remember the session, forgetting the least recently used
+        self._sessions[session] = pairs
+        self._sessions.move_to_end(session)
+        while len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)
+
+        result = {
+            'pattoo_agent_id': _data['pattoo_agent_id'],
+            'pattoo_agent_polling_interval': _data[
+                'pattoo_agent_polling_interval'],
+            'pattoo_agent_timestamp': _data['pattoo_agent_timestamp'],
+            'pattoo_datapoints': {
+                'key_value_pairs': {
+                    str(pair_id): list(pair) for pair_id, pair in
+                    counter.inverse_pairs.items()},
+                'datapoint_pairs': _datapoint_pairs}
+        }
+        return result
+
+
+class RecordFactory():
+    """Create PattooDBrecord objects from the key-values of datapoints.
+
+    Create one object for each payload. Keys are validated against sets
+    built once, and normalized metadata keys are remembered, so creating
+    each record only takes a few dict lookups.
+
+    """
+
+    def __init__(self):
+        """Initialize the class.
+
+        Args:
+            None
+
+        Returns:
+            None
+
+        """
+        # Initialize key variables
+        self._names = {}
+
+    def records(self, items):
+        """Create the PattooDBrecords of many datapoints.
+
+        The checksums of all the datapoints are created at once.
+
+        Args:
+            items: List of dicts of key-value pairs DataPoint. None if the
+                datapoint is invalid
+
+        Returns:
+            result: List of PattooDBrecord objects in the same order as
+                items. None for invalid items
+
+        """
+        # Create checksums
+        valids = [item for item in items if item is not None]
+        _checksums = iter(checksums([(
+            item.get('pattoo_agent_id'),
+            item.get('pattoo_agent_polled_target'),
+            item.get('pattoo_checksum')) for item in valids]))
+
+        # Create records
+        result = [
+            None if item is None else self.record(
+                item, checksum=next(_checksums)) for item in items]
+        return result
+
+    def record(self, item, checksum=None):
+        """Create a PattooDBrecord.
+
+        Args:
+            item: Dict of key-value pairs DataPoint
+            checksum: Checksum of the item created by checksums(). Created
+                if None
+
+        Returns:
+            pattoo_db_variable: PattooDBrecord object. None if invalid
+
+        """
+        # Initialize key variables
+        names = self._names
+        metadata = []
+
+        '''
+        Make sure we have all keys required for creating a PattooDBrecord
+        Omit 'pattoo_metadata' as we need to recreate it. 'pattoo_metadata'
+        was extracted to its component key-value pairs before the agent
+        posted it to the pattoo API
+        '''
+        if (item.keys() >= _RECORD_KEYS) is False:
+            log.log2warning(1047, 'Invalid cache data.')
+            return None
+
+        # Work on the data_type
+        try:
+            if item['pattoo_data_type'] not in _DATA_TYPES:
+                return None
+        except TypeError:
+            return None
+
+        # Get metadata for item
+        keys = [key for key in item if key not in _RESERVED_KEYS]
+        for key in keys:
+            if isinstance(key, str) is False:
+                return None
+        keys.sort()
+        for key in keys:
+            value = item[key]
+            if isinstance(value, str) is False:
+                continue
+            name = names.get(key)
+            if name is None:
+                name = _keypair_key(key)
+                names[key] = name
+            metadata.append((name, value[:MAX_KEYPAIR_LENGTH]))
+
+        # Add the datasource to the original checksum for better uniqueness
+        if checksum is None:
+            checksum = _checksum(
+                item['pattoo_agent_id'],
+                item['pattoo_agent_polled_target'],
+                item['pattoo_checksum'])
+        pattoo_db_variable = PattooDBrecord(
+            pattoo_checksum=checksum,
+            pattoo_key=item['pattoo_key'],
+            pattoo_agent_id=item['pattoo_agent_id'],
+            pattoo_agent_polling_interval=item[
+                'pattoo_agent_polling_interval'],
+            pattoo_timestamp=item['pattoo_timestamp'],
+            pattoo_data_type=item['pattoo_data_type'],
+            pattoo_value=item['pattoo_value'],
+            pattoo_agent_polled_target=item['pattoo_agent_polled_target'],
+            pattoo_agent_program=item['pattoo_agent_program'],
+            pattoo_agent_hostname=item['pattoo_agent_hostname'],
+            pattoo_metadata=metadata
+        )
+
+        # Return
+        return pattoo_db_variable
+
 
 def cache_to_keypairs(_data):
     """Convert agent cache data to AgentPolledData object.
 
     Args:
-        _data: Data read from JSON cache file
+        _data: Data read from JSON cache file, or bytes of cache data encoded
+            by any codec
 
     Returns:
         result: Validated cache data. [] if invalid.
 
+    """
+    # Initialize key variables
+    items = []
+    _log_message = 'Invalid cache data.'
+
+    # Validate the cache data
+    pairs = _cache_pairs(_data)
+    if pairs is None:
+        return []
+    (key_value_pairs, datapoint_pairs) = pairs
+
+    # Process each datapoint
+    for pair_ids in datapoint_pairs:
+        # Validate and assign key-values from datapoints
+        item = _datapoint_item(pair_ids, key_value_pairs, _log_message)
+        if item is None:
+            return []
+        items.append(item)
+
+    # Assign datapoint values to PattooDBrecords
+    result = [_ for _ in RecordFactory().records(items) if bool(_) is True]
+    return result
+
+
+def iter_cache_to_keypairs(_data, chunk_size=None, errors=None):
+    """Convert agent cache data to PattooDBrecord objects one at a time.
+
+    Unlike cache_to_keypairs, an invalid datapoint doesn't discard the
+    whole cache data. It is logged and skipped. Records are yielded as soon
+    as they are created so that they can be stored while the rest of the
+    cache data is being processed.
+
+    Args:
+        _data: Data read from JSON cache file, or bytes of cache data encoded
+            by any codec
+        chunk_size: Yield lists of up to this many PattooDBrecord objects
+            instead of single objects if not None
+        errors: List to which the indexes of invalid datapoints in
+            'datapoint_pairs' are appended
+
+    Returns:
+        None. Yields PattooDBrecord objects, or lists of them. Nothing is
+            yielded if the structure of the cache data is invalid
+
+    """
+    # Validate the cache data
+    pairs = _cache_pairs(_data)
+    if pairs is None:
+        return
+    (key_value_pairs, datapoint_pairs) = pairs
+    total = len(datapoint_pairs)
+    factory = RecordFactory()
+    chunk = []
+
+    # Process datapoints in batches so that their checksums are created
+    # together
+    for start in range(0, total, _RECORD_BATCH_SIZE):
+        # Validate and assign key-values from datapoints
+        indexes = range(start, min(start + _RECORD_BATCH_SIZE, total))
+        items = [
+            _datapoint_item(
+                datapoint_pairs[index], key_value_pairs,
+                _invalid_datapoint(index, total)) for index in indexes]
+        records = factory.records(items)
+
+        for index, item, pattoo_db_variable in zip(indexes, items, records):
+            # Skip invalid datapoints
+            if bool(pattoo_db_variable) is False:
+                if item is not None:
+                    log.log2warning(1128, _invalid_datapoint(index, total))
+                if errors is not None:
+                    errors.append(index)
+                continue
+
+            # Yield records
+            if chunk_size is None:
+                yield pattoo_db_variable
+                continue
+            chunk.append(pattoo_db_variable)
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+
+    # Yield the remaining records
+    if bool(chunk) is True:
+        yield chunk
+
+
+def cache_files_to_keypairs(_directory, workers=None, die=True, age=0,
+                            count=None):
+    """Convert the agent cache files in a directory to PattooDBrecords.
+
+    The files are read and converted by a pool of processes. Results are
+    in the same order as the output of files.read_json_files, so files
+    with older timestamp names are processed first. This allows the
+    last_timestamp column to be incrementally processed.
+
+    Args:
+        _directory: Directory with JSON cache files
+        workers: Number of processes. The number of CPUs if None. Files are
+            converted by this process if 1
+        die: Die if there is an error
+        age: Minimum age of files in seconds
+        count: Return first X number of sorted filenames is not None
+
+    Returns:
+        result: List of tuples of (filepath, records) where records is the
+            list created by cache_to_keypairs for the file
+
     """
     # Initialize key variables
     result = []
+    filepaths = files.json_filepaths(_directory, age=age)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(workers, len(filepaths)))
+
+    # Convert files in this process if there is nothing to share
+    if workers == 1:
+        executor = None
+        function = map
+    else:
+        executor = ProcessPoolExecutor(max_workers=workers)
+        function = executor.map
+
+    try:
+        while bool(filepaths) is True:
+            # Only convert as many files as may still be required
+            if bool(count) is True:
+                if len(result) >= count:
+                    break
+                batch = filepaths[:count - len(result)]
+            else:
+                batch = filepaths
+            filepaths = filepaths[len(batch):]
+
+            # Results are returned in the order of the filepaths
+            for filepath, records in zip(
+                    batch, function(_cache_file_to_keypairs, batch)):
+                if records is not None:
+                    result.append((filepath, records))
+                    continue
+
+                # Ignore unreadable files
+                log_message = ('''\
+Error reading file {}. Check permissions, existence and file syntax.\
+'''.format(filepath))
+                if bool(die) is True:
+                    log.log2die_safe(1131, log_message)
+                log.log2debug(1132, log_message)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    # Verify JSON files found in directory
+    if bool(result) is False and bool(die) is True:
+        log_message = (
+            'No valid JSON files found in directory "{}" with ".json" '
+            'extension.'.format(_directory))
+        log.log2die_safe(1133, log_message)
+
+    # Return
+    return result
+
+
+def _cache_file_to_keypairs(filepath):
+    """Convert an agent cache file to PattooDBrecords.
+
+    Args:
+        filepath: Path to JSON cache file
+
+    Returns:
+        result: List created by cache_to_keypairs. None if the file can't
+            be read
+
+    """
+    # Read file
+    _data = files.read_json_file(filepath, die=False)
+    if bool(_data) is False:
+        return None
+
+    # Convert
+    result = cache_to_keypairs(_data)
+    return result
+
+
+def _cache_pairs(_data):
+    """Validate the structure of agent cache data.
+
+    Args:
+        _data: Data read from JSON cache file, or bytes of cache data encoded
+            by any codec
+
+    Returns:
+        result: Tuple of (key_value_pairs, datapoint_pairs) from the
+            'pattoo_datapoints' of the cache data. None if invalid.
+
+    """
+    # Initialize key variables
     _log_message = 'Invalid cache data.'
 
+    # Decode
+    if isinstance(_data, (bytes, bytearray)) is True:
+        try:
+            _data = codec.decode(_data)
+        except ValueError:
+            log.log2warning(1122, _log_message)
+            return None
+
     # Basic validation
     if isinstance(_data, dict) is False:
         log.log2warning(1032, _log_message)
-        return []
+        return None
     if len(_data) != len(CACHE_KEYS):
         log.log2warning(1033, _log_message)
-        return []
+        return None
     for key in _data.keys():
         if key not in CACHE_KEYS:
             log.log2warning(1034, _log_message)
-            return []
+            return None
 
     ####################################################################
     # Verify pattoo_datapoints
@@ -91,127 +706,103 @@ def cache_to_keypairs(_data):
     # Verify we are getting a dict of datapoints
     if isinstance(_data['pattoo_datapoints'], dict) is False:
         log.log2warning(1035, _log_message)
-        return []
+        return None
 
     # Verify we are getting the correct key count
     if len(_data['pattoo_datapoints']) != 2:
         log.log2warning(1048, _log_message)
-        return []
+        return None
 
     # Verify we are getting the correct keys
     for item in ['key_value_pairs', 'datapoint_pairs']:
         if item not in _data['pattoo_datapoints']:
             log.log2warning(1049, _log_message)
-            return []
+            return None
 
     # Verify there are datapoint defining keys
     if isinstance(
             _data['pattoo_datapoints']['key_value_pairs'], dict) is False:
         log.log2warning(1050, _log_message)
-        return []
+        return None
     if isinstance(
             _data['pattoo_datapoints']['datapoint_pairs'], list) is False:
         log.log2warning(1051, _log_message)
-        return []
+        return None
 
-    # Prepare for datapoint processing
-    key_value_pairs = _data['pattoo_datapoints']['key_value_pairs']
-    datapoint_pairs = _data['pattoo_datapoints']['datapoint_pairs']
+    # Return
+    result = (
+        _data['pattoo_datapoints']['key_value_pairs'],
+        _data['pattoo_datapoints']['datapoint_pairs'])
+    return result
 
-    # Process each datapoint
-    for pair_ids in datapoint_pairs:
-        item = {}
 
-        # Validate and assign key-values from datapoints
-        for pair_id in pair_ids:
-            # Lookup on a string of pair_id as the JSON in the cache file is
-            # keyed by string integers
-            _kv = key_value_pairs.get(str(pair_id))
-            if isinstance(_kv, list) is False:
-                log.log2warning(1046, _log_message)
-                return []
-            if len(_kv) != 2:
-                log.log2warning(1045, _log_message)
-                return []
-            (key, value) = _kv
-            item[key] = value
-
-        # Assign datapoint values to PattooDBrecord
-        pattoo_db_variable = _make_pattoo_db_record(item)
-        if bool(pattoo_db_variable) is True:
-            result.append(pattoo_db_variable)
+def _invalid_datapoint(index, total):
+    """Create the log message of an invalid datapoint in agent cache data.
 
-    # Return
+    Args:
+        index: Index of the datapoint in 'datapoint_pairs'
+        total: Number of datapoints in 'datapoint_pairs'
+
+    Returns:
+        result: Log message
+
+    """
+    # Create message
+    result = ('''\
+Invalid cache data for datapoint {} of {}. Skipping.\
+'''.format(index, total))
     return result
 
 
-def _make_pattoo_db_record(item):
-    """Ingest data.
+def _datapoint_item(pair_ids, key_value_pairs, log_message):
+    """Get the key-values of a datapoint in agent cache data.
 
     Args:
-        item: Dict of key-value pairs DataPoint
+        pair_ids: List of IDs of the datapoint's key-value pairs
+        key_value_pairs: Dict of key-value pairs keyed by string IDs
+        log_message: Message to log if the datapoint is invalid
 
     Returns:
-        pattoo_db_variable: PattooDBrecord object
+        item: Dict of the datapoint's key-values. None if invalid.
 
     """
-    # Initialize data
-    valids = []
-    pattoo_db_variable = None
-    _log_message = 'Invalid cache data.'
-    reserved_keys_non_metadata = [
-        _ for _ in RESERVED_KEYS if _ != 'pattoo_metadata']
-    metadata = {}
-
-    '''
-    Make sure we have all keys required for creating a PattooDBrecord
-    Omit 'pattoo_metadata' as we need to recreate it. 'pattoo_metadata' was
-    extracted to its component key-value pairs before the agent posted it to
-    the pattoo API
-    '''
-    for key in reserved_keys_non_metadata:
-        valids.append(key in item.keys())
-    for key in AGENT_METADATA_KEYS:
-        valids.append(key in item.keys())
-    if False in valids:
-        log.log2warning(1047, _log_message)
+    # Initialize key variables
+    item = {}
+
+    # Verify the IDs
+    if isinstance(pair_ids, list) is False:
+        log.log2warning(1129, log_message)
         return None
 
-    # Get metadata for item
-    for key, value in sorted(item.items()):
-        if key not in reserved_keys_non_metadata:
-            metadata[key] = value
-            valids.append(isinstance(key, str))
+    # Validate and assign key-values from datapoints
+    for pair_id in pair_ids:
+        # Lookup on a string of pair_id as the JSON in the cache file is
+        # keyed by string integers
+        _kv = key_value_pairs.get(str(pair_id))
+        if isinstance(_kv, list) is False:
+            log.log2warning(1046, log_message)
+            return None
+        if len(_kv) != 2:
+            log.log2warning(1045, log_message)
+            return None
+        (key, value) = _kv
+        item[key] = value
 
-        # Work on the data_type
-        if key == 'pattoo_data_type':
-            valids.append(value in [
-                DATA_FLOAT, DATA_INT, DATA_COUNT64, DATA_COUNT,
-                DATA_STRING, DATA_NONE])
+    return item
 
-    # Append to result
-    if False not in valids:
-        # Add the datasource to the original checksum for better uniqueness
-        checksum = _checksum(
-            item['pattoo_agent_id'],
-            item['pattoo_agent_polled_target'],
-            item['pattoo_checksum'])
-        pattoo_db_variable = PattooDBrecord(
-            pattoo_checksum=checksum,
-            pattoo_key=item['pattoo_key'],
-            pattoo_agent_id=item['pattoo_agent_id'],
-            pattoo_agent_polling_interval=item[
-                'pattoo_agent_polling_interval'],
-            pattoo_timestamp=item['pattoo_timestamp'],
-            pattoo_data_type=item['pattoo_data_type'],
-            pattoo_value=item['pattoo_value'],
-            pattoo_agent_polled_target=item['pattoo_agent_polled_target'],
-            pattoo_agent_program=item['pattoo_agent_program'],
-            pattoo_agent_hostname=item['pattoo_agent_hostname'],
-            pattoo_metadata=_keypairs(metadata)
-        )
 
-    # Return
+def _make_pattoo_db_record(item):
+    """Ingest data.
+
+    Args:
+        item: Dict of key-value pairs DataPoint
+
+    Returns:
+        pattoo_db_variable: PattooDBrecord object
+
+    """
+    # Create the record
+    pattoo_db_variable = RecordFactory().record(item)
     return pattoo_db_variable
 
 
@@ -288,33 +879,34 @@ def datapoints_to_dicts(items):
         if isinstance(item, DataPoint):
             datapoints.append(item)
 
-    # Populate dict to get unique key-value pairs
-    for datapoint in datapoints:
-        # Only convert valid data
-        if datapoint.valid is True:
-            dp_pair_ids = []
-            dp_key_values = {}
-
-            # Convert metadata into list of tuples
-            key_values = list(datapoint.metadata.items())
-
-            # Convert non metadata into list of tuples
-            key_values.extend([
-                ('pattoo_key', datapoint.key),
-                ('pattoo_data_type', datapoint.data_type),
-                ('pattoo_value', datapoint.value),
-                ('pattoo_timestamp', datapoint.timestamp),
-                ('pattoo_checksum', datapoint.checksum)])
-
-            # Process tuples
-            for key, value in key_values:
-                # Assign ID to each key-value pair and store for later
-                id_pair = counter.counter(key, value)
-                dp_pair_ids.append(id_pair)
-                dp_key_values[key] = value
-
-            # Create a unique key tuple for the datapoint
-            all_dps.append(dp_pair_ids)
+    # Only convert valid data. Hold the values that differ between the
+    # datapoints of a target in parallel lists
+    datapoints = [_ for _ in datapoints if _.valid is True]
+    metadatas = [tuple(_.metadata.items()) for _ in datapoints]
+    keys = [_.key for _ in datapoints]
+    data_types = [_.data_type for _ in datapoints]
+    values = [_.value for _ in datapoints]
+    timestamps = [_.timestamp for _ in datapoints]
+    checksums = [_.checksum for _ in datapoints]
+
+    # Assign IDs to the key-value pairs of each datapoint in order, metadata
+    # first. The datapoints of a target share the same metadata, so its IDs
+    # are only looked up once for each target.
+    metadata_ids = {}
+    for metadata, key, data_type, value, timestamp, checksum in zip(
+            metadatas, keys, data_types, values, timestamps, checksums):
+        dp_pair_ids = metadata_ids.get(metadata)
+        if dp_pair_ids is None:
+            dp_pair_ids = counter.counters(metadata)
+            metadata_ids[metadata] = dp_pair_ids
+
+        # Create a unique key tuple for the datapoint
+        all_dps.append(dp_pair_ids + counter.counters((
+            ('pattoo_key', key),
+            ('pattoo_data_type', data_type),
+            ('pattoo_value', value),
+            ('pattoo_timestamp', timestamp),
+            ('pattoo_checksum', checksum))))
 
     result = {
         'key_value_pairs': counter.inverse_pairs,
@@ -375,6 +967,284 @@ def posting_data_points(_data):
     return result
 
 
+def posts_to_batch(posts):
+    """Merge posting dicts into a single batch sharing key-value pairs.
+
+    Args:
+        posts: List of dicts created by posting_data_points, or read from
+            cache files
+
+    Returns:
+        result: Dict keyed by BATCH_KEYS.
+            pattoo_key_value_pairs = Keyed by ID with a (key, value) value
+            pattoo_batch = List of dicts keyed by BATCH_POST_KEYS
+
+    """
+    # Initialize key variables
+    counter = Counter()
+    batch = []
+
+    for _data in posts:
+        # Ignore invalid data
+        if _valid_post(_data) is False:
+            log.log2warning(1091, 'Invalid post data not added to batch.')
+            continue
+        datapoints = _data['pattoo_datapoints']
+
+        # Assign new IDs from the shared counter to each key-value pair.
+        # Cached data is keyed by string integers.
+        ids = {}
+        try:
+            for pair_id, (key, value) in datapoints[
+                    'key_value_pairs'].items():
+                ids[int(pair_id)] = counter.counter(key, value)
+            datapoint_pairs = [
+                [ids[pair_id] for pair_id in pair_ids]
+                for pair_ids in datapoints['datapoint_pairs']]
+        except (ValueError, TypeError, KeyError):
+            log.log2warning(
+                1096, 'Invalid key-value pairs. Post not added to batch.')
+            continue
+
+        batch.append({
+            'pattoo_agent_id': _data['pattoo_agent_id'],
+            'pattoo_agent_polling_interval': _data[
+                'pattoo_agent_polling_interval'],
+            'pattoo_agent_timestamp': _data['pattoo_agent_timestamp'],
+            'pattoo_datapoint_pairs': datapoint_pairs
+        })
+
+    result = {
+        'pattoo_key_value_pairs': counter.inverse_pairs,
+        'pattoo_batch': batch}
+    return result
+
+
+def batch_to_posts(_data):
+    """Split a batch created by posts_to_batch into posting dicts.
+
+    Args:
+        _data: Batch dict
+
+    Returns:
+        result: List of dicts keyed by CACHE_KEYS that can be converted with
+            cache_to_keypairs. [] if invalid.
+
+    """
+    # Initialize key variables
+    result = []
+    _log_message = 'Invalid batch data.'
+
+    # Basic validation
+    if isinstance(_data, dict) is False or (
+            sorted(_data.keys()) != sorted(BATCH_KEYS)):
+        log.log2warning(1092, _log_message)
+        return []
+    if isinstance(_data['pattoo_key_value_pairs'], dict) is False or (
+            isinstance(_data['pattoo_batch'], list) is False):
+        log.log2warning(1093, _log_message)
+        return []
+
+    # Lookup on a string of pair_id as the JSON is keyed by string integers
+    key_value_pairs = {
+        str(key): value for key, value in _data[
+            'pattoo_key_value_pairs'].items()}
+
+    for item in _data['pattoo_batch']:
+        if isinstance(item, dict) is False or (
+                sorted(item.keys()) != sorted(BATCH_POST_KEYS)) or (
+                    isinstance(item['pattoo_datapoint_pairs'], list) is False):
+            log.log2warning(1094, _log_message)
+            return []
+
+        # Only include the key-value pairs used by the post
+        pairs = {}
+        for pair_ids in item['pattoo_datapoint_pairs']:
+            for pair_id in pair_ids:
+                _id = str(pair_id)
+                if _id not in key_value_pairs:
+                    log.log2warning(1095, _log_message)
+                    return []
+                pairs[_id] = key_value_pairs[_id]
+
+        result.append({
+            'pattoo_agent_id': item['pattoo_agent_id'],
+            'pattoo_agent_polling_interval': item[
+                'pattoo_agent_polling_interval'],
+            'pattoo_agent_timestamp': item['pattoo_agent_timestamp'],
+            'pattoo_datapoints': {
+                'key_value_pairs': pairs,
+                'datapoint_pairs': item['pattoo_datapoint_pairs']}
+        })
+
+    return result
+
+
+def iterencode(_data, chunk_bytes=65536):
+    """Serialize data to JSON in chunks.
+
+    The output is identical to json.dumps(_data). Dicts and lists near the
+    top of the data, such as the key-value pairs and datapoint IDs of posts,
+    are serialized one item at a time so that the complete JSON string never
+    has to be held in memory.
+
+    Args:
+        _data: JSON serializable data
+        chunk_bytes: Approximate size of each chunk
+
+    Returns:
+        None
+
+    Yields:
+        result: Bytes of JSON
+
+    """
+    # Initialize key variables
+    fragments = []
+    size = 0
+
+    # Group fragments into chunks
+    for fragment in _fragments(_data, 3):
+        fragments.append(fragment)
+        size += len(fragment)
+        if size >= chunk_bytes:
+            yield ''.join(fragments).encode()
+            fragments = []
+            size = 0
+    if bool(fragments) is True:
+        yield ''.join(fragments).encode()
+
+
+def _fragments(value, depth):
+    """Serialize a value to JSON fragments.
+
+    Args:
+        value: JSON serializable value
+        depth: Number of levels of nested dicts and lists to serialize one
+            item at a time
+
+    Returns:
+        None
+
+    Yields:
+        result: JSON string fragment
+
+    """
+    # Serialize small or deeply nested values in one step
+    if depth == 0 or isinstance(value, (dict, list, tuple)) is False or (
+            bool(value) is False):
+        yield json.dumps(value)
+
+    elif isinstance(value, dict) is True:
+        separator = '{'
+        for key, item in value.items():
+            # JSON keys are strings. Convert others just like json.dumps
+            if isinstance(key, str) is False:
+                key = json.dumps(key)
+            yield '{}{}: '.format(separator, json.dumps(key))
+            yield from _fragments(item, depth - 1)
+            separator = ', '
+        yield '}'
+
+    else:
+        separator = '['
+        for item in value:
+            yield separator
+            yield from _fragments(item, depth - 1)
+            separator = ', '
+        yield ']'
+
+
+def valid_envelope(body):
+    """Determine whether bytes of JSON look like a posting dict.
+
+    Only the outer structure and the presence of the keys of posting dicts
+    are checked. The JSON isn't parsed.
+
+    Args:
+        body: Bytes of JSON
+
+    Returns:
+        result: True if valid
+
+    """
+    # Test structure
+    if isinstance(body, bytes) is False:
+        return False
+    body = body.strip()
+    if body.startswith(b'{') is False or body.endswith(b'}') is False:
+        return False
+
+    # Test keys
+    for key in CACHE_KEYS + ('key_value_pairs', 'datapoint_pairs'):
+        if '"{}"'.format(key).encode() not in body:
+            return False
+    return True
+
+
+def checksums(keys):
+    """Create the unique checksums of many DataPoints.
+
+    Args:
+        keys: Iterable of (agent_id, target, datapoint_checksum) tuples,
+            such as those of all the records in a payload
+
+    Returns:
+        result: List of checksums in the same order as keys
+
+    """
+    # Initialize key variables
+    cached = _cached_checksum
+    result = []
+
+    # Create checksums. Values that can't be cached are hashed directly
+    for key in keys:
+        try:
+            result.append(cached(*key))
+        except TypeError:
+            result.append(cached.__wrapped__(*key))
+    return result
+
+
+def checksum_cache_info():
+    """Get statistics of the cache of DataPoint checksums.
+
+    Args:
+        None
+
+    Returns:
+        result: functools CacheInfo namedtuple of hits, misses, maxsize and
+            currsize
+
+    """
+    # Get statistics
+    result = _cached_checksum.cache_info()
+    return result
+
+
+def _valid_post(_data):
+    """Determine whether a posting dict has the expected structure.
+
+    Args:
+        _data: Dict created by posting_data_points, or read from cache files
+
+    Returns:
+        result: True if valid
+
+    """
+    # Test structure
+    if isinstance(_data, dict) is False:
+        return False
+    if sorted(_data.keys()) != sorted(CACHE_KEYS):
+        return False
+    if isinstance(_data['pattoo_datapoints'], dict) is False:
+        return False
+    result = False not in [
+        isinstance(_data['pattoo_datapoints'].get('key_value_pairs'), dict),
+        isinstance(_data['pattoo_datapoints'].get('datapoint_pairs'), list)]
+    return result
+
+
 def _keypairs(_data):
     """Make key-pairs from metadata dict.
 
@@ -399,25 +1269,62 @@ def _keypairs(_data):
                 value, str) is False:
             continue
 
-        # Standardize the keys use underscores to separate words
-        splits = re.findall(r"[\w']+", _key)
-        key = '_'.join(splits).lower()
-
         # Update the list
-        result.append(
-            (str(key)[:MAX_KEYPAIR_LENGTH], str(
-                value)[:MAX_KEYPAIR_LENGTH])
-        )
+        result.append((_keypair_key(_key), str(value)[:MAX_KEYPAIR_LENGTH]))
+
+    return result
+
+
+def _keypair_key(_key):
+    """Standardize a metadata key.
 
+    Args:
+        _key: Metadata key string
+
+    Returns:
+        result: Key with underscores separating words
+
+    """
+    # Standardize the keys use underscores to separate words
+    splits = re.findall(r"[\w']+", _key)
+    key = '_'.join(splits).lower()
+    result = str(key)[:MAX_KEYPAIR_LENGTH]
     return result
 
 
 def _checksum(agent_id, target, datapoint_checksum):
     """Create a unique checksum for a DataPoint based on agent and target.
 
+    The same DataPoint is received from the same agent and target every
+    polling cycle, so recent checksums are cached.
+
+    Args:
+        agent_id: Agent ID
+        target: Target polled by the agent
+        datapoint_checksum: Checksum of the DataPoint
+
+    Returns:
+        result: Checksum
+
+    """
+    # Create checksum value
+    try:
+        result = _cached_checksum(agent_id, target, datapoint_checksum)
+    except TypeError:
+        # Values that can't be cached are hashed directly
+        result = _cached_checksum.__wrapped__(
+            agent_id, target, datapoint_checksum)
+    return result
+
+
+@functools.lru_cache(maxsize=_CHECKSUM_CACHE_SIZE, typed=True)
+def _cached_checksum(agent_id, target, datapoint_checksum):
+    """Create a unique checksum for a DataPoint and cache it.
+
     Args:
-        record: PattooDBrecord converted to a Dict
-        metadat: DataPoint Metadata
+        agent_id: Agent ID
+        target: Target polled by the agent
+        datapoint_checksum: Checksum of the DataPoint
 
     Returns:
         result: Checksum
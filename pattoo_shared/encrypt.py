@@ -7,6 +7,17 @@ import os
 import random
 import string
 import stat
+import collections
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from pattoo_shared import cipher
+
+# Report of the files processed by sym_encrypt_files and sym_decrypt_files.
+# bytes is the total size of the files read, and throughput is in bytes
+# per second
+CryptReport = collections.namedtuple(
+    'CryptReport', 'files failures bytes seconds throughput')
 
 
 class Pgpier:
@@ -43,6 +54,10 @@ class Pgpier:
     The module uses one primary public private key pair to encrypt
     data. However, the module can also store other public keys.
 
+    Listing the keys in the keyring starts a gpg process, so the keys
+    are listed once and kept in an in-memory index. The index is
+    rebuilt after keys are generated, imported, trusted or deleted.
+
     """
 
     def __init__(self, working_dir):
@@ -75,6 +90,7 @@ class Pgpier:
         self.passphrase = None
         self.fingerprint = None
         self.keyid = None
+        self._keys = None
 
     def key_pair(self, _name_email, _name_real,
                  _name_comment="auto generated using gnupg.py",
@@ -103,6 +119,7 @@ class Pgpier:
                                             passphrase=self.passphrase)
         # generation of key pair
         key = self.gpg.gen_key(input_data)
+        self.invalidate_keys()
         # print("stderr: ", key.stderr)
         self.fingerprint = key.fingerprint  # store fingerprint in class
 
@@ -145,16 +162,11 @@ class Pgpier:
             None
         """
 
-        keys = self.list_pub_keys()
-        fingerprint = self.fingerprint
+        key = self._key_index()['fingerprints'].get(self.fingerprint)
 
-        if keys != []:
-            for key in keys:
-                if key['fingerprint'] == fingerprint:
-                    # set keyid associated with fingerprint in class
-                    self.keyid = key['keyid']
-        else:
-            pass
+        if key is not None:
+            # set keyid associated with fingerprint in class
+            self.keyid = key['keyid']
 
     def list_pub_keys(self):
         """Method to list all the public keys stored in the GnuPG keyring.
@@ -165,9 +177,54 @@ class Pgpier:
         Returns:
             list: List of dictionaries of each public key stored
         """
-        public_keys = self.gpg.list_keys()
+        public_keys = self._key_index()['keys']
         return public_keys
 
+    def invalidate_keys(self):
+        """Discard the index of the keys in the GnuPG keyring.
+
+        The keys are listed again the next time they are needed.
+        Call this after changing the keyring without using this
+        object.
+
+        Args:
+            None
+
+        Returns:
+            None
+        """
+        self._keys = None
+
+    def _key_index(self):
+        """Get the index of the keys in the GnuPG keyring.
+
+        Args:
+            None
+
+        Returns:
+            dict: 'keys' is the list of dictionaries of each public
+                  key. 'fingerprints' maps each fingerprint to its
+                  dictionary. 'emails' maps each email address to
+                  the fingerprint of the first key with a uid using
+                  the address
+        """
+        if self._keys is None:
+            keys = self.gpg.list_keys()
+            fingerprints = {}
+            emails = {}
+
+            for key in keys:
+                fingerprints[key['fingerprint']] = key
+                for uid in key['uids']:
+                    email = _uid_email(uid)
+                    if email is not None:
+                        emails.setdefault(email, key['fingerprint'])
+
+            self._keys = {'keys': keys,
+                          'fingerprints': fingerprints,
+                          'emails': emails}
+        return self._keys
+
     def exp_main(self, _wrapper='(main)'):
         """Export pertinent information.
 
@@ -344,6 +401,7 @@ class Pgpier:
         gpg = self.gpg
 
         import_result = gpg.import_keys(key_data)
+        self.invalidate_keys()
 
         # Returns the amount of: imported, not imported
         result = {"imported": import_result.imported,
@@ -372,50 +430,54 @@ class Pgpier:
                 f.write(pub_key)
 
     def sym_encrypt_files(self, symmetric_key, file_path, output,
-                          delaf=False, algorithm='AES256', armor=True):
+                          delaf=False, algorithm='AES256', armor=True,
+                          workers=None, progress=None):
         """Method to encrypt files using a symmetric key.
 
+        Files are streamed through gpg rather than read into
+        memory, and several files are encrypted at the same time.
+        Each encrypted file replaces its original once it is
+        complete.
+
         Args:
             symmetric_key (str): String of passphrase to be
             used to encrypt the data
             file_path (str): Absolute file path to the files to be encrypted
             output (str): Absolute file path to intended file output
-            delaf (bool): True if the files should be deleted after encryption
-                          Fasle if the files should be kept after
-                          encryption
+            delaf (bool): True if the files should be moved to output
+                          after encryption
+                          Fasle if the files should be kept
+                          in file_path after encryption
             algorithm (str): The type of algorithm to be used to encrypt
                              the data
             armor (bool): True for the return type to be in ASCII string
                           False for the return type to be Crypt object
+            workers (int): Maximum number of files encrypted at the
+                           same time. The number of CPUs if None
+            progress (function): Called with the CryptReport of the
+                                 files processed so far after each file
 
         Returns:
-            None
+            CryptReport: Report of the files encrypted
         """
         gpg = self.gpg
 
-        files_dir = []
-
-        files = [f for f in os.listdir(file_path)]
-
-        for f in files:
-            files_dir.append('{}'.format(f))
-
-        for x in files_dir:
-            with open('{}{}{}'.format(file_path, os.sep, x), '{}'
-                      .format('r')) as f:
-                contents = f.read()
-                gpg.encrypt(contents, symmetric=algorithm,
-                            passphrase=symmetric_key, armor=armor,
-                            recipients=None, output='{}{}{}'.format(file_path,
-                            os.sep, files_dir[files_dir.index(x)]))
-                # print("ok: ", crypt.ok)
-                # print("status: ", crypt.status)
-                # print("stderr: ", crypt.stderr)
-            if delaf:
-                os.rename('{}{}{}'.format(file_path, os.sep,
-                          files_dir[files_dir.index(x)]), '{}{}{}'
-                          .format(output, os.sep,
-                          files_dir[files_dir.index(x)]))
+        def _encrypt(filename):
+            """Encrypt a file. Returns the size of the file."""
+            source = os.path.join(file_path, filename)
+            destination = os.path.join(
+                output if delaf else file_path, filename)
+            size = os.path.getsize(source)
+
+            with open(source, 'rb') as f:
+                crypt = gpg.encrypt_file(
+                    f, recipients=None, symmetric=algorithm,
+                    passphrase=symmetric_key, armor=armor,
+                    output='{}.tmp'.format(source))
+            return _replace(crypt, source, destination, size)
+
+        result = _process_files(_encrypt, file_path, workers, progress)
+        return result
 
     def encrypt_data(self, data, recipients):
         """Encrypt data.
@@ -437,9 +499,13 @@ class Pgpier:
         ascii_str = str(encrypted_ascii_data)
         return ascii_str
 
-    def sym_decrypt_files(self, symmetric_key, file_path, output, delaf=False):
+    def sym_decrypt_files(self, symmetric_key, file_path, output,
+                          delaf=False, workers=None, progress=None):
         """Method to decrypt files using a symmetric key.
 
+        Files are streamed through gpg rather than read into
+        memory, and several files are decrypted at the same time.
+
         Args:
             symmetric_key (str): String of passphrase to be used
             to decrypt the data
@@ -450,40 +516,33 @@ class Pgpier:
                           decryption
                           Fasle if the files should be kept after
                           decryption
-            algorithm (str): The type of algorithm that was used to
-                             encrypt the data
-            armor (bool): True for the return type to be in ASCII string
-                          False for the return type to be Crypt object
+            workers (int): Maximum number of files decrypted at the
+                           same time. The number of CPUs if None
+            progress (function): Called with the CryptReport of the
+                                 files processed so far after each file
 
         Returns:
-            None
+            CryptReport: Report of the files decrypted
         """
         gpg = self.gpg
 
-        files_dir = []
-
-        files = [f for f in os.listdir(file_path)]
-
-        for f in files:
-            files_dir.append('{}'.format(f))
-
-        for x in files_dir:
-            with open('{}{}{}'.format(file_path, os.sep, x),
-                      '{}'.format('r')) as f:
-                crypt = f.read()
-                # print(crypt)
-                data = gpg.decrypt(crypt, passphrase=symmetric_key)
-                de_data = (data.data).decode('utf-8')
-                # print('\n\n\n\n--->{}<---\n\n\n'.format(de_data))
-                with open('{}{}{}'.format(output, os.sep,
-                          files_dir[files_dir.index(x)]),
-                          '{}'.format('w')) as decrypted:
-                    decrypted.write(de_data)
-                # print("ok: ", data.ok)
-                # print("status: ", data.status)
-                # print("stderr: ", data.stderr)
-            if delaf:
-                os.remove('{}{}{}'.format(file_path, os.sep, x))
+        def _decrypt(filename):
+            """Decrypt a file. Returns the size of the file."""
+            source = os.path.join(file_path, filename)
+            destination = os.path.join(output, filename)
+            size = os.path.getsize(source)
+
+            with open(source, 'rb') as f:
+                crypt = gpg.decrypt_file(
+                    f, passphrase=symmetric_key,
+                    output='{}.tmp'.format(destination))
+            size = _replace(crypt, None, destination, size)
+            if delaf and size is not None:
+                os.remove(source)
+            return size
+
+        result = _process_files(_decrypt, file_path, workers, progress)
+        return result
 
     def decrypt_data(self, data, passphrase):
         """Decrypt data.
@@ -521,19 +580,13 @@ class Pgpier:
             None: If no associated fingerprint is found
         """
 
-        # Gets all available public keys in keyring
-        keys = self.list_pub_keys()
-
-        result = None
+        # Look up the email address in the index of the keyring
+        result = self._key_index()['emails'].get(email)
 
-        for key in keys:  # Go through each public key
-            uids = list(filter((lambda item: email in item), key['uids']))
-            if uids != []:
-                parts = uids[0].split(' ')
-                wrapped_email = list(filter((lambda item: '<' in item), parts))
-                unwrapped_email = wrapped_email[0].strip('<>')
-                if unwrapped_email == email:
-                    return key['fingerprint']
+        # Keys may have been imported by another process
+        if result is None:
+            self.invalidate_keys()
+            result = self._key_index()['emails'].get(email)
 
         return result
 
@@ -554,6 +607,7 @@ class Pgpier:
         gpg = self.gpg
 
         gpg.trust_keys(fingerprint, trustlevel)
+        self.invalidate_keys()
 
     def symmetric_encrypt(self, data, passphrase,
                           algorithm='AES256', armor=True):
@@ -585,6 +639,9 @@ class Pgpier:
     def symmetric_decrypt(self, data, passphrase):
         """Method to decrypt data that was encrypted using symmetric encryption.
 
+        Data encrypted in-process by cipher.AESGCMCipher is also
+        decrypted
+
         Args:
             data (str): Data in ASCII string to be decrypted
             passphrase (str): Passphrase used in the encryption
@@ -592,6 +649,9 @@ class Pgpier:
         Returns:
             str: ASCII string of decrypted data
         """
+        if data.startswith(cipher.PREFIX):
+            return cipher.AESGCMCipher().decrypt(data, passphrase)
+
         gpg = self.gpg
 
         data = gpg.decrypt(data, passphrase=passphrase)
@@ -620,6 +680,7 @@ class Pgpier:
 
         # Deletes public key
         result = gpg.delete_keys(fingerprint)
+        self.invalidate_keys()
 
         if str(result) == 'ok':
             output = True
@@ -639,20 +700,110 @@ class Pgpier:
             None
         """
 
-        # Retrieve gnupg object and set fingerprint
-        gpg = self.gpg
-        fp = self.fingerprint
-
-        # Lists keys from keyring
-        keys = gpg.list_keys()
-
-        for key in keys:
-            if key['fingerprint'] == fp:
-                # Removes space from uids value and returns the items in a list
-                uids = key['uids'][0].split(' ')
-                # Gets the email from the items which is
-                # wrapped by "<"<email@example.com>">"
-                wrapped_email = list(filter((lambda item: '<' in item), uids))
-                # Removes "<" and ">" from email
-                email = wrapped_email[0].strip('<>')
-                self.email_addr = email
+        # Retrieve the key of the set fingerprint from the index
+        key = self._key_index()['fingerprints'].get(self.fingerprint)
+
+        if key is not None:
+            # Gets the email from the first uid
+            self.email_addr = _uid_email(key['uids'][0])
+
+
+def _uid_email(uid):
+    """Get the email address of a key uid.
+
+    Args:
+        uid (str): uid of a key, such as
+                   'Name (comment) <email@example.com>'
+
+    Returns:
+        str: Email address
+        None: If the uid has no email address
+    """
+    # Gets the email from the items of the uid which is
+    # wrapped by "<" and ">"
+    wrapped_email = list(filter((lambda item: '<' in item), uid.split(' ')))
+    if wrapped_email == []:
+        return None
+    return wrapped_email[0].strip('<>')
+
+
+def _replace(crypt, source, destination, size):
+    """Move a file created by gpg to its destination.
+
+    Args:
+        crypt (obj): Crypt object of the gpg output written to the
+                     destination with a '.tmp' suffix
+        source (str): File to remove once the destination is created.
+                      None if no file should be removed
+        destination (str): Destination file
+        size (int): Size of the file processed by gpg
+
+    Returns:
+        int: size if gpg succeeded
+        None: If gpg failed
+    """
+    temporary = '{}.tmp'.format(
+        source if source is not None else destination)
+    if not crypt.ok:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+        return None
+
+    os.replace(temporary, destination)
+    if source is not None and source != destination:
+        os.remove(source)
+    return size
+
+
+def _process_files(function, file_path, workers, progress):
+    """Process the files of a directory concurrently.
+
+    Args:
+        function (function): Function called with the name of each
+                             file. Returns the size of the file, or
+                             None if it failed
+        file_path (str): Directory of the files
+        workers (int): Maximum number of files processed at the
+                       same time. The number of CPUs if None
+        progress (function): Called with the CryptReport of the files
+                             processed so far after each file
+
+    Returns:
+        CryptReport: Report of the files processed
+    """
+    start = time.time()
+    files = 0
+    failures = 0
+    total = 0
+    report = CryptReport(0, 0, 0, 0, 0)
+
+    filenames = sorted(
+        filename for filename in os.listdir(file_path)
+        if os.path.isfile(os.path.join(file_path, filename)))
+    if not filenames:
+        return report
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    # gpg does the work in its own processes, so threads are sufficient
+    with ThreadPoolExecutor(
+            max_workers=max(1, min(workers, len(filenames)))) as executor:
+        futures = [executor.submit(function, filename)
+                   for filename in filenames]
+        for future in as_completed(futures):
+            size = future.result()
+            files += 1
+            if size is None:
+                failures += 1
+            else:
+                total += size
+
+            seconds = time.time() - start
+            report = CryptReport(
+                files, failures, total, seconds,
+                total / seconds if seconds > 0 else 0)
+            if progress is not None:
+                progress(report)
+
+    return report
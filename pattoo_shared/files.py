@@ -322,42 +322,32 @@ def read_json_files(_directory, die=True, age=0, count=None):
     result = []
     processed = 0
 
-    # Set age
-    try:
-        age = float(age)
-    except:
-        age = 0
-
     # Verify directory
     if os.path.isdir(_directory) is False:
         log_message = 'Directory "{}" doesn\'t exist!'.format(_directory)
         log.log2die(1009, log_message)
 
-    # Cycle through list of files in directory
-    for filename in sorted(os.listdir(_directory)):
-        # Examine all the '.json' files in directory
-        if filename.endswith('.json'):
-            # Read file and add to tuple list
-            filepath = '{}{}{}'.format(_directory, os.sep, filename)
-            fileage = time.time() - os.stat(filepath).st_mtime
-            if fileage > age:
-                _data = read_json_file(filepath, die=die)
-                if bool(_data) is True:
-                    # JSON files found
-                    json_found = True
-                    result.append((filepath, _data))
-                else:
-                    # Ignore, don't update 'processed' value
-                    log_message = ('''\
+    # Cycle through list of files in directory. Files younger than age are
+    # skipped, and aren't included in count
+    for filepath in json_filepaths(_directory, age=age):
+        # Read file and add to tuple list
+        _data = read_json_file(filepath, die=die)
+        if bool(_data) is True:
+            # JSON files found
+            json_found = True
+            result.append((filepath, _data))
+        else:
+            # Ignore, don't update 'processed' value
+            log_message = ('''\
 Error reading file {}. Ignoring.'''.format(filepath))
-                    log.log2debug(1053, log_message)
-                    continue
+            log.log2debug(1053, log_message)
+            continue
 
-            # Stop if necessary
-            processed += 1
-            if bool(count) is True:
-                if processed == count:
-                    break
+        # Stop if necessary
+        processed += 1
+        if bool(count) is True:
+            if processed == count:
+                break
 
     # Verify JSON files found in directory. We cannot use logging as it
     # requires a logfile location from the configuration directory to work
@@ -373,6 +363,46 @@ Error reading file {}. Ignoring.'''.format(filepath))
     return result
 
 
+def json_filepaths(_directory, age=0):
+    """Get the paths of all JSON files in a directory.
+
+    Args:
+        _directory: Directory with JSON files
+        age: Minimum age of files in seconds
+
+    Returns:
+        result: Sorted list of filepaths. Sorting is important as it causes
+            the files with the older timestamp names to be processed first
+
+    """
+    # Initialize key variables
+    result = []
+
+    # Set age
+    try:
+        age = float(age)
+    except:
+        age = 0
+
+    # Verify directory
+    if os.path.isdir(_directory) is False:
+        log_message = 'Directory "{}" doesn\'t exist!'.format(_directory)
+        log.log2die(1130, log_message)
+
+    # Cycle through list of files in directory
+    now = time.time()
+    for filename in sorted(os.listdir(_directory)):
+        # Examine all the '.json' files in directory
+        if filename.endswith('.json'):
+            filepath = '{}{}{}'.format(_directory, os.sep, filename)
+            fileage = now - os.stat(filepath).st_mtime
+            if fileage > age:
+                result.append(filepath)
+
+    # Return
+    return result
+
+
 def read_json_file(filepath, die=True):
     """Read the contents of a YAML file.
 
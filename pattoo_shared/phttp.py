@@ -5,23 +5,548 @@
 import os
 import sys
 import json
+import random
+import gzip
+import zlib
+import hashlib
 import urllib
 import collections
+import itertools
+import threading
 from time import time
+from urllib.parse import urlsplit
+from concurrent.futures import ThreadPoolExecutor
 
 # pip3 libraries
 import requests
+from requests.adapters import HTTPAdapter
 
 # Pattoo libraries
 from pattoo_shared import log
-from pattoo_shared.configuration import Config
+from pattoo_shared import cache
+from pattoo_shared import codec
+from pattoo_shared import cipher
+from pattoo_shared.configuration import Config, BaseConfig
 from pattoo_shared import converter
+from pattoo_shared.variables import AgentPolledData
 
 # Save items needed for encrypted purging inside a named tuple
 EncryptionSuite = collections.namedtuple(
     'EncryptionSuite',
     'post gpg symmetric_key session')
 
+# Latency statistics of polling a passive agent. Skipped polls returned data
+# that hadn't changed since the previous poll
+LatencyStats = collections.namedtuple(
+    'LatencyStats',
+    'polls failures last mean maximum skipped')
+
+# Define global variables for the process wide HTTP transport, the circuit
+# breakers of each server, the delta encoding sessions of each agent and the
+# encrypted sessions of each server
+TRANSPORT = {}
+BREAKERS = {}
+ENCODERS = {}
+SESSIONS = {}
+_TRANSPORT_LOCK = threading.Lock()
+
+# Circuit breaker states
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half-open'
+
+# HTTP status codes of encrypted posts whose symmetric key wasn't accepted
+REJECTED = (401, 403, 409)
+
+
+class _Session(requests.Session):
+    """Requests session that applies default timeouts to every request."""
+
+    def __init__(self, timeout):
+        """Initialize the class.
+
+        Args:
+            timeout: Default (connect, read) timeout tuple in seconds
+
+        Returns:
+            None
+
+        """
+        # Initialize key variables
+        requests.Session.__init__(self)
+        self.timeout = timeout
+
+    def request(self, method, url, **kwargs):
+        """Make a request applying the default timeout if none is given.
+
+        Args:
+            method: HTTP method
+            url: URL to contact
+            kwargs: Keyword arguments for requests.Session.request
+
+        Returns:
+            result: requests.Response object
+
+        """
+        # Apply default timeout
+        if kwargs.get('timeout') is None:
+            kwargs['timeout'] = self.timeout
+        result = requests.Session.request(self, method, url, **kwargs)
+        return result
+
+
+class Transport():
+    """Pooled keep-alive HTTP transport shared by all posts in a process.
+
+    A single connection pool is kept per pattoo server so that successive
+    posts reuse established TCP (and TLS) connections instead of paying for
+    a new handshake on every request.
+
+    """
+
+    def __init__(self, config=None):
+        """Initialize the class.
+
+        Args:
+            config: BaseConfig object. Read from pattoo.yaml if None
+
+        Returns:
+            None
+
+        """
+        # Initialize key variables
+        if config is None:
+            config = BaseConfig()
+        self.pool_size = config.http_pool_size()
+        self.timeout = (
+            config.http_connect_timeout(), config.http_read_timeout())
+        self.compression = config.http_compression()
+        self.compression_threshold = config.http_compression_threshold()
+        self.compression_level = config.http_compression_level()
+        self.chunk_bytes = config.http_chunk_bytes()
+        self.codec = codec.codec(config.http_codec())
+        self.encryption_cipher = config.http_encryption_cipher()
+        if self.encryption_cipher == cipher.AESGCMCipher.name and (
+                cipher.available() is False):
+            log_message = ('''\
+The "cryptography" package is not installed. Encrypting with GnuPG instead \
+of AES-GCM.''')
+            log.log2warning(1127, log_message)
+            self.encryption_cipher = cipher.GnuPGCipher.name
+
+        # Connection pools are held by the adapter so that they can be
+        # shared between sessions that need their own cookies
+        self._adapter = HTTPAdapter(
+            pool_connections=self.pool_size, pool_maxsize=self.pool_size)
+        self.session = self.new_session()
+
+    def new_session(self):
+        """Create a session that uses the shared connection pools.
+
+        Args:
+            None
+
+        Returns:
+            session: _Session object
+
+        """
+        # Mount the shared adapter
+        session = _Session(self.timeout)
+        session.mount('http://', self._adapter)
+        session.mount('https://', self._adapter)
+        return session
+
+    def encode(self, data, encoder=None):
+        """Create the keyword arguments needed to post data.
+
+        Data is encoded with the configured codec. Bytes are JSON that has
+        already been encoded, and are posted unchanged. The body is compressed
+        if compression is configured and the body is large enough to benefit.
+        If chunked transfer encoding is configured, JSON bodies are created
+        and compressed one chunk at a time while they are being posted.
+
+        Args:
+            data: JSON serializable data to post, or bytes of JSON
+            encoder: Codec object to use instead of the configured one
+
+        Returns:
+            result: Dict of keyword arguments for requests.Session.post
+
+        """
+        # Initialize key variables
+        raw = isinstance(data, bytes)
+        if raw is True:
+            encoder = codec.codec('json')
+        elif encoder is None:
+            encoder = self.codec
+        json_ = encoder.name == 'json' and raw is False
+
+        # Stream JSON bodies
+        if bool(self.chunk_bytes) is True and json_ is True:
+            body = converter.iterencode(data, self.chunk_bytes)
+            headers = {'Content-Type': 'application/json'}
+            if self.compression is not None:
+                body = compress_chunks(
+                    body, self.compression, self.compression_level)
+                headers['Content-Encoding'] = self.compression
+            result = {'data': body, 'headers': headers}
+            return result
+
+        # Don't compress JSON
+        result = {'json': data}
+        if self.compression is None and json_ is True:
+            return result
+
+        # Compress
+        body = data if raw is True else encoder.encode(data)
+        headers = {'Content-Type': encoder.content_type}
+        if self.compression is not None and (
+                len(body) >= self.compression_threshold):
+            (body, encoding) = compress(
+                body, self.compression, self.compression_level)
+            headers.update(encoding)
+        elif json_ is True:
+            return result
+        result = {'data': body, 'headers': headers}
+        return result
+
+    def post(self, url, **kwargs):
+        """Post to a URL using the shared session.
+
+        Args:
+            url: URL to receive posted data
+            kwargs: Keyword arguments for requests.Session.post
+
+        Returns:
+            result: requests.Response object
+
+        """
+        # Post
+        result = self.session.post(url, **kwargs)
+        return result
+
+    def close(self):
+        """Close all pooled connections.
+
+        Args:
+            None
+
+        Returns:
+            None
+
+        """
+        # Close
+        self.session.close()
+        self._adapter.close()
+
+
+class CircuitBreaker():
+    """Stops posting to a pattoo server that keeps failing.
+
+    The breaker is closed while the server works. It opens after a number of
+    consecutive failures, and posts are then cached without contacting the
+    server. Once a jittered, exponentially increasing delay has passed the
+    breaker is half-open, and a single post is allowed through to test the
+    server. The breaker closes if it succeeds, otherwise it opens again with
+    a longer delay.
+
+    """
+
+    def __init__(self, server, config=None):
+        """Initialize the class.
+
+        Args:
+            server: Server URL prefix of scheme and network location
+            config: BaseConfig object. Read from pattoo.yaml if None
+
+        Returns:
+            None
+
+        """
+        # Initialize key variables
+        if config is None:
+            config = BaseConfig()
+        self.server = server
+        self.threshold = config.http_breaker_threshold()
+        self.initial = config.http_backoff_initial()
+        self.maximum = config.http_backoff_max()
+        self.state = CLOSED
+        self.failures = 0
+        self.opened = 0
+        self.retry = 0
+        self._trial = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """Determine whether a post may contact the server.
+
+        Args:
+            None
+
+        Returns:
+            result: True if the server may be contacted
+
+        """
+        # Initialize key variables
+        result = True
+
+        with self._lock:
+            if self.state == OPEN:
+                if time() >= self.retry:
+                    # Let one post test the server
+                    self.state = HALF_OPEN
+                    self._trial = True
+                else:
+                    result = False
+            elif self.state == HALF_OPEN:
+                # Only one post tests the server at a time
+                result = self._trial is False
+                self._trial = True
+        return result
+
+    def blocked(self):
+        """Determine whether the server can't be contacted yet.
+
+        Unlike allow(), this never changes the state of the breaker.
+
+        Args:
+            None
+
+        Returns:
+            result: True if the breaker is open and the delay hasn't passed
+
+        """
+        # Check
+        with self._lock:
+            result = self.state == OPEN and time() < self.retry
+        return result
+
+    def success(self):
+        """Record a successful post.
+
+        Args:
+            None
+
+        Returns:
+            None
+
+        """
+        # Close
+        with self._lock:
+            if self.state != CLOSED:
+                log_message = ('''\
+Server {} is working again after failing {} times. Resuming posts.\
+'''.format(self.server, self.failures))
+                log.log2info(1112, log_message)
+            self.state = CLOSED
+            self.failures = 0
+            self.opened = 0
+            self._trial = False
+
+    def failure(self):
+        """Record a failed post.
+
+        Args:
+            None
+
+        Returns:
+            None
+
+        """
+        # Initialize key variables
+        if bool(self.threshold) is False:
+            return
+
+        with self._lock:
+            self.failures += 1
+            self._trial = False
+            if self.state == HALF_OPEN or self.failures >= self.threshold:
+                # Wait longer each time the server fails to recover. Jitter
+                # stops many agents from retrying at the same time
+                self.opened += 1
+                exponent = min(self.opened - 1, 32)
+                delay = min(self.maximum, self.initial * (2 ** exponent))
+                delay = (delay / 2) + random.uniform(0, delay / 2)
+                self.retry = time() + delay
+                self.state = OPEN
+
+                log_message = ('''\
+Server {} failed {} times. Caching posts without contacting it for {:.1f}s.\
+'''.format(self.server, self.failures, delay))
+                log.log2warning(1111, log_message)
+
+
+class EncryptedSession():
+    """Symmetric key and session negotiated with a pattoo server.
+
+    Negotiating a key with key_exchange() takes up to three requests. The key
+    and the session cookies that identify it are reused by all the encrypted
+    posts of the process, so each post only takes a single request. A new key
+    is negotiated once the key expires, or when the server rejects it.
+
+    """
+
+    def __init__(self, gpg, exchange_url, validation_url, config=None):
+        """Initialize the class.
+
+        Args:
+            gpg: Pgpier object to accommodate encryption
+            exchange_url: URL for exchanging public keys
+            validation_url: URL for validating the symmetric key
+            config: BaseConfig object. Read from pattoo.yaml if None
+
+        Returns:
+            None
+
+        """
+        # Initialize key variables
+        if config is None:
+            config = BaseConfig()
+        self.ttl = config.http_encryption_ttl()
+        self.symmetric_key = None
+        self.session = None
+        self.expires = 0
+        self.negotiations = 0
+        self._gpg = gpg
+        self._exchange_url = exchange_url
+        self._validation_url = validation_url
+        self._condition = threading.Condition()
+        self._negotiating = False
+        self._attempts = 0
+
+    def get(self):
+        """Get the negotiated key, negotiating a new one if required.
+
+        Only one thread negotiates at a time. Other threads wait for it
+        without holding the lock, and use its result.
+
+        Args:
+            None
+
+        Returns:
+            result: Tuple of (symmetric_key, session). None if the key
+                exchange failed
+
+        """
+        with self._condition:
+            # Wait for any negotiation in progress to finish
+            attempts = self._attempts
+            while self._negotiating is True:
+                self._condition.wait()
+            if self.session is not None and time() < self.expires:
+                return (self.symmetric_key, self.session)
+            if attempts != self._attempts:
+                # The negotiation we waited for failed
+                return None
+
+            # Claim the negotiation of a new key with a new session
+            self.session = None
+            self._negotiating = True
+            self.negotiations += 1
+
+        # Negotiate without holding the lock
+        session = None
+        symmetric_key = None
+        _breaker = breaker(self._exchange_url)
+        try:
+            if _breaker.allow() is False:
+                log_message = ('''\
+Server {} keeps failing. Not negotiating an encryption key.\
+'''.format(self._exchange_url))
+                log.log2debug(1135, log_message)
+            else:
+                try:
+                    session = transport().new_session()
+                    symmetric_key = self._gpg.gen_symm_key(20)
+                    exchanged = key_exchange(
+                        self._gpg, session, self._exchange_url,
+                        self._validation_url, symmetric_key)
+                except:
+                    # Don't leave a half-open breaker waiting for a result
+                    session = None
+                    _breaker.failure()
+                    raise
+                if exchanged is True:
+                    _breaker.success()
+                else:
+                    _breaker.failure()
+                    session = None
+        finally:
+            with self._condition:
+                if session is not None:
+                    self.session = session
+                    self.symmetric_key = symmetric_key
+                    self.expires = time() + self.ttl
+                self._attempts += 1
+                self._negotiating = False
+                self._condition.notify_all()
+
+        # Return
+        if session is None:
+            return None
+        return (symmetric_key, session)
+
+    def invalidate(self, session):
+        """Stop using a session so that a new key is negotiated.
+
+        Args:
+            session: Session returned by get(). Newer sessions aren't
+                affected
+
+        Returns:
+            None
+
+        """
+        # Invalidate
+        with self._condition:
+            if session is self.session:
+                self.session = None
+
+    def post(self, url, data, identifier, save=True):
+        """Post encrypted data to the API server.
+
+        Args:
+            url: URL to receive posted data
+            data: Data dict to post
+            identifier: Unique identifier for the source of the data.
+                (AgentID)
+            save: When True, save data to cache directory if posting fails
+
+        Returns:
+            success: True: if successful
+
+        """
+        # Initialize key variables
+        success = False
+
+        # Fail if nothing to post
+        if isinstance(data, dict) is False or bool(data) is False:
+            return success
+
+        # Try again once with a new key if the server rejects the key
+        for _ in range(2):
+            negotiated = self.get()
+            if negotiated is None:
+                break
+            (symmetric_key, session) = negotiated
+            status = encrypted_post(
+                self._gpg, symmetric_key, session, url, data, identifier,
+                save=False, status=True)
+            if status in REJECTED:
+                log_message = (
+                    'Server {} rejected the encryption key. Negotiating a '
+                    'new key.'.format(url))
+                log.log2info(1126, log_message)
+                self.invalidate(session)
+                continue
+            success = status == 202
+            break
+
+        # Save data to cache
+        if success is False and save is True:
+            _save_data(data, identifier)
+        return success
+
 
 class _Post():
     """Abstract class to prepare data for posting to remote pattoo server."""
@@ -30,7 +555,7 @@ class _Post():
 
         Args:
             identifier: Unique identifier for the source of the data. (AgentID)
-            data: dict of data to post
+            data: dict of data to post, or bytes of JSON to post unchanged
 
         Returns:
             None
@@ -86,6 +611,8 @@ class Post(_Post):
         _Post.__init__(self, identifier, data)
         # URL to post to API server
         self._url = self.config.agent_api_server_url(identifier)
+        self._delta = self.config.http_delta_encoding()
+        self._delta_url = self.config.agent_api_delta_url()
 
     def post(self):
         """Post data to central server.
@@ -102,7 +629,11 @@ class Post(_Post):
 
         # Post data
         if bool(self._data) is True:
-            success = post(self._url, self._data, self._identifier)
+            if self._delta is True and isinstance(self._data, dict) is True:
+                success = post_delta(
+                    self._delta_url, self._data, self._identifier)
+            else:
+                success = post(self._url, self._data, self._identifier)
         else:
             log_message = ('''\
 Blank data. No data to post from identifier {}.'''.format(self._identifier))
@@ -156,6 +687,10 @@ class EncryptedPost(_Post):
     the symmetric key. The data is decrypted once received
     by the API server. See encrypt.py for more details on
     the module.
+
+    The negotiated symmetric key is shared with all other
+    EncryptedPost objects of the process that post to the
+    same API server. See EncryptedSession.
     """
 
     def __init__(self, identifier, data, gpg):
@@ -178,14 +713,9 @@ class EncryptedPost(_Post):
         self._validate_key = self.config.agent_api_validation_url()
         self._encryption = self.config.agent_api_encrypted_url()
 
-        # Get requirements for key exchange
-        self._session = requests.Session()
-        # Turn off HTTP Persistent connection
-        self._session.keep_alive = False
-
-        # Encryption requirements
-        # Random str of len 20
-        self._symmetric_key = self._gpg.gen_symm_key(20)
+        # Get the key exchange session shared by posts to the API server
+        self._encrypted = encrypted_session(
+            gpg, self._exchange_key, self._validate_key)
 
     def purge(self):
         """Purge.
@@ -209,13 +739,8 @@ class EncryptedPost(_Post):
         if exchanged is False:
             return result
 
-        # Add data to named tuple for encrypted_post
-        suite = EncryptionSuite(
-            encrypted_post, self._gpg,
-            self._symmetric_key, self._session)
-
         # Purge data, encrypt and send to API
-        purge(self._encryption, self._identifier, suite)
+        purge(self._encryption, self._identifier, self._encrypted.post)
 
     def post(self):
         """Send encrypted data to the API server.
@@ -239,9 +764,8 @@ class EncryptedPost(_Post):
 
         # Post data
         if bool(self._data) is True:
-            result = encrypted_post(self._gpg, self._symmetric_key,
-                                    self._session, self._encryption,
-                                    self._data, self._identifier)
+            result = self._encrypted.post(
+                self._encryption, self._data, self._identifier)
         else:
             log_message = ('Blank data. No data to post from '
                            'identifier {}.'.format(self._identifier))
@@ -254,6 +778,7 @@ class EncryptedPost(_Post):
 
         Exchanges public keys and
         sets a symmetric key for encryption
+        unless a key has already been negotiated
 
         Args:
             gpg (obj): Pgpier object to facilitate encryption
@@ -263,8 +788,7 @@ class EncryptedPost(_Post):
                     False if the exchange failed
         """
 
-        result = key_exchange(self._gpg, self._session, self._exchange_key,
-                              self._validate_key, self._symmetric_key)
+        result = self._encrypted.get() is not None
 
         return result
 
@@ -298,6 +822,87 @@ class PostAgent(Post):
         Post.__init__(self, identifier, data)
 
 
+class PostBatch(_Post):
+    """Class to post many AgentPolledData objects in a single request.
+
+    The posts share a single dict of key-value pairs, which reduces both the
+    number of requests and the size of the data sent to the pattoo server.
+
+    """
+
+    def __init__(self, items):
+        """Initialize the class.
+
+        Args:
+            items: List of AgentPolledData objects, or dicts of previously
+                cached data
+
+        Returns:
+            None
+
+        """
+        # Initialize key variables
+        posts = []
+
+        for item in items:
+            if isinstance(item, AgentPolledData) is True:
+                # Log message that ties the identifier to an agent_program
+                _log(item.agent_program, item.agent_id)
+
+                # Don't post if agent data is invalid
+                if item.valid is False:
+                    continue
+                _data = converter.agentdata_to_post(item)
+                posts.append(converter.posting_data_points(_data))
+            elif isinstance(item, dict) is True and bool(item) is True:
+                posts.append(item)
+
+        # Initialize key variables
+        identifiers = set(
+            _.get('pattoo_agent_id') for _ in posts if isinstance(
+                _.get('pattoo_agent_id'), str))
+        _Post.__init__(self, sorted(identifiers), posts)
+
+        # URL to post to API server
+        self._url = self.config.agent_api_batch_url()
+
+    def post(self):
+        """Post data to central server.
+
+        Args:
+            None
+
+        Returns:
+            success: True: if successful
+
+        """
+        # Initialize key variables
+        success = False
+
+        # Post data
+        if bool(self._data) is True:
+            success = post_batch(self._url, self._data)
+        else:
+            log_message = 'Blank data. No batch data to post.'
+            log.log2warning(1102, log_message)
+
+        return success
+
+    def purge(self):
+        """Purge data from cache by posting to central server.
+
+        Args:
+            None
+
+        Returns:
+            None
+
+        """
+        # Purge the cache of each identifier in the batch
+        for identifier in self._identifier:
+            purge(self.config.agent_api_server_url(identifier), identifier)
+
+
 class EncryptedPostAgent(EncryptedPost):
     """Encrypted Post Agent.
 
@@ -331,24 +936,54 @@ class EncryptedPostAgent(EncryptedPost):
 
 
 class PassiveAgent():
-    """Gets data from passive Pattoo Agents for relaying to pattoo API."""
+    """Gets data from passive Pattoo Agents for relaying to pattoo API.
 
-    def __init__(self, agent_program, identifier, url):
+    Polls are conditional. The ETag and Last-Modified headers of the previous
+    response are sent back to the passive agent, and the hash of the previous
+    response is kept for agents that don't support them. Data that hasn't
+    changed since the previous poll is neither parsed nor posted again.
+
+    """
+
+    def __init__(self, agent_program, identifier, url, timeout=None,
+                 passthrough=None):
         """Initialize the class.
 
         Args:
             agent_program: Agent program name
             identifier: Unique identifier for the source of the data. (AgentID)
             url: URL of content to be retrieved from passive Pattoo agent
+            timeout: Seconds to wait for the passive agent to respond. Read
+                from pattoo.yaml if None
+            passthrough: True if the retrieved JSON is relayed unchanged
+                without being parsed. Read from pattoo.yaml if None
 
         Returns:
             None
 
         """
-        # Initialize key variables
+        # Initialize key variables. Only read pattoo.yaml once, and only if
+        # a default is required
+        if timeout is None or passthrough is None:
+            config = BaseConfig()
+            if timeout is None:
+                timeout = config.passive_agent_timeout()
+            if passthrough is None:
+                passthrough = config.passive_agent_passthrough()
         self._url = url
         self._identifier = identifier
         self._agent_program = agent_program
+        self._timeout = timeout
+        self._passthrough = passthrough
+        self._polls = 0
+        self._failures = 0
+        self._last = None
+        self._total = 0
+        self._maximum = 0
+        self._skipped = 0
+        self._etag = None
+        self._modified = None
+        self._digest = None
 
     def relay(self):
         """Forward data polled from remote pattoo passive agent.
@@ -360,9 +995,20 @@ class PassiveAgent():
             None
 
         """
-        # Get data
-        data = self.get()
+        # Get data. Only check the structure of data that is passed through
         identifier = self._identifier
+        if self._passthrough is True:
+            (data, validators) = self._fetch()
+            if data is not None and converter.valid_envelope(data) is False:
+                self._failures += 1
+                log_message = (
+                    'Invalid data from URL {} not relayed'.format(self._url))
+                log.log2warning(1124, log_message)
+                data = None
+            elif data is not None:
+                self._accept(validators)
+        else:
+            data = self.get()
 
         # Post data
         if bool(data) is True:
@@ -384,24 +1030,94 @@ class PassiveAgent():
             None
 
         Returns:
-            result: dict of JSON retrieved.
+            result: dict of JSON retrieved. Empty if the data hasn't changed
+                since the previous poll
 
         """
         # Initialize key variables
         result = {}
         url = self._url
 
-        # Get URL
-        try:
-            with urllib.request.urlopen(url) as u_handle:
-                try:
-                    result = json.loads(u_handle.read().decode())
-                except:
-                    (etype, evalue, etraceback) = sys.exc_info()
-                    log_message = (
-                        'Error reading JSON from URL {}: [{}, {}, {}]'
-                        ''.format(url, etype, evalue, etraceback))
-                    log.log2info(1008, log_message)
+        # Get URL. Only skip the data of the next poll if it is unchanged and
+        # can be read
+        (body, validators) = self._fetch()
+        if body is not None:
+            try:
+                result = json.loads(body.decode())
+            except:
+                self._failures += 1
+                (etype, evalue, etraceback) = sys.exc_info()
+                log_message = (
+                    'Error reading JSON from URL {}: [{}, {}, {}]'
+                    ''.format(url, etype, evalue, etraceback))
+                log.log2info(1008, log_message)
+            else:
+                self._accept(validators)
+
+        # Return
+        return result
+
+    def fetch(self):
+        """Get the bytes of the response of the remote URL.
+
+        Args:
+            None
+
+        Returns:
+            result: Bytes retrieved. None if the URL couldn't be read or if
+                the data hasn't changed since the previous poll
+
+        """
+        # Get URL
+        (result, validators) = self._fetch()
+        self._accept(validators)
+        return result
+
+    def _fetch(self):
+        """Get the bytes of the response of the remote URL.
+
+        The ETag, Last-Modified header and hash of new data are returned
+        instead of being kept. Pass them to _accept() once the data has been
+        validated, so that the same invalid data isn't skipped as unchanged.
+
+        Args:
+            None
+
+        Returns:
+            result: Tuple of (bytes, validators). Bytes are None if the URL
+                couldn't be read or if the data hasn't changed since the
+                previous poll. Validators are None if there is no new data
+
+        """
+        # Initialize key variables
+        result = None
+        validators = None
+        unchanged = False
+        url = self._url
+        start = time()
+
+        # Only ask for data that has changed since the previous poll
+        headers = {}
+        if self._etag is not None:
+            headers['If-None-Match'] = self._etag
+        if self._modified is not None:
+            headers['If-Modified-Since'] = self._modified
+        request = urllib.request.Request(url, headers=headers)
+
+        # Get URL
+        try:
+            with urllib.request.urlopen(
+                    request, timeout=self._timeout) as u_handle:
+                result = u_handle.read()
+                etag = u_handle.headers.get('ETag')
+                modified = u_handle.headers.get('Last-Modified')
+        except urllib.error.HTTPError as error:
+            # urllib treats "304 Not Modified" as an error
+            unchanged = error.code == 304
+            if unchanged is False:
+                log_message = (
+                    'Error contacting URL {}: [{}]'.format(url, error))
+                log.log2info(1134, log_message)
         except:
             # Most likely no connectivity or the TCP port is unavailable
             (etype, evalue, etraceback) = sys.exc_info()
@@ -410,7 +1126,157 @@ class PassiveAgent():
                 ''.format(url, etype, evalue, etraceback))
             log.log2info(1186, log_message)
 
+        # Servers without conditional requests send the same data again
+        if result is not None:
+            digest = hashlib.sha256(result).digest()
+            if digest == self._digest:
+                unchanged = True
+                result = None
+                (self._etag, self._modified) = (etag, modified)
+            else:
+                validators = (digest, etag, modified)
+
+        if unchanged is True:
+            log_message = (
+                'Data from URL {} unchanged since the previous poll'
+                ''.format(url))
+            log.log2debug(1125, log_message)
+
+        # Update statistics
+        latency = time() - start
+        self._polls += 1
+        self._skipped += int(unchanged)
+        self._failures += int(result is None and unchanged is False)
+        self._last = latency
+        self._total += latency
+        self._maximum = max(self._maximum, latency)
+
         # Return
+        return (result, validators)
+
+    def _accept(self, validators):
+        """Keep the validators of data so that it's skipped if unchanged.
+
+        Args:
+            validators: Tuple of (hash, ETag, Last-Modified) returned by
+                _fetch(). Ignored if None
+
+        Returns:
+            None
+
+        """
+        # Keep
+        if validators is not None:
+            (self._digest, self._etag, self._modified) = validators
+
+    def stats(self):
+        """Get the latency statistics of polling the passive agent.
+
+        Args:
+            None
+
+        Returns:
+            result: LatencyStats object. Latencies are in seconds
+
+        """
+        # Get statistics
+        result = LatencyStats(
+            polls=self._polls,
+            failures=self._failures,
+            last=self._last,
+            mean=self._total / self._polls if bool(self._polls) else None,
+            maximum=self._maximum,
+            skipped=self._skipped)
+        return result
+
+
+class PassiveAgentPool():
+    """Relays data from many passive Pattoo Agents concurrently.
+
+    Each passive agent is polled and its data posted by a thread of a pool of
+    bounded size. Every passive agent has its own timeout, so slow or dead
+    agents only hold up a single thread.
+
+    """
+
+    def __init__(self, sources, workers=None, timeout=None,
+                 passthrough=None):
+        """Initialize the class.
+
+        Args:
+            sources: List of (agent_program, identifier, url) tuples. An
+                optional fourth item sets the timeout of the source
+            workers: Maximum number of passive agents polled at the same
+                time. Read from pattoo.yaml if None
+            timeout: Seconds to wait for passive agents without a timeout of
+                their own to respond. Read from pattoo.yaml if None
+            passthrough: True if the retrieved JSON is relayed unchanged
+                without being parsed. Read from pattoo.yaml if None
+
+        Returns:
+            None
+
+        """
+        # Initialize key variables
+        config = BaseConfig()
+        if workers is None:
+            workers = config.passive_agent_workers()
+        if timeout is None:
+            timeout = config.passive_agent_timeout()
+        if passthrough is None:
+            passthrough = config.passive_agent_passthrough()
+        self.workers = workers
+        self.agents = []
+
+        # Create a PassiveAgent for each source
+        for source in sources:
+            (agent_program, identifier, url) = source[:3]
+            _timeout = source[3] if len(source) > 3 else timeout
+            self.agents.append(PassiveAgent(
+                agent_program, identifier, url, _timeout, passthrough))
+
+    def relay(self):
+        """Forward data polled from all the passive agents.
+
+        Args:
+            None
+
+        Returns:
+            None
+
+        """
+        # Nothing to do
+        if bool(self.agents) is False:
+            return
+
+        # Relay
+        with ThreadPoolExecutor(
+                max_workers=min(self.workers, len(self.agents))) as executor:
+            futures = [
+                (agent, executor.submit(agent.relay)) for agent in self.agents]
+            for (agent, future) in futures:
+                try:
+                    future.result()
+                except:
+                    (etype, evalue, etraceback) = sys.exc_info()
+                    log_message = (
+                        'Error relaying data from URL {}: [{}, {}, {}]'
+                        ''.format(agent._url, etype, evalue, etraceback))
+                    log.log2warning(1123, log_message)
+
+    def stats(self):
+        """Get the latency statistics of polling each passive agent.
+
+        Args:
+            None
+
+        Returns:
+            result: Dict of LatencyStats objects keyed by identifier
+
+        """
+        # Get statistics
+        result = {
+            agent._identifier: agent.stats() for agent in self.agents}
         return result
 
 
@@ -420,8 +1286,8 @@ def post(url, data, identifier, save=True):
     Args:
         url: URL to receive posted data
         identifier: Unique identifier for the source of the data. (AgentID)
-        data: Data dict to post. If None, then uses self._post_data (
-            Used for testing and cache purging)
+        data: Data dict to post, or bytes of JSON to post unchanged. If None,
+            then uses self._post_data (Used for testing and cache purging)
         save: When True, save data to cache directory if posting fails
 
     Returns:
@@ -431,16 +1297,26 @@ def post(url, data, identifier, save=True):
     # Initialize key variables
     success = False
     response = False
+    _breaker = breaker(url)
 
     # Fail if nothing to post
-    if isinstance(data, dict) is False or bool(data) is False:
+    if isinstance(data, (dict, bytes)) is False or bool(data) is False:
+        return success
+
+    # Cache the data without contacting a server that keeps failing
+    if _breaker.allow() is False:
+        _skip(url, identifier)
+        if save is True:
+            _save_data(data, identifier)
         return success
 
     # Post data save to cache if this fails
     try:
-        result = requests.post(url, json=data)
+        _transport = transport()
+        result = _transport.post(url, **_transport.encode(data))
         response = True
     except:
+        _breaker.failure()
         if save is True:
             # Save data to cache
             _save_data(data, identifier)
@@ -451,6 +1327,7 @@ def post(url, data, identifier, save=True):
 
     # Define success
     if response is True:
+        _update(_breaker, result.status_code)
         if result.status_code == 200:
             success = True
         else:
@@ -460,7 +1337,8 @@ HTTP {} error for identifier "{}" posted to server {}\
             log.log2warning(1017, log_message)
             # Save data to cache, remote webserver isn't
             # working properly
-            _save_data(data, identifier)
+            if save is True:
+                _save_data(data, identifier)
 
     # Log message
     if success is True:
@@ -478,6 +1356,161 @@ Data for identifier "{}" failed to post to server {}\
     return success
 
 
+def post_delta(url, data, identifier, save=True):
+    """Post delta encoded data to central server.
+
+    Only the key-value pairs the server hasn't received during the session of
+    the identifier are posted. A new session is started if the server
+    responds with HTTP 409 because it doesn't know the session.
+
+    Args:
+        url: URL to receive delta encoded data
+        data: Data dict to post
+        identifier: Unique identifier for the source of the data. (AgentID)
+        save: When True, save data to cache directory if posting fails.
+            Cached data isn't delta encoded
+
+    Returns:
+        success: True: if successful
+
+    """
+    # Initialize key variables
+    success = False
+    status_code = None
+    _breaker = breaker(url)
+
+    # Fail if nothing to post
+    if isinstance(data, dict) is False or bool(data) is False:
+        return success
+
+    # Encode before checking the breaker. Invalid data must not use up the
+    # single post that tests a half-open breaker
+    encoder = _encoder(url, identifier)
+    delta = encoder.encode(data)
+
+    # Cache the data without contacting a server that keeps failing
+    if delta is not None and _breaker.allow() is False:
+        _skip(url, identifier)
+        if save is True:
+            _save_data(data, identifier)
+        return success
+
+    # Post the data again with all its key-value pairs if the server doesn't
+    # know the session
+    for _ in range(2):
+        if delta is None:
+            break
+        try:
+            _transport = transport()
+            result = _transport.post(url, **_transport.encode(delta))
+            status_code = result.status_code
+        except:
+            _breaker.failure()
+            break
+
+        _update(_breaker, status_code)
+        if status_code == 200:
+            encoder.acknowledge(delta)
+            success = True
+            break
+        if status_code != 409:
+            break
+
+        log_message = ('''\
+Server {} doesn't know session {} of identifier "{}". Starting a new one.\
+'''.format(url, encoder.session, identifier))
+        log.log2debug(1114, log_message)
+        encoder.reset()
+        delta = encoder.encode(data)
+
+    # Log message
+    if success is True:
+        log_message = ('''\
+Delta encoded data for identifier "{}" posted to server {}\
+'''.format(identifier, url))
+        log.log2debug(1115, log_message)
+    else:
+        log_message = ('''\
+Delta encoded data for identifier "{}" failed to post to server {}. \
+HTTP status {}\
+'''.format(identifier, url, status_code))
+        log.log2warning(1116, log_message)
+
+        # Save data to cache
+        if save is True:
+            _save_data(data, identifier)
+
+    # Return
+    return success
+
+
+def post_batch(url, posts, save=True):
+    """Post a batch of data to central server in a single request.
+
+    Args:
+        url: URL to receive posted data
+        posts: List of dicts created by converter.posting_data_points
+        save: When True, save each post to the cache directory of its
+            identifier if posting fails
+
+    Returns:
+        success: True: if successful
+
+    """
+    # Initialize key variables
+    success = False
+    result = None
+    _breaker = breaker(url)
+
+    # Fail if nothing to post
+    data = converter.posts_to_batch(posts)
+    if bool(data['pattoo_batch']) is False:
+        return success
+
+    # Post data without contacting a server that keeps failing
+    if _breaker.allow() is False:
+        _skip(url, 'batch')
+    else:
+        try:
+            _transport = transport()
+            result = _transport.post(url, **_transport.encode(data))
+        except:
+            _breaker.failure()
+
+    # Define success
+    if result is not None:
+        _update(_breaker, result.status_code)
+        if result.status_code == 200:
+            success = True
+        else:
+            log_message = ('''\
+HTTP {} error for batch of {} posts to server {}\
+'''.format(result.status_code, len(data['pattoo_batch']), url))
+            log.log2warning(1097, log_message)
+
+    # Log message
+    if success is True:
+        log_message = ('''\
+Batch of {} posts sent to server {}\
+'''.format(len(data['pattoo_batch']), url))
+        log.log2debug(1098, log_message)
+    else:
+        log_message = ('''\
+Batch of {} posts failed to post to server {}\
+'''.format(len(data['pattoo_batch']), url))
+        log.log2warning(1099, log_message)
+
+        # Save each post to the cache of its identifier
+        if save is True:
+            for _data in posts:
+                identifier = _data.get('pattoo_agent_id')
+                if isinstance(identifier, str) is True:
+                    _save_data(_data, identifier)
+
+    # Return
+    return success
+
+
 def key_exchange(gpg, req_session, exchange_url, validation_url,
                  symmetric_key):
     """Exchange point for API and Agent public keys.
@@ -612,7 +1645,7 @@ def key_exchange(gpg, req_session, exchange_url, validation_url,
 
 
 def encrypted_post(gpg, symmetric_key, req_session,
-                   url, data, identifier, save=True):
+                   url, data, identifier, save=True, status=False):
     """Post encrypted data to the API server.
 
     First, the data is checked for its validity. Sencondly,
@@ -635,33 +1668,49 @@ def encrypted_post(gpg, symmetric_key, req_session,
         identifier (str): The agent identification
         save (bool): True to save data to cache directory if
                      posting fails
+        status (bool): True to return the HTTP status code of the
+                       response instead of general_result
 
     Returns:
-        general_result (bool)
+        general_result (bool), or the HTTP status code (int) if status
+        is True. The status code is None if the server wasn't contacted
 
     """
     # Initialize key variables
     general_result = False
+    response_code = None
 
     # Fail if nothing to post
     if isinstance(data, dict) is False or bool(data) is False:
-        return general_result
+        return response_code if status is True else general_result
 
     # Prepare and encrypt data
     raw_data = {"data": data, "source": identifier}
     # Convert dictionary to string for encryption
     prep_data = json.dumps(raw_data)
-    # Symmetrically encrypt data
-    encrypted_data = gpg.symmetric_encrypt(prep_data, symmetric_key)
+    # Symmetrically encrypt data with the configured cipher
+    _cipher = cipher.cipher(transport().encryption_cipher, gpg)
+    encrypted_data = _cipher.encrypt(prep_data, symmetric_key)
     post_data = {"encrypted_data": encrypted_data}
     post_data = json.dumps(post_data)
 
+    # Cache the data without contacting a server that keeps failing
+    _breaker = breaker(url)
+    if _breaker.allow() is False:
+        _skip(url, identifier)
+        if save is True:
+            _save_data(data, identifier)
+        return response_code if status is True else general_result
+
     # Post data save to cache if this fails
-    response_code = None
     try:
-        response = req_session.post(url, json=post_data)
+        # The API server only accepts encrypted data as JSON
+        response = req_session.post(
+            url, **transport().encode(post_data, codec.codec('json')))
         response_code = response.status_code
+        _update(_breaker, response_code)
     except Exception as e:
+        _breaker.failure()
         log_msg = 'Error encountered: >>>{}<<<'.format(e)
         log.log2warning(1075, log_msg)
         if save is True:
@@ -688,6 +1737,8 @@ def encrypted_post(gpg, symmetric_key, req_session,
                        )
         log.log2warning(1058, log_message)
 
+    if status is True:
+        return response_code
     return general_result
 
 
@@ -706,49 +1757,30 @@ def purge(url, identifier, suite=post):
         None
 
     """
+    # Don't read the cache while the server keeps failing
+    if breaker(url).blocked() is True:
+        return
+
     # Initialize key variables
     config = Config()
-    cache_dir = config.agent_cache_directory(identifier)
-
-    # Add files in cache directory to list only if they match the
-    # cache suffix
-    all_filenames = [filename for filename in os.listdir(
-        cache_dir) if os.path.isfile(
-            os.path.join(cache_dir, filename))]
-    filenames = [
-        filename for filename in all_filenames if filename.endswith(
-            '.json')]
-
-    # Read cache file
-    for filename in filenames:
-        # Only post files for our own UID value
-        if identifier not in filename:
+    batch_bytes = config.cache_purge_batch_bytes()
+    files = _read_cached(
+        identifier, config.cache_purge_workers(),
+        config.cache_purge_inflight_bytes())
+
+    # Post unencrypted cache files in batches if configured
+    if bool(batch_bytes) is True and suite is post:
+        _purge_batches(
+            config.agent_api_batch_url(), identifier, batch_bytes, files)
+        return
+
+    # Read cached data. Stop at the first failure so that the remaining
+    # data is delivered in order later.
+    for (entry, data, _) in files:
+        if data is None:
+            # Go to the next file.
             continue
 
-        # Get the full filepath for the cache file and post
-        filepath = os.path.join(cache_dir, filename)
-        with open(filepath, 'r') as f_handle:
-            try:
-                data = json.load(f_handle)
-            except:
-                # Log removal
-                log_message = ('''\
-Error reading previously cached agent data file {} for identifier {}. May be \
-corrupted.'''.format(filepath, identifier))
-                log.log2warning(1064, log_message)
-
-                # Delete file
-                if os.path.isfile(filepath) is True:
-                    os.remove(filepath)
-
-                    log_message = ('''\
-Deleting corrupted cache file {} for identifier {}.\
-'''.format(filepath, identifier))
-                    log.log2warning(1036, log_message)
-
-                # Go to the next file.
-                continue
-
         # Post file
         if callable(suite):  # Is it a function?
             # Post unencrypted data
@@ -759,44 +1791,614 @@ Deleting corrupted cache file {} for identifier {}.\
                 suite.gpg, suite.symmetric_key, suite.session,
                 url, data, identifier, save=False)
 
-        # Delete file if successful
+        # Delete data if successful
         if success is True:
+            _remove_cached([entry], url)
+        else:
+            break
+    files.close()
+
+
+def _purge_batches(url, identifier, batch_bytes, files):
+    """Purge data from cache by posting batches of files to central server.
+
+    Files are posted oldest first. Purging stops at the first batch that
+    fails so that the remaining files are delivered in order later.
+
+    Args:
+        url: URL to receive batches of posted data
+        identifier: Unique identifier for the source of the data. (AgentID)
+        batch_bytes: Maximum size in bytes of the files in a batch
+        files: Iterable of (entry, data, size) tuples of cached data
+            created by _read_cached
+
+    Returns:
+        None
+
+    """
+    # Initialize key variables
+    start = time()
+    purged = 0
+    purged_bytes = 0
+    batch = []
+    size = 0
+
+    # Add a marker for the end of the files to post the last batch
+    for (entry, data, filesize) in itertools.chain(
+            files, [(None, None, None)]):
+        if entry is not None and data is None:
+            continue
+
+        # Post the batch when it is full, or there are no more files
+        if bool(batch) is True and (
+                entry is None or size + filesize > batch_bytes):
+            success = post_batch(url, [_[1] for _ in batch], save=False)
+            if success is False:
+                break
+            _remove_cached([_[0] for _ in batch], url)
+            purged += len(batch)
+            purged_bytes += size
+            batch = []
+            size = 0
+
+        # Add file to the batch
+        if entry is not None:
+            batch.append((entry, data))
+            size += filesize
+    files.close()
+
+    # Log throughput
+    if bool(purged) is True:
+        duration = max(time() - start, 0.000001)
+        log_message = ('''\
+Purged {} cache files ({} bytes) for identifier {} in {:.3f}s. \
+{:.1f} files/s, {:.1f} bytes/s'''.format(
+            purged, purged_bytes, identifier, duration,
+            purged / duration, purged_bytes / duration))
+        log.log2info(1106, log_message)
+
+
+def _read_cached(identifier, workers=1, inflight_bytes=0):
+    """Read the data cached for an identifier, oldest first.
+
+    Cache files created by older versions are read before the spool.
+
+    Args:
+        identifier: Unique identifier for the source of the data. (AgentID)
+        workers: Number of threads reading cache files
+        inflight_bytes: Maximum size in bytes of cache files read ahead
+
+    Returns:
+        None
+
+    Yields:
+        result: Tuple of (entry, data, size in bytes). entry is the filepath
+            of a cache file or the cache.Position of a spool record. It is
+            used to remove the data with _remove_cached. data is None if it
+            was corrupted
+
+    """
+    # Read
+    yield from _read_cache_files(
+        _cache_filepaths(identifier), identifier, workers, inflight_bytes)
+    yield from _spool(identifier).read()
+
+
+def _remove_cached(entries, url):
+    """Remove cached data after it was successfully posted.
+
+    Args:
+        entries: List of entries returned by _read_cached, oldest first
+        url: URL that received the posted data
+
+    Returns:
+        None
+
+    """
+    # Initialize key variables
+    filepaths = [_ for _ in entries if isinstance(_, cache.Position) is False]
+    positions = [_ for _ in entries if isinstance(_, cache.Position) is True]
+
+    # Delete cache files
+    if len(filepaths) == 1:
+        _remove_cache_file(filepaths[0], url)
+    elif bool(filepaths) is True:
+        _remove_cache_files(filepaths, url)
+
+    # Move the spool checkpoint past the posted records
+    if bool(positions) is True:
+        position = positions[-1]
+        cache.spool(os.path.dirname(position.directory)).commit(position)
+        log_message = ('''\
+Purged {} cache spool records up to offset {} of segment {} in {} after \
+successfully contacting server {}'''.format(
+            len(positions), position.offset, position.sequence,
+            position.directory, url))
+        log.log2debug(1109, log_message)
+
+
+def _read_cache_files(filepaths, identifier, workers=1, inflight_bytes=0):
+    """Read cache files in order, reading ahead with a pool of threads.
+
+    Files are yielded in the same order as filepaths no matter which
+    thread read them. Reading ahead stops once the files being read or
+    waiting to be used reach inflight_bytes in size, which keeps memory
+    usage bounded.
+
+    Args:
+        filepaths: List of cache files
+        identifier: Unique identifier for the source of the data. (AgentID)
+        workers: Number of threads reading files. Files are read one at a
+            time when posted if 1
+        inflight_bytes: Maximum size in bytes of files read ahead
+
+    Returns:
+        None
+
+    Yields:
+        result: Tuple of (filepath, data, size in bytes). data is None if
+            the file was corrupted
+
+    """
+    # Read files one at a time
+    if workers <= 1:
+        for filepath in filepaths:
+            size = _filesize(filepath)
+            yield (filepath, _read_cache_file(filepath, identifier), size)
+        return
+
+    # Read ahead
+    pending = collections.deque()
+    inflight = 0
+    index = 0
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        try:
+            while index < len(filepaths) or bool(pending) is True:
+                # Always read at least one file
+                while index < len(filepaths):
+                    size = _filesize(filepaths[index])
+                    if bool(pending) is True and (
+                            inflight + size > inflight_bytes):
+                        break
+                    future = executor.submit(
+                        _read_cache_file, filepaths[index], identifier)
+                    pending.append((filepaths[index], size, future))
+                    inflight += size
+                    index += 1
+
+                # Return the oldest file
+                (filepath, size, future) = pending.popleft()
+                data = future.result()
+                inflight -= size
+                yield (filepath, data, size)
+        finally:
+            # Don't read any more files if the caller stops early
+            for (_, _, future) in pending:
+                future.cancel()
+
+
+def _remove_cache_files(filepaths, url):
+    """Delete all the cache files of a successfully posted batch.
+
+    The names of the files are first written to a journal so that an
+    interrupted deletion is completed before the cache is read again. This
+    prevents part of a batch from being posted twice.
+
+    Args:
+        filepaths: List of cache files to delete
+        url: URL that received the posted data
+
+    Returns:
+        None
+
+    """
+    # Initialize key variables
+    if bool(filepaths) is False:
+        return
+    journal = _journal_filepath(os.path.dirname(filepaths[0]))
+    temp_journal = '{}.tmp'.format(journal)
+
+    # Create the journal
+    with open(temp_journal, 'w') as f_handle:
+        f_handle.write('\n'.join(filepaths))
+        f_handle.flush()
+        os.fsync(f_handle.fileno())
+    os.replace(temp_journal, journal)
+
+    # Delete the files then the journal
+    _finish_journal(journal, url)
+
+
+def _finish_journal(journal, url=None):
+    """Delete the cache files listed in a journal, then the journal.
+
+    Args:
+        journal: Journal file
+        url: URL that received the posted data
+
+    Returns:
+        None
+
+    """
+    # Delete files
+    with open(journal, 'r') as f_handle:
+        filepaths = [_ for _ in f_handle.read().split('\n') if bool(_)]
+    for filepath in filepaths:
+        if url is None:
             if os.path.exists(filepath) is True:
                 os.remove(filepath)
+        else:
+            _remove_cache_file(filepath, url, unindex=False)
+    _unindex(filepaths)
+    os.remove(journal)
 
-                # Log removal
-                log_message = ('''\
-    Purging cache file {} after successfully contacting server {}\
-    '''.format(filepath, url))
-                log.log2info(1007, log_message)
 
+def _filesize(filepath):
+    """Get the size of a file.
+
+    Args:
+        filepath: File
+
+    Returns:
+        result: Size in bytes. 0 if the file doesn't exist
+
+    """
+    # Get size
+    try:
+        result = os.path.getsize(filepath)
+    except OSError:
+        result = 0
+    return result
 
-def _save_data(data, identifier):
-    """Save data to cache file.
+
+def _journal_filepath(cache_dir):
+    """Get the name of the journal of cache files being deleted.
+
+    Args:
+        cache_dir: Cache directory
+
+    Returns:
+        result: Journal filepath
+
+    """
+    # Return
+    result = os.path.join(cache_dir, '.purge_journal')
+    return result
+
+
+def _cache_filepaths(identifier):
+    """Get the cache files of an identifier in timestamp order.
 
     Args:
-        data: Dict to save
         identifier: Unique identifier for the source of the data. (AgentID)
 
     Returns:
-        success: True: if successful
+        result: List of cache filepaths, oldest first
 
     """
     # Initialize key variables
-    success = False
     config = Config()
     cache_dir = config.agent_cache_directory(identifier)
-    timestamp = int(time() * 1000)
 
-    # Create a unique very long filename to reduce risk of
-    filename = ('''{}{}{}_{}.json\
-'''.format(cache_dir, os.sep, timestamp, identifier))
+    # Complete any interrupted deletion of purged files
+    journal = _journal_filepath(cache_dir)
+    if os.path.isfile(journal) is True:
+        _finish_journal(journal)
+        log_message = ('''\
+Completed the interrupted deletion of purged cache files for identifier {}.\
+'''.format(identifier))
+        log.log2info(1107, log_message)
+
+    # Get the files from the manifest instead of listing the directory.
+    # The timestamp prefixed names are sorted to send the oldest data first.
+    # Only post files for our own UID value
+    result = [
+        os.path.join(cache_dir, filename) for filename in cache.manifest(
+            cache_dir).filenames() if identifier in filename]
+    return result
+
+
+def _read_cache_file(filepath, identifier):
+    """Read a cache file, deleting it if it is corrupted.
+
+    Args:
+        filepath: Cache file to read
+        identifier: Unique identifier for the source of the data. (AgentID)
+
+    Returns:
+        data: Data read from the file. None if corrupted
+
+    """
+    # Initialize key variables
+    data = None
+
+    # Forget files deleted by other processes
+    if os.path.isfile(filepath) is False:
+        _unindex([filepath])
+        return data
+
+    with open(filepath, 'r') as f_handle:
+        try:
+            data = json.load(f_handle)
+        except:
+            # Log removal
+            log_message = ('''\
+Error reading previously cached agent data file {} for identifier {}. May be \
+corrupted.'''.format(filepath, identifier))
+            log.log2warning(1064, log_message)
+
+    # Delete file
+    if data is None and os.path.isfile(filepath) is True:
+        os.remove(filepath)
+        _unindex([filepath])
+
+        log_message = ('''\
+Deleting corrupted cache file {} for identifier {}.\
+'''.format(filepath, identifier))
+        log.log2warning(1036, log_message)
+
+    return data
+
+
+def _remove_cache_file(filepath, url, unindex=True):
+    """Delete a cache file after it was successfully posted.
+
+    Args:
+        filepath: Cache file to delete
+        url: URL that received the posted data
+        unindex: Remove the file from the cache manifest if True
+
+    Returns:
+        None
+
+    """
+    # Delete file
+    if unindex is True:
+        _unindex([filepath])
+    if os.path.exists(filepath) is True:
+        os.remove(filepath)
+
+        # Log removal
+        log_message = ('''\
+Purging cache file {} after successfully contacting server {}\
+'''.format(filepath, url))
+        log.log2info(1007, log_message)
+
+
+def _unindex(filepaths):
+    """Remove cache files from the manifests of their cache directories.
+
+    Args:
+        filepaths: List of cache files
+
+    Returns:
+        None
+
+    """
+    # Group the files by directory
+    directories = collections.defaultdict(list)
+    for filepath in filepaths:
+        directories[os.path.dirname(filepath)].append(
+            os.path.basename(filepath))
+
+    # Update the manifests
+    for (cache_dir, filenames) in directories.items():
+        cache.manifest(cache_dir).remove(filenames)
+
+
+def compress(body, encoding, level=6):
+    """Compress a request body.
+
+    Args:
+        body: Bytes to compress
+        encoding: Content-Encoding to use. Either 'gzip' or 'deflate'
+        level: Compression level from 1 (fastest) to 9 (smallest)
+
+    Returns:
+        result: Tuple of (compressed bytes, dict of HTTP headers)
+
+    """
+    # Compress
+    if encoding == 'gzip':
+        _body = gzip.compress(body, compresslevel=level)
+    else:
+        _body = zlib.compress(body, level)
+    result = (_body, {'Content-Encoding': encoding})
+    return result
+
+
+def compress_chunks(chunks, encoding, level=6):
+    """Compress a request body one chunk at a time.
+
+    Args:
+        chunks: Iterable of bytes to compress
+        encoding: Content-Encoding to use. Either 'gzip' or 'deflate'
+        level: Compression level from 1 (fastest) to 9 (smallest)
+
+    Returns:
+        None
+
+    Yields:
+        result: Compressed bytes
+
+    """
+    # Use the same formats as compress()
+    wbits = 31 if encoding == 'gzip' else 15
+    compressor = zlib.compressobj(level, zlib.DEFLATED, wbits)
+
+    # Compress
+    for chunk in chunks:
+        result = compressor.compress(chunk)
+        if bool(result) is True:
+            yield result
+    yield compressor.flush()
 
-    # Save data
+
+def decompress(body, encoding):
+    """Decompress a request body received by a pattoo server.
+
+    Args:
+        body: Bytes received
+        encoding: Content-Encoding header value of the request. The body is
+            returned unchanged if this is not 'gzip' or 'deflate'
+
+    Returns:
+        result: Decompressed bytes
+
+    """
+    # Decompress
+    encoding = str(encoding).strip().lower()
+    if encoding == 'gzip':
+        result = gzip.decompress(body)
+    elif encoding == 'deflate':
+        result = zlib.decompress(body)
+    else:
+        result = body
+    return result
+
+
+def breaker(url):
+    """Get the circuit breaker of the server of a URL.
+
+    Args:
+        url: URL on the server
+
+    Returns:
+        result: CircuitBreaker object
+
+    """
+    # Initialize key variables
+    parts = urlsplit(url)
+    server = '{}://{}'.format(parts.scheme, parts.netloc)
+
+    # Create breaker if it doesn't already exist
+    with _TRANSPORT_LOCK:
+        result = BREAKERS.get(server)
+        if result is None:
+            result = CircuitBreaker(server)
+            BREAKERS[server] = result
+    return result
+
+
+def encrypted_session(gpg, exchange_url, validation_url):
+    """Get the encrypted session of a Pgpier key pair with a server.
+
+    Args:
+        gpg: Pgpier object to accommodate encryption
+        exchange_url: URL for exchanging public keys
+        validation_url: URL for validating the symmetric key
+
+    Returns:
+        result: EncryptedSession object
+
+    """
+    # Initialize key variables
+    key = (exchange_url, gpg.gnupghome, gpg.fingerprint)
+
+    # Create session if it doesn't already exist
+    with _TRANSPORT_LOCK:
+        result = SESSIONS.get(key)
+        if result is None:
+            result = EncryptedSession(gpg, exchange_url, validation_url)
+            SESSIONS[key] = result
+    return result
+
+
+def _encoder(url, identifier):
+    """Get the delta encoding session of an identifier posting to a URL.
+
+    Args:
+        url: URL to receive delta encoded data
+        identifier: Unique identifier for the source of the data. (AgentID)
+
+    Returns:
+        result: converter.DeltaEncoder object
+
+    """
+    # Create encoder if it doesn't already exist
+    with _TRANSPORT_LOCK:
+        result = ENCODERS.get((url, identifier))
+        if result is None:
+            result = converter.DeltaEncoder()
+            ENCODERS[(url, identifier)] = result
+    return result
+
+
+def _update(_breaker, status_code):
+    """Update a circuit breaker with the HTTP status of a post.
+
+    Server errors are failures. Other responses show the server is working.
+
+    Args:
+        _breaker: CircuitBreaker object
+        status_code: HTTP status code
+
+    Returns:
+        None
+
+    """
+    # Update
+    if status_code >= 500:
+        _breaker.failure()
+    else:
+        _breaker.success()
+
+
+def _skip(url, identifier):
+    """Log a post that was skipped because the server keeps failing.
+
+    Args:
+        url: URL to receive posted data
+        identifier: Unique identifier for the source of the data. (AgentID)
+
+    Returns:
+        None
+
+    """
+    # Log
+    log_message = ('''\
+Server {} is unavailable. Caching data for identifier "{}" without posting.\
+'''.format(url, identifier))
+    log.log2debug(1113, log_message)
+
+
+def transport():
+    """Get the process wide HTTP transport.
+
+    Args:
+        None
+
+    Returns:
+        TRANSPORT: Transport object
+
+    """
+    # Define key variables
+    global TRANSPORT
+
+    # Create transport if it doesn't already exist
+    with _TRANSPORT_LOCK:
+        if bool(TRANSPORT) is False:
+            TRANSPORT = Transport()
+    return TRANSPORT
+
+
+def _save_data(data, identifier):
+    """Save data to the cache spool.
+
+    Args:
+        data: Dict to save, or bytes of JSON to save unchanged
+        identifier: Unique identifier for the source of the data. (AgentID)
+
+    Returns:
+        success: True: if successful
+
+    """
+    # Initialize key variables
+    success = False
+
+    # Save data. It may be discarded to keep the cache within its budget
     try:
-        with open(filename, 'w') as f_handle:
-            json.dump(data, f_handle)
-        success = True
+        success = _spool(identifier).append(data)
     except Exception as err:
         log_message = '{}'.format(err)
         log.log2warning(1030, log_message)
@@ -806,19 +2408,26 @@ def _save_data(data, identifier):
 Cache-file save error: [{}, {}, {}]'''.format(etype, evalue, etraceback))
         log.log2warning(1031, log_message)
 
-    # Delete file if there is a failure.
-    # Helps to protect against full file systems.
-    if os.path.isfile(filename) is True and success is False:
-        os.remove(filename)
-        log_message = ('''\
-Deleting corrupted cache file {} for identifier {}.\
-'''.format(filename, identifier))
-        log.log2warning(1037, log_message)
-
     # Return
     return success
 
 
+def _spool(identifier):
+    """Get the cache spool of an identifier.
+
+    Args:
+        identifier: Unique identifier for the source of the data. (AgentID)
+
+    Returns:
+        result: cache.Spool object
+
+    """
+    # Initialize key variables
+    config = Config()
+    result = cache.spool(config.agent_cache_directory(identifier), config)
+    return result
+
+
 def _log(agent_program, identifier):
     """Create a standardized log message for posting.
 
@@ -43,5 +43,10 @@ setuptools.setup(
         'python-gnupg==0.4.6',
         'distro',
         'virtualenv'
-    ]
+    ],
+
+    # Optional dependencies
+    extras_require={
+        'aesgcm': ['cryptography']
+    }
 )
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""Compare the posting throughput of the phttp and aphttp modules.
+
+Posts the same agent data to a local stub server using the synchronous
+phttp.post function and the asyncio aphttp.post function, then reports the
+number of posts per second achieved by each.
+
+"""
+
+# Standard imports
+from __future__ import print_function
+import argparse
+import asyncio
+import os
+import sys
+from time import time
+
+# Try to create a working PYTHONPATH
+DEV_DIR = os.path.dirname(os.path.realpath(__file__))
+ROOT_DIR = os.path.abspath(os.path.join(
+    os.path.abspath(os.path.join(DEV_DIR, os.pardir)), os.pardir))
+_EXPECTED = '{0}pattoo-shared{0}tests{0}bin'.format(os.sep)
+if DEV_DIR.endswith(_EXPECTED) is True:
+    sys.path.insert(0, ROOT_DIR)
+else:
+    print('''This script is not installed in the "{0}" directory. Please fix.\
+'''.format(_EXPECTED))
+    sys.exit(2)
+
+# Pattoo imports
+from pattoo_shared import aphttp
+from pattoo_shared import phttp
+from pattoo_shared import converter
+from tests.libraries.server import StubServer
+from tests.resources import test_agent as ta
+
+
+def main():
+    """Run the benchmark."""
+    # Get CLI arguments
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        '--posts', type=int, default=2000, help='Number of posts to make.')
+    parser.add_argument(
+        '--concurrency', type=int, default=100,
+        help='Maximum number of aphttp posts in flight.')
+    args = parser.parse_args()
+
+    # Create data to post
+    agentdata = ta.test_agent()
+    identifier = agentdata.agent_id
+    data = converter.posting_data_points(
+        converter.agentdata_to_post(agentdata))
+    server = StubServer().start()
+    url = server.url('/receive')
+
+    # Synchronous posts
+    start = time()
+    for _ in range(args.posts):
+        phttp.post(url, data, identifier, save=False)
+    sync_rate = args.posts / (time() - start)
+
+    # Asyncio posts
+    async def _posts():
+        aphttp.TRANSPORTS[asyncio.get_event_loop()] = aphttp.AsyncTransport(
+            concurrency=args.concurrency)
+        await asyncio.gather(*[
+            aphttp.post(url, data, identifier, save=False)
+            for _ in range(args.posts)])
+
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    start = time()
+    loop.run_until_complete(_posts())
+    async_rate = args.posts / (time() - start)
+    loop.close()
+    server.stop()
+
+    # Report
+    print('''\
+Posts               : {}
+phttp  (posts/s)    : {:.1f}
+aphttp (posts/s)    : {:.1f}
+Speedup             : {:.2f}x'''.format(
+        args.posts, sync_rate, async_rate, async_rate / sync_rate))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""Measure the rate at which cache data is converted to PattooDBrecords.
+
+Creates cache data for an agent polling many targets, then reports the
+number of PattooDBrecord objects per second created by the
+converter.cache_to_keypairs and converter.iter_cache_to_keypairs functions.
+The cache data is converted more than once, so all but the first conversion
+reuse cached checksums, as a server does every polling cycle. Then reports
+the number of cache files per second converted by
+converter.cache_files_to_keypairs using one process and a pool of processes.
+
+"""
+
+# Standard imports
+from __future__ import print_function
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+from time import time
+
+# Try to create a working PYTHONPATH
+DEV_DIR = os.path.dirname(os.path.realpath(__file__))
+ROOT_DIR = os.path.abspath(os.path.join(
+    os.path.abspath(os.path.join(DEV_DIR, os.pardir)), os.pardir))
+_EXPECTED = '{0}pattoo-shared{0}tests{0}bin'.format(os.sep)
+if DEV_DIR.endswith(_EXPECTED) is True:
+    sys.path.insert(0, ROOT_DIR)
+else:
+    print('''This script is not installed in the "{0}" directory. Please fix.\
+'''.format(_EXPECTED))
+    sys.exit(2)
+
+# Pattoo imports
+from pattoo_shared import converter
+from pattoo_shared.variables import (
+    DataPoint, DataPointMetadata, TargetDataPoints, AgentPolledData)
+
+
+def _cache(targets, datapoints):
+    """Create cache data.
+
+    Args:
+        targets: Number of targets
+        datapoints: Number of datapoints per target
+
+    Returns:
+        result: Cache data as read from a JSON cache file
+
+    """
+    # Create agent data
+    agent = AgentPolledData('benchmark_agent', 300)
+    for target_number in range(targets):
+        target = TargetDataPoints('target_{}'.format(target_number))
+        for number in range(datapoints):
+            datapoint = DataPoint(
+                'key_{}'.format(number), number * 1.5)
+            datapoint.add(DataPointMetadata('Interface', str(number)))
+            datapoint.add(DataPointMetadata(
+                'Department Name', 'The Palisadoes Foundation',
+                update_checksum=False))
+            target.add(datapoint)
+        agent.add(target)
+
+    # Convert to the format of cache files
+    result = json.loads(json.dumps(converter.posting_data_points(
+        converter.agentdata_to_post(agent))))
+    return result
+
+
+def main():
+    """Run the benchmark."""
+    # Get CLI arguments
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        '--targets', type=int, default=20, help='Number of targets.')
+    parser.add_argument(
+        '--datapoints', type=int, default=1000,
+        help='Number of datapoints per target.')
+    parser.add_argument(
+        '--repeat', type=int, default=3,
+        help='Number of times to convert the cache data.')
+    parser.add_argument(
+        '--files', type=int, default=8,
+        help='Number of cache files to convert.')
+    parser.add_argument(
+        '--workers', type=int, default=os.cpu_count() or 1,
+        help='Number of processes converting cache files.')
+    args = parser.parse_args()
+
+    # Create data to convert
+    cache = _cache(args.targets, args.datapoints)
+
+    # Convert
+    records = 0
+    start = time()
+    for _ in range(args.repeat):
+        records += len(converter.cache_to_keypairs(cache))
+    list_rate = records / (time() - start)
+
+    records = 0
+    start = time()
+    for _ in range(args.repeat):
+        for chunk in converter.iter_cache_to_keypairs(
+                cache, chunk_size=1000):
+            records += len(chunk)
+    iter_rate = records / (time() - start)
+    info = converter.checksum_cache_info()
+
+    # Convert cache files
+    directory = tempfile.mkdtemp()
+    for number in range(args.files):
+        filepath = os.path.join(directory, '{:06}.json'.format(number))
+        with open(filepath, 'w') as filehandle:
+            json.dump(cache, filehandle)
+    file_rates = []
+    for workers in [1, args.workers]:
+        converter._cached_checksum.cache_clear()
+        start = time()
+        converter.cache_files_to_keypairs(directory, workers=workers)
+        file_rates.append(args.files / (time() - start))
+    shutil.rmtree(directory)
+
+    # Report
+    print('''\
+Records                         : {}
+cache_to_keypairs (records/s)   : {:.1f}
+iter_cache_to_keypairs (rec/s)  : {:.1f}
+Checksum cache hits             : {}
+Checksum cache misses           : {}
+Pool processes                  : {}
+Files, 1 process (files/s)      : {:.2f}
+Files, pool (files/s)           : {:.2f}'''.format(
+        records // args.repeat, list_rate, iter_rate, info.hits,
+        info.misses, args.workers, file_rates[0], file_rates[1]))
+
+
+if __name__ == '__main__':
+    main()
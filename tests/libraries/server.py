@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""Local stub pattoo server used for unittesting and benchmarking.
+
+NOTE!! This script CANNOT import any pattoo-shared libraries. Doing so risks
+libraries trying to access a configuration or configuration directory that
+doesn't yet exist. This is especially important when running cloud based
+automated tests such as 'Travis CI'.
+
+"""
+
+# Standard imports
+import time
+import threading
+from http.server import HTTPServer, BaseHTTPRequestHandler
+from socketserver import ThreadingMixIn
+
+
+class _Server(ThreadingMixIn, HTTPServer):
+    """Threaded HTTP server."""
+
+    daemon_threads = True
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Record posted requests and respond with a fixed status code."""
+
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        """Process POST requests."""
+        # Read body
+        length = int(self.headers.get('Content-Length', 0))
+        body = self.rfile.read(length)
+
+        # Record request
+        stub = self.server.stub
+        with stub.lock:
+            stub.requests.append((self.path, dict(self.headers), body))
+
+        # Respond
+        reply = b'OK'
+        self.send_response(stub.status)
+        self.send_header('Content-Length', str(len(reply)))
+        self.end_headers()
+        self.wfile.write(reply)
+
+    def do_GET(self):
+        """Process GET requests."""
+        # Record request
+        stub = self.server.stub
+        with stub.lock:
+            stub.requests.append((self.path, dict(self.headers), b''))
+
+        # Respond after the delay. Honor conditional requests
+        time.sleep(stub.delay)
+        etag = stub.headers.get('ETag')
+        if etag is not None and self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        reply = stub.body
+        self.send_response(stub.status)
+        for key, value in stub.headers.items():
+            self.send_header(key, value)
+        self.send_header('Content-Length', str(len(reply)))
+        self.end_headers()
+        self.wfile.write(reply)
+
+    def log_message(self, *args):
+        """Silence request logging."""
+        pass
+
+
+class StubServer():
+    """Local HTTP server that accepts requests on a random port."""
+
+    def __init__(self, status=200, body=b'OK', delay=0, headers=None):
+        """Initialize the class.
+
+        Args:
+            status: HTTP status code returned for every request
+            body: Body returned for every GET request
+            delay: Seconds to wait before responding to GET requests
+            headers: Dict of HTTP headers returned for every GET request
+
+        Returns:
+            None
+
+        """
+        # Initialize key variables
+        self.status = status
+        self.body = body
+        self.delay = delay
+        self.headers = headers if bool(headers) is True else {}
+        self.requests = []
+        self.lock = threading.Lock()
+        self._server = _Server(('127.0.0.1', 0), _Handler)
+        self._server.stub = self
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever)
+        self._thread.daemon = True
+
+    def url(self, path='/'):
+        """Get the URL of the server.
+
+        Args:
+            path: URL path
+
+        Returns:
+            result: URL
+
+        """
+        result = 'http://127.0.0.1:{}{}'.format(self.port, path)
+        return result
+
+    def start(self):
+        """Start the server."""
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop the server."""
+        self._server.shutdown()
+        self._server.server_close()
@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+"""Test the aphttp module."""
+
+# Standard imports
+import unittest
+import asyncio
+import json
+import os
+import sys
+import threading
+from time import time
+from unittest.mock import patch
+
+# Try to create a working PYTHONPATH
+EXEC_DIR = os.path.dirname(os.path.realpath(__file__))
+ROOT_DIR = os.path.abspath(os.path.join(
+    os.path.abspath(os.path.join(EXEC_DIR, os.pardir)), os.pardir))
+_EXPECTED = '{0}pattoo-shared{0}tests{0}test_pattoo_shared'.format(os.sep)
+if EXEC_DIR.endswith(_EXPECTED) is True:
+    # We need to prepend the path in case PattooShared has been installed
+    # elsewhere on the system using PIP. This could corrupt expected results
+    sys.path.insert(0, ROOT_DIR)
+else:
+    print('''This script is not installed in the "{0}" directory. Please fix.\
+'''.format(_EXPECTED))
+    sys.exit(2)
+
+# Pattoo imports
+from pattoo_shared import aphttp
+from pattoo_shared import phttp
+from pattoo_shared import data
+from pattoo_shared import converter
+from pattoo_shared.configuration import Config
+from tests.libraries.configuration import UnittestConfig
+from tests.libraries.server import StubServer
+from tests.resources import test_agent as ta
+
+
+def _run(coroutine):
+    """Run a coroutine on a new event loop."""
+    loop = asyncio.new_event_loop()
+    try:
+        result = loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+    return result
+
+
+class TestAsyncTransport(unittest.TestCase):
+    """Checks all functions and methods."""
+
+    def test_post(self):
+        """Testing method or function named post."""
+        # Initialize
+        server = StubServer().start()
+        body = json.dumps({'test': 'data'}).encode()
+
+        async def _post():
+            transport = aphttp.AsyncTransport()
+            results = await asyncio.gather(*[
+                transport.post(server.url('/receive'), body)
+                for _ in range(20)])
+            connections = sum(
+                len(_) for _ in transport._idle.values())
+            await transport.close()
+            return (results, connections, transport.pool_size)
+
+        # Test
+        (results, connections, pool_size) = _run(_post())
+        server.stop()
+        self.assertEqual(results, [200] * 20)
+        self.assertEqual(len(server.requests), 20)
+        for (path, _, _body) in server.requests:
+            self.assertEqual(path, '/receive')
+            self.assertEqual(_body, body)
+
+        # Up to pool_size connections are kept alive for reuse
+        self.assertEqual(pool_size, Config().http_pool_size())
+        self.assertTrue(0 < connections <= pool_size)
+
+    def test_post_pool_size(self):
+        """Testing method post with a limited number of idle connections."""
+        # Initialize
+        server = StubServer().start()
+        body = json.dumps({'test': 'data'}).encode()
+
+        async def _post():
+            transport = aphttp.AsyncTransport()
+            transport.pool_size = 2
+            results = await asyncio.gather(*[
+                transport.post(server.url('/receive'), body)
+                for _ in range(20)])
+            connections = sum(
+                len(_) for _ in transport._idle.values())
+            await transport.close()
+            return (results, connections)
+
+        # Test
+        (results, connections) = _run(_post())
+        server.stop()
+        self.assertEqual(results, [200] * 20)
+        self.assertTrue(0 < connections <= 2)
+
+    def test_post_compressed(self):
+        """Testing method post with compression."""
+        # Initialize
+        server = StubServer().start()
+        body = json.dumps({'test': 'data' * 1000}).encode()
+
+        async def _post():
+            transport = aphttp.AsyncTransport()
+            transport.compression = 'gzip'
+            result = await transport.post(server.url('/receive'), body)
+            await transport.close()
+            return result
+
+        # Test
+        result = _run(_post())
+        server.stop()
+        self.assertEqual(result, 200)
+        (_, headers, _body) = server.requests[0]
+        self.assertEqual(headers['Content-Encoding'], 'gzip')
+        self.assertEqual(int(headers['Content-Length']), len(_body))
+        self.assertEqual(phttp.decompress(_body, 'gzip'), body)
+
+    def test_close(self):
+        """Testing method or function named close."""
+        # Initialize
+        server = StubServer().start()
+        body = json.dumps({'test': 'data'}).encode()
+
+        async def _close():
+            transport = aphttp.AsyncTransport()
+            await asyncio.gather(*[
+                transport.post(server.url('/receive'), body)
+                for _ in range(5)])
+            connections = [
+                _ for idle in transport._idle.values() for _ in idle]
+            await transport.close()
+            return (transport, connections)
+
+        # Test
+        (transport, connections) = _run(_close())
+        server.stop()
+        self.assertTrue(bool(connections))
+        self.assertEqual(transport._idle, {})
+        for connection in connections:
+            self.assertFalse(connection.reusable)
+            self.assertTrue(connection.writer.is_closing())
+
+
+class TestAsyncPost(unittest.TestCase):
+    """Checks all functions and methods."""
+
+    # Create agent data
+    agentdata = ta.test_agent()
+    identifier = agentdata.agent_id
+    _data = converter.agentdata_to_post(agentdata)
+    data = converter.posting_data_points(_data)
+
+    def setUp(self):
+        """Start each test with closed circuit breakers."""
+        # Reset
+        phttp.BREAKERS.clear()
+
+    def test___init__(self):
+        """Testing method or function named __init__."""
+        # Initialize
+        _post = aphttp.AsyncPost(self.identifier, self.data)
+
+        # Test
+        expected = (
+            'http://127.0.0.6:50505/pattoo/api/v1/agent/receive/{}'
+            ''.format(self.identifier))
+        self.assertEqual(_post._url, expected)
+
+    def test_post(self):
+        """Testing method or function named post."""
+        # Initialize
+        server = StubServer().start()
+        _post = aphttp.AsyncPostAgent(self.agentdata)
+        _post._url = server.url('/receive')
+
+        # Test
+        success = _run(_post.post())
+        server.stop()
+        self.assertTrue(success)
+        self.assertEqual(
+            json.loads(server.requests[0][2].decode()),
+            json.loads(json.dumps(_post._data)))
+
+    def test_purge(self):
+        """Testing method or function named purge."""
+        # Initialize
+        server = StubServer().start()
+        identifier = data.hashstring(str(time()))
+        _post = aphttp.AsyncPost(identifier, self.data)
+        _post._url = server.url('/receive')
+        for _ in range(3):
+            phttp._save_data(self.data, identifier)
+        self.assertEqual(len(list(phttp._read_cached(identifier))), 3)
+
+        # Test
+        _run(_post.purge())
+        server.stop()
+        self.assertEqual(len(server.requests), 3)
+        self.assertEqual(list(phttp._read_cached(identifier)), [])
+
+
+class TestBasicFunctions(unittest.TestCase):
+    """Checks all functions and methods."""
+
+    # Create agent data
+    agentdata = ta.test_agent()
+    _data = converter.agentdata_to_post(agentdata)
+    data = converter.posting_data_points(_data)
+
+    def setUp(self):
+        """Start each test with closed circuit breakers."""
+        # Reset
+        phttp.BREAKERS.clear()
+
+    def test_transport(self):
+        """Testing method or function named transport."""
+        async def _transport():
+            return (aphttp.transport(), aphttp.transport())
+
+        # The same object is used for the life of an event loop
+        (result_1, result_2) = _run(_transport())
+        self.assertTrue(isinstance(result_1, aphttp.AsyncTransport))
+        self.assertEqual(id(result_1), id(result_2))
+
+    def test_post(self):
+        """Testing method or function named post."""
+        # Initialize
+        identifier = data.hashstring(str(time()))
+        server = StubServer().start()
+        url = server.url('/receive')
+
+        # Test success
+        success = _run(aphttp.post(url, self.data, identifier))
+        self.assertTrue(success)
+        self.assertEqual(list(phttp._read_cached(identifier)), [])
+
+        # Test failure. Data must be cached
+        server.status = 500
+        success = _run(aphttp.post(url, self.data, identifier))
+        server.stop()
+        self.assertFalse(success)
+        self.assertEqual(len(list(phttp._read_cached(identifier))), 1)
+
+        # Test unreachable server. Data must be cached
+        success = _run(aphttp.post(url, self.data, identifier))
+        self.assertFalse(success)
+        self.assertEqual(len(list(phttp._read_cached(identifier))), 2)
+
+        # Data is cached outside the thread of the event loop
+        threads = []
+        with patch(
+                'pattoo_shared.aphttp.phttp._save_data',
+                side_effect=lambda *_: threads.append(
+                    threading.current_thread())):
+            self.assertFalse(_run(aphttp.post(url, self.data, identifier)))
+        self.assertEqual(len(threads), 1)
+        self.assertIsNot(threads[0], threading.current_thread())
+
+        # Test bad data
+        self.assertFalse(_run(aphttp.post(url, {}, identifier)))
+
+    def test_post_many(self):
+        """Testing method or function named post_many."""
+        # Initialize
+        server = StubServer().start()
+        posts = []
+        for _ in range(50):
+            _post = aphttp.AsyncPost(
+                data.hashstring(str(time())), self.data)
+            _post._url = server.url('/receive')
+            posts.append(_post)
+
+        # Test
+        results = _run(aphttp.post_many(posts))
+        server.stop()
+        self.assertEqual(results, [True] * 50)
+        self.assertEqual(len(server.requests), 50)
+
+    def test_purge(self):
+        """Testing method or function named purge."""
+        # Initialize
+        identifier = data.hashstring(str(time()))
+        server = StubServer(status=500).start()
+        url = server.url('/receive')
+        for _ in range(2):
+            phttp._save_data(self.data, identifier)
+
+        # Files must stay in the cache when the server fails
+        _run(aphttp.purge(url, identifier))
+        self.assertEqual(len(list(phttp._read_cached(identifier))), 2)
+        self.assertEqual(len(server.requests), 1)
+
+        # Files are deleted when the server recovers
+        server.status = 200
+        _run(aphttp.purge(url, identifier))
+        server.stop()
+        self.assertEqual(list(phttp._read_cached(identifier)), [])
+
+
+if __name__ == '__main__':
+    # Make sure the environment is OK to run unittests
+    UnittestConfig().create()
+
+    # Do the unit test
+    unittest.main()
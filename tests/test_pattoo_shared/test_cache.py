@@ -0,0 +1,438 @@
+#!/usr/bin/env python3
+"""Test the cache module."""
+
+# Standard imports
+import unittest
+import os
+import sys
+import shutil
+import tempfile
+
+# Try to create a working PYTHONPATH
+EXEC_DIR = os.path.dirname(os.path.realpath(__file__))
+ROOT_DIR = os.path.abspath(os.path.join(
+    os.path.abspath(os.path.join(EXEC_DIR, os.pardir)), os.pardir))
+_EXPECTED = '{0}pattoo-shared{0}tests{0}test_pattoo_shared'.format(os.sep)
+if EXEC_DIR.endswith(_EXPECTED) is True:
+    # We need to prepend the path in case PattooShared has been installed
+    # elsewhere on the system using PIP. This could corrupt expected results
+    sys.path.insert(0, ROOT_DIR)
+else:
+    print('''This script is not installed in the "{0}" directory. Please fix.\
+'''.format(_EXPECTED))
+    sys.exit(2)
+
+# Pattoo imports
+from pattoo_shared import cache
+from pattoo_shared import codec
+from pattoo_shared.configuration import Config
+from tests.libraries.configuration import UnittestConfig
+
+
+class TestManifest(unittest.TestCase):
+    """Checks all functions and methods."""
+
+    def setUp(self):
+        """Create an empty cache directory."""
+        self.cache_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Delete the cache directory."""
+        shutil.rmtree(self.cache_dir)
+
+    def test___init__(self):
+        """Testing method or function named __init__."""
+        # Test
+        manifest = cache.Manifest(self.cache_dir)
+        self.assertEqual(
+            manifest.filepath, os.path.join(self.cache_dir, '.manifest'))
+        self.assertFalse(os.path.exists(manifest.filepath))
+
+    def test_add(self):
+        """Testing method or function named add."""
+        # Test
+        manifest = cache.Manifest(self.cache_dir)
+        manifest.add('2_test.json')
+        manifest.add('1_test.json')
+        self.assertEqual(manifest.filenames(), ['1_test.json', '2_test.json'])
+
+        # Other processes see the new files
+        manifest.add('3_test.json')
+        self.assertEqual(
+            cache.Manifest(self.cache_dir).filenames(),
+            ['1_test.json', '2_test.json', '3_test.json'])
+
+    def test_remove(self):
+        """Testing method or function named remove."""
+        # Test
+        manifest = cache.Manifest(self.cache_dir)
+        for index in range(5):
+            manifest.add('{}_test.json'.format(index))
+        self.assertEqual(len(manifest.filenames()), 5)
+        manifest.remove(['1_test.json', '3_test.json'])
+        self.assertEqual(
+            manifest.filenames(),
+            ['0_test.json', '2_test.json', '4_test.json'])
+        manifest.remove([])
+        self.assertEqual(len(manifest.filenames()), 3)
+
+    def test_filenames(self):
+        """Testing method or function named filenames."""
+        # Files created before the manifest existed are found
+        for index in range(3):
+            filepath = os.path.join(
+                self.cache_dir, '{}_test.json'.format(index))
+            with open(filepath, 'w') as f_handle:
+                f_handle.write('{}')
+        with open(os.path.join(self.cache_dir, 'test.txt'), 'w') as f_handle:
+            f_handle.write('')
+        manifest = cache.Manifest(self.cache_dir)
+        self.assertEqual(
+            manifest.filenames(),
+            ['0_test.json', '1_test.json', '2_test.json'])
+
+        # Incomplete lines are ignored until they are finished
+        with open(manifest.filepath, 'a') as f_handle:
+            f_handle.write('+3_te')
+        self.assertEqual(len(manifest.filenames()), 3)
+        with open(manifest.filepath, 'a') as f_handle:
+            f_handle.write('st.json\n')
+        self.assertEqual(len(manifest.filenames()), 4)
+
+    def test__compact(self):
+        """Testing method or function named _compact."""
+        # Initialize key variables
+        manifest = cache.Manifest(self.cache_dir)
+        filenames = ['{}_test.json'.format(_) for _ in range(1500)]
+        for filename in filenames:
+            manifest.add(filename)
+        manifest.remove(filenames[:1400])
+        other = cache.Manifest(self.cache_dir)
+        self.assertEqual(other.filenames(), filenames[1400:])
+
+        # Test. The removed files are dropped from the manifest file
+        self.assertEqual(manifest.filenames(), filenames[1400:])
+        with open(manifest.filepath, 'r') as f_handle:
+            self.assertEqual(len(f_handle.readlines()), 100)
+
+        # Other readers notice the manifest file was replaced
+        manifest.add('9999_test.json')
+        self.assertEqual(
+            other.filenames(), filenames[1400:] + ['9999_test.json'])
+
+
+class TestSpool(unittest.TestCase):
+    """Checks all functions and methods."""
+
+    def setUp(self):
+        """Create an empty cache directory."""
+        self.cache_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Delete the cache directory."""
+        shutil.rmtree(self.cache_dir)
+
+    def test___init__(self):
+        """Testing method or function named __init__."""
+        # Test
+        spool = cache.Spool(self.cache_dir, segment_bytes=100)
+        self.assertEqual(
+            spool.directory, os.path.join(self.cache_dir, 'spool'))
+        self.assertEqual(spool.segment_bytes, 100)
+        self.assertTrue(os.path.isdir(spool.directory))
+
+    def test_append(self):
+        """Testing method or function named append."""
+        # Test
+        spool = cache.Spool(self.cache_dir, segment_bytes=100)
+        for index in range(10):
+            spool.append({'index': index})
+        self.assertEqual(
+            [_[1] for _ in spool.read()], [{'index': _} for _ in range(10)])
+
+        # New segments are started when the current one is full
+        sequences = spool._sequences()
+        self.assertTrue(len(sequences) > 1)
+        for sequence in sequences[:-1]:
+            self.assertTrue(
+                os.path.getsize(spool._filepath(sequence)) >= 100)
+
+        # Other processes start a new segment if the newest one ends with an
+        # incomplete record
+        with open(spool._filepath(sequences[-1]), 'ab') as f_handle:
+            f_handle.write(b'\x00\x00')
+        other = cache.Spool(self.cache_dir, segment_bytes=100)
+        other.append({'index': 10})
+        self.assertEqual(other._sequences()[-1], sequences[-1] + 1)
+        self.assertEqual(
+            [_[1] for _ in other.read()], [{'index': _} for _ in range(11)])
+
+    def test_read(self):
+        """Testing method or function named read."""
+        # Initialize key variables
+        spool = cache.Spool(self.cache_dir)
+        for index in range(3):
+            spool.append({'index': index})
+
+        # Test
+        result = list(spool.read())
+        self.assertEqual(
+            [_[1] for _ in result], [{'index': _} for _ in range(3)])
+        self.assertEqual(
+            [_[2] for _ in result],
+            [len(b'{"index": 0}') + cache._HEADER.size] * 3)
+        self.assertEqual(
+            result[-1][0].offset,
+            os.path.getsize(spool._filepath(result[-1][0].sequence)))
+
+        # Records that are still being written are not read
+        filepath = spool._filepath(result[-1][0].sequence)
+        with open(filepath, 'ab') as f_handle:
+            f_handle.write(cache._HEADER.pack(100, 0) + b'{')
+        self.assertEqual(len(list(spool.read())), 3)
+
+        # Corrupted records are skipped with the rest of the segment
+        with open(filepath, 'r+b') as f_handle:
+            f_handle.seek(cache._HEADER.size + 2)
+            f_handle.write(b'X')
+        cache.Spool(self.cache_dir).append({'index': 3})
+        self.assertEqual(
+            [_[1] for _ in spool.read()], [{'index': 3}])
+
+        # Records encoded by any codec are read
+        spool.codec = 'binary'
+        spool.append({'index': 4})
+        self.assertEqual(
+            [_[1] for _ in spool.read()], [{'index': 3}, {'index': 4}])
+        self.assertEqual(
+            list(spool.read())[-1][2],
+            len(codec.codec('binary').encode({'index': 4})) + (
+                cache._HEADER.size))
+
+        # Bytes of JSON are appended unchanged
+        spool.append(b'{"index":  5}')
+        result = list(spool.read())[-1]
+        self.assertEqual(result[1], {'index': 5})
+        self.assertEqual(result[2], len(b'{"index":  5}') + cache._HEADER.size)
+
+    def test_commit(self):
+        """Testing method or function named commit."""
+        # Initialize key variables
+        spool = cache.Spool(self.cache_dir, segment_bytes=50)
+        for index in range(6):
+            spool.append({'index': index})
+        sequences = spool._sequences()
+        result = list(spool.read())
+
+        # Test
+        spool.commit(result[1][0])
+        self.assertEqual(
+            [_[1] for _ in spool.read()],
+            [{'index': _} for _ in range(2, 6)])
+        self.assertEqual(spool._sequences(), sequences)
+
+        # Segments are deleted once all their records are committed
+        spool.commit(result[2][0])
+        self.assertEqual(
+            [_[1] for _ in spool.read()],
+            [{'index': _} for _ in range(3, 6)])
+        self.assertFalse(os.path.exists(spool._filepath(sequences[0])))
+
+        # Positions that were already committed are ignored
+        spool.commit(result[0][0])
+        self.assertEqual(len(list(spool.read())), 3)
+
+        # The newest segment is never deleted
+        spool.commit(result[-1][0])
+        self.assertEqual(list(spool.read()), [])
+        self.assertEqual(spool._sequences(), sequences[-1:])
+
+        # The checkpoint is shared with other processes
+        spool.append({'index': 6})
+        self.assertEqual(
+            [_[1] for _ in cache.Spool(self.cache_dir).read()],
+            [{'index': 6}])
+
+    def test_pending(self):
+        """Testing method or function named pending."""
+        # Initialize key variables
+        spool = cache.Spool(self.cache_dir)
+        self.assertEqual(spool.pending(), (0, 0))
+        for index in range(3):
+            spool.append({'index': index})
+
+        # Test
+        self.assertEqual(spool.pending(), (3, 60))
+        spool.commit(next(spool.read())[0])
+        self.assertEqual(spool.pending(), (2, 40))
+
+        # Totals are calculated from the segments if they are missing
+        os.remove(spool._totals)
+        self.assertEqual(spool.pending(), (2, 40))
+
+    def test__evict(self):
+        """Testing method or function named _evict."""
+        # Drop the oldest records
+        spool = cache.Spool(
+            os.path.join(self.cache_dir, 'drop_oldest'), max_records=3)
+        for index in range(5):
+            self.assertTrue(spool.append({'index': index}))
+        self.assertEqual(
+            [_[1] for _ in spool.read()], [{'index': _} for _ in range(2, 5)])
+        self.assertEqual(spool.pending(), (3, 60))
+        self.assertEqual((spool.evicted_records, spool.evicted_bytes), (2, 40))
+
+        # Drop the newest records
+        spool = cache.Spool(
+            os.path.join(self.cache_dir, 'drop_newest'), max_bytes=60,
+            policy='drop_newest')
+        result = [spool.append({'index': _}) for _ in range(5)]
+        self.assertEqual(result, [True, True, True, False, False])
+        self.assertEqual(
+            [_[1] for _ in spool.read()], [{'index': _} for _ in range(3)])
+
+        # Drop every other record
+        spool = cache.Spool(
+            os.path.join(self.cache_dir, 'downsample'), max_records=4,
+            policy='downsample')
+        for index in range(5):
+            self.assertTrue(spool.append({'index': index}))
+        self.assertEqual(
+            [_[1] for _ in spool.read()],
+            [{'index': 0}, {'index': 2}, {'index': 4}])
+        self.assertEqual(spool.pending(), (3, 60))
+
+        # Records larger than the budget are never appended
+        spool = cache.Spool(
+            os.path.join(self.cache_dir, 'small'), max_bytes=10)
+        self.assertFalse(spool.append({'index': 0}))
+        self.assertEqual(spool.pending(), (0, 0))
+
+    def test__downsample(self):
+        """Testing method or function named _downsample."""
+        # Initialize key variables
+        spool = cache.Spool(self.cache_dir, segment_bytes=60)
+        for index in range(6):
+            spool.append({'index': index})
+        sequences = spool._sequences()
+        result = list(spool.read())
+        spool.commit(result[0][0])
+
+        # Test. Only records after the checkpoint are kept
+        self.assertEqual(spool._downsample(sequences[0]), (1, 20))
+        self.assertEqual(
+            [_[1] for _ in spool.read()],
+            [{'index': 1}, {'index': 3}, {'index': 4}, {'index': 5}])
+        self.assertEqual(spool._read_checkpoint(), (sequences[0], 0))
+        self.assertEqual(spool.pending(), (4, 80))
+
+        # Positions read before the segment was rewritten are ignored
+        spool.commit(result[1][0])
+        self.assertEqual(spool.pending(), (4, 80))
+
+        # Segments with one record are unchanged
+        self.assertEqual(spool._downsample(sequences[0]), (0, 0))
+
+
+class TestBasicFunctions(unittest.TestCase):
+    """Checks all functions and methods."""
+
+    def test_manifest(self):
+        """Testing method or function named manifest."""
+        # Test
+        cache_dir = tempfile.mkdtemp()
+        result = cache.manifest(cache_dir)
+        self.assertTrue(isinstance(result, cache.Manifest))
+        self.assertEqual(result, cache.manifest(cache_dir))
+        shutil.rmtree(cache_dir)
+
+    def test_spool(self):
+        """Testing method or function named spool."""
+        # Test
+        cache_dir = tempfile.mkdtemp()
+        config = Config()
+        result = cache.spool(cache_dir)
+        self.assertTrue(isinstance(result, cache.Spool))
+        self.assertEqual(result, cache.spool(cache_dir))
+
+        # The configuration is applied
+        result.segment_bytes = 100
+        self.assertEqual(cache.spool(cache_dir).segment_bytes, 100)
+        cache.spool(cache_dir, config)
+        self.assertEqual(result.segment_bytes, config.cache_segment_bytes())
+        self.assertEqual(result.max_bytes, config.cache_max_bytes())
+        self.assertEqual(result.max_records, config.cache_max_records())
+        self.assertEqual(result.policy, config.cache_eviction_policy())
+        self.assertEqual(result.codec, config.cache_codec())
+        shutil.rmtree(cache_dir)
+
+    def test__records(self):
+        """Testing method or function named _records."""
+        # Initialize key variables
+        cache_dir = tempfile.mkdtemp()
+        spool = cache.Spool(cache_dir)
+        for index in range(2):
+            spool.append({'index': index})
+        filepath = spool._filepath(spool._sequences()[-1])
+        with open(filepath, 'ab') as f_handle:
+            f_handle.write(cache._HEADER.pack(10, 0) + b'{')
+
+        # Test
+        with open(filepath, 'rb') as f_handle:
+            result = list(cache._records(f_handle, 0, True))
+        self.assertEqual([_[0] for _ in result], [20, 40])
+        self.assertEqual(result[1][1][cache._HEADER.size:], b'{"index": 1}')
+        with open(filepath, 'rb') as f_handle:
+            result = list(cache._records(f_handle, 20, False))
+        self.assertEqual([_[0] for _ in result], [40])
+        shutil.rmtree(cache_dir)
+
+    def test__record_ends(self):
+        """Testing method or function named _record_ends."""
+        # Initialize key variables
+        cache_dir = tempfile.mkdtemp()
+        spool = cache.Spool(cache_dir)
+        for index in range(3):
+            spool.append({'index': index})
+        filepath = spool._filepath(spool._sequences()[-1])
+
+        # Test
+        with open(filepath, 'rb') as f_handle:
+            self.assertEqual(
+                list(cache._record_ends(f_handle, 20)), [(40, 20), (60, 20)])
+        shutil.rmtree(cache_dir)
+
+    def test__records_end(self):
+        """Testing method or function named _records_end."""
+        # Initialize key variables
+        cache_dir = tempfile.mkdtemp()
+        spool = cache.Spool(cache_dir)
+        spool.append({'test': 'data'})
+        filepath = spool._filepath(spool._sequences()[-1])
+        size = os.path.getsize(filepath)
+
+        # Test
+        self.assertEqual(cache._records_end(filepath), size)
+        with open(filepath, 'ab') as f_handle:
+            f_handle.write(cache._HEADER.pack(10, 0) + b'{')
+        self.assertEqual(cache._records_end(filepath), size)
+        shutil.rmtree(cache_dir)
+
+    def test__replace(self):
+        """Testing method or function named _replace."""
+        # Test
+        cache_dir = tempfile.mkdtemp()
+        filepath = os.path.join(cache_dir, 'test')
+        cache._replace(filepath, ['a', 'b'])
+        with open(filepath, 'r') as f_handle:
+            self.assertEqual(f_handle.read(), 'a\nb\n')
+        self.assertEqual(os.listdir(cache_dir), ['test'])
+        shutil.rmtree(cache_dir)
+
+
+if __name__ == '__main__':
+    # Make sure the environment is OK to run unittests
+    UnittestConfig().create()
+
+    # Do the unit test
+    unittest.main()
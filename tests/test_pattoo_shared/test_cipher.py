@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""Test the cipher module."""
+
+# Standard imports
+import unittest
+import base64
+import os
+import sys
+
+# Try to create a working PYTHONPATH
+EXEC_DIR = os.path.dirname(os.path.realpath(__file__))
+ROOT_DIR = os.path.abspath(os.path.join(
+    os.path.abspath(os.path.join(EXEC_DIR, os.pardir)), os.pardir))
+_EXPECTED = '{0}pattoo-shared{0}tests{0}test_pattoo_shared'.format(os.sep)
+if EXEC_DIR.endswith(_EXPECTED) is True:
+    # We need to prepend the path in case PattooShared has been installed
+    # elsewhere on the system using PIP. This could corrupt expected results
+    sys.path.insert(0, ROOT_DIR)
+else:
+    print('''This script is not installed in the "{0}" directory. Please fix.\
+'''.format(_EXPECTED))
+    sys.exit(2)
+
+# Pattoo imports
+from pattoo_shared import cipher
+from pattoo_shared.files import set_gnupg
+from pattoo_shared.configuration import Config
+from tests.libraries.configuration import UnittestConfig
+
+# Message with characters outside of ASCII
+_DATA = '{"data": "ünïcödé", "source": "identifier"}'
+
+
+class TestGnuPGCipher(unittest.TestCase):
+    """Checks all functions and methods."""
+
+    #########################################################################
+    # General object setup
+    #########################################################################
+
+    # Create Pgpier object
+    gpg = set_gnupg('test_agent0', Config(), 'test_agent0@example.org')
+
+    def test_encrypt(self):
+        """Testing method or function named encrypt."""
+        # Test
+        result = cipher.GnuPGCipher(self.gpg).encrypt(_DATA, 'key')
+        self.assertTrue(result.startswith('-----BEGIN PGP MESSAGE-----'))
+
+    def test_decrypt(self):
+        """Testing method or function named decrypt."""
+        # Test
+        _cipher = cipher.GnuPGCipher(self.gpg)
+        self.assertEqual(
+            _cipher.decrypt(_cipher.encrypt(_DATA, 'key'), 'key'), _DATA)
+
+
+@unittest.skipIf(
+    cipher.available() is False, 'The "cryptography" package is required')
+class TestAESGCMCipher(unittest.TestCase):
+    """Checks all functions and methods."""
+
+    #########################################################################
+    # General object setup
+    #########################################################################
+
+    def test_encrypt(self):
+        """Testing method or function named encrypt."""
+        # Every message has a new nonce
+        _cipher = cipher.AESGCMCipher()
+        result = _cipher.encrypt(_DATA, 'key')
+        self.assertTrue(result.startswith(cipher.PREFIX))
+        self.assertNotEqual(result, _cipher.encrypt(_DATA, 'key'))
+
+    def test_decrypt(self):
+        """Testing method or function named decrypt."""
+        # Test
+        _cipher = cipher.AESGCMCipher()
+        body = _cipher.encrypt(_DATA, 'key')
+        self.assertEqual(_cipher.decrypt(body, 'key'), _DATA)
+
+        # Test bad data
+        tampered = base64.b64decode(body[len(cipher.PREFIX):])
+        tampered = '{}{}'.format(
+            cipher.PREFIX, base64.b64encode(
+                tampered[:-1] + bytes([tampered[-1] ^ 1])).decode())
+        for bad, key in [
+                (body, 'wrong'), (body[len(cipher.PREFIX):], 'key'),
+                (tampered, 'key'), ('{}!'.format(cipher.PREFIX), 'key')]:
+            with self.assertRaises(ValueError):
+                _cipher.decrypt(bad, key)
+
+
+class TestBasicFunctions(unittest.TestCase):
+    """Checks all functions and methods."""
+
+    #########################################################################
+    # General object setup
+    #########################################################################
+
+    # Create Pgpier object
+    gpg = set_gnupg('test_agent0', Config(), 'test_agent0@example.org')
+
+    def test_available(self):
+        """Testing method or function named available."""
+        # Test
+        self.assertEqual(cipher.available(), cipher.AESGCM is not None)
+
+    def test_cipher(self):
+        """Testing method or function named cipher."""
+        # Test
+        self.assertTrue(isinstance(
+            cipher.cipher('gnupg', self.gpg), cipher.GnuPGCipher))
+        self.assertTrue(isinstance(
+            cipher.cipher(None, self.gpg), cipher.GnuPGCipher))
+        self.assertTrue(isinstance(
+            cipher.cipher('aesgcm', self.gpg), cipher.AESGCMCipher
+            if cipher.available() is True else cipher.GnuPGCipher))
+
+    @unittest.skipIf(
+        cipher.available() is False, 'The "cryptography" package is required')
+    def test__aesgcm(self):
+        """Testing method or function named _aesgcm."""
+        # Keys are only derived once
+        self.assertIs(cipher._aesgcm('key'), cipher._aesgcm('key'))
+        self.assertIsNot(cipher._aesgcm('key'), cipher._aesgcm('other'))
+
+
+if __name__ == '__main__':
+    # Make sure the environment is OK to run unittests
+    UnittestConfig().create()
+
+    # Do the unit test
+    unittest.main()
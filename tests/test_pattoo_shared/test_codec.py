@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""Test the codec module."""
+
+# Standard imports
+import unittest
+import json
+import os
+import sys
+
+# Try to create a working PYTHONPATH
+EXEC_DIR = os.path.dirname(os.path.realpath(__file__))
+ROOT_DIR = os.path.abspath(os.path.join(
+    os.path.abspath(os.path.join(EXEC_DIR, os.pardir)), os.pardir))
+_EXPECTED = '{0}pattoo-shared{0}tests{0}test_pattoo_shared'.format(os.sep)
+if EXEC_DIR.endswith(_EXPECTED) is True:
+    # We need to prepend the path in case PattooShared has been installed
+    # elsewhere on the system using PIP. This could corrupt expected results
+    sys.path.insert(0, ROOT_DIR)
+else:
+    print('''This script is not installed in the "{0}" directory. Please fix.\
+'''.format(_EXPECTED))
+    sys.exit(2)
+
+# Pattoo imports
+from pattoo_shared import codec
+from pattoo_shared import converter
+from tests.libraries.configuration import UnittestConfig
+from tests.resources import test_agent as ta
+
+
+def _post():
+    """Create a posting dict.
+
+    Args:
+        None
+
+    Returns:
+        result: Dict created by converter.posting_data_points
+
+    """
+    # Create
+    result = converter.posting_data_points(
+        converter.agentdata_to_post(ta.test_agent()))
+    return result
+
+
+# Values of every type supported by JSON
+_VALUES = [
+    None, True, False, 0, 1, 127, 128, 2 ** 64, -1, -129, 1.5, -0.25,
+    '', 'string', 'ünïcödé', [], {}, ('tuple', 1), [[1, 2], [3]],
+    {'a': 1, 'b': [1, 'a'], 1: 'one', None: 2, 1.5: 3, False: 4, -1: 5}]
+
+
+class TestJSONCodec(unittest.TestCase):
+    """Checks all functions and methods."""
+
+    #########################################################################
+    # General object setup
+    #########################################################################
+
+    def test_encode(self):
+        """Testing method or function named encode."""
+        # Test
+        _data = _post()
+        result = codec.JSONCodec().encode(_data)
+        self.assertEqual(result, json.dumps(_data).encode())
+
+    def test_decode(self):
+        """Testing method or function named decode."""
+        # Test
+        _codec = codec.JSONCodec()
+        for value in _VALUES:
+            self.assertEqual(
+                _codec.decode(_codec.encode(value)),
+                json.loads(json.dumps(value)))
+        with self.assertRaises(ValueError):
+            _codec.decode(b'{')
+
+
+class TestBinaryCodec(unittest.TestCase):
+    """Checks all functions and methods."""
+
+    #########################################################################
+    # General object setup
+    #########################################################################
+
+    def test_encode(self):
+        """Testing method or function named encode."""
+        # Binary data is smaller than JSON
+        _data = _post()
+        result = codec.BinaryCodec().encode(_data)
+        self.assertTrue(result.startswith(codec.MAGIC))
+        self.assertTrue(len(result) < len(json.dumps(_data).encode()))
+
+        # Test bad data
+        with self.assertRaises(TypeError):
+            codec.BinaryCodec().encode({'set': set()})
+        with self.assertRaises(TypeError):
+            codec.BinaryCodec().encode({(1, 2): 'tuple'})
+
+    def test_decode(self):
+        """Testing method or function named decode."""
+        # Values are the same as after a round trip through JSON
+        _codec = codec.BinaryCodec()
+        for value in _VALUES + [_post()]:
+            self.assertEqual(
+                _codec.decode(_codec.encode(value)),
+                json.loads(json.dumps(value)))
+
+        # Test bad data
+        body = _codec.encode(_post())
+        for bad in [b'{}', body[:-1], body + b'\x00', codec.MAGIC + b'\xff']:
+            with self.assertRaises(ValueError):
+                _codec.decode(bad)
+
+
+class TestBasicFunctions(unittest.TestCase):
+    """Checks all functions and methods."""
+
+    #########################################################################
+    # General object setup
+    #########################################################################
+
+    def test_codec(self):
+        """Testing method or function named codec."""
+        # Test
+        self.assertTrue(isinstance(codec.codec('json'), codec.JSONCodec))
+        self.assertTrue(isinstance(codec.codec('binary'), codec.BinaryCodec))
+        self.assertTrue(isinstance(codec.codec(None), codec.JSONCodec))
+
+    def test_decode(self):
+        """Testing method or function named decode."""
+        # The format is detected
+        _data = _post()
+        expected = json.loads(json.dumps(_data))
+        for name in ['json', 'binary']:
+            body = codec.codec(name).encode(_data)
+            self.assertEqual(codec.decode(body), expected)
+            self.assertEqual(codec.decode(bytearray(body)), expected)
+
+    def test__pack(self):
+        """Testing method or function named _pack."""
+        # Test
+        buffer = bytearray()
+        codec._pack(['a', 'a', 1], buffer, {})
+        self.assertEqual(
+            bytes(buffer), bytes([
+                codec._LIST, 3, codec._STRING, 1, ord('a'),
+                codec._STRING_REFERENCE, 0, codec._INT, 1]))
+
+    def test__pack_string(self):
+        """Testing method or function named _pack_string."""
+        # Strings are only stored once
+        buffer = bytearray()
+        strings = {}
+        codec._pack_string('ab', buffer, strings)
+        codec._pack_string('ab', buffer, strings)
+        self.assertEqual(
+            bytes(buffer), bytes([
+                codec._STRING, 2, ord('a'), ord('b'),
+                codec._STRING_REFERENCE, 0]))
+        self.assertEqual(strings, {'ab': 0})
+
+    def test__unpack(self):
+        """Testing method or function named _unpack."""
+        # Test
+        body = bytes([
+            codec._DICT, 2, codec._INT_KEY, 1, codec._STRING, 1, ord('a'),
+            codec._STRING_REFERENCE, 0, codec._NEGATIVE_INT, 0])
+        self.assertEqual(
+            codec._unpack(body, 0, []), ({'1': 'a', 'a': -1}, len(body)))
+
+    def test__varint(self):
+        """Testing method or function named _varint."""
+        # Test
+        for number, expected in [
+                (0, b'\x00'), (127, b'\x7f'), (128, b'\x80\x01'),
+                (300, b'\xac\x02')]:
+            buffer = bytearray()
+            codec._varint(number, buffer)
+            self.assertEqual(bytes(buffer), expected)
+
+    def test__read_varint(self):
+        """Testing method or function named _read_varint."""
+        # Test
+        for number in [0, 1, 127, 128, 300, 2 ** 70]:
+            buffer = bytearray(b'\xff')
+            codec._varint(number, buffer)
+            self.assertEqual(
+                codec._read_varint(buffer, 1), (number, len(buffer)))
+
+
+if __name__ == '__main__':
+    # Make sure the environment is OK to run unittests
+    UnittestConfig().create()
+
+    # Do the unit test
+    unittest.main()
@@ -101,6 +101,38 @@ class TestConfig(unittest.TestCase):
 
         self.assertEqual(result, expected)
 
+    def test_agent_api_batch(self):
+        """Test for batch post route."""
+        # Test
+        expected = '/pattoo/api/v1/agent/batch'
+        result = self.config.agent_api_batch()
+
+        self.assertEqual(result, expected)
+
+    def test_agent_api_batch_url(self):
+        """Test for batch post URL"""
+        # Test
+        expected = 'http://127.0.0.6:50505/pattoo/api/v1/agent/batch'
+        result = self.config.agent_api_batch_url()
+
+        self.assertEqual(result, expected)
+
+    def test_agent_api_delta(self):
+        """Test for delta encoded post route."""
+        # Test
+        expected = '/pattoo/api/v1/agent/delta'
+        result = self.config.agent_api_delta()
+
+        self.assertEqual(result, expected)
+
+    def test_agent_api_delta_url(self):
+        """Test for delta encoded post URL"""
+        # Test
+        expected = 'http://127.0.0.6:50505/pattoo/api/v1/agent/delta'
+        result = self.config.agent_api_delta_url()
+
+        self.assertEqual(result, expected)
+
     def test_agent_api_server_url(self):
         """Testing function agent_api_server_url."""
         # Initialize key values
@@ -213,6 +245,228 @@ class TestConfig(unittest.TestCase):
         # Nothing should happen. Directory exists in testing.
         _ = self.config.cache_directory()
 
+    def test_http_pool_size(self):
+        """Testing function http_pool_size."""
+        # Initialize key values
+        expected = 10
+
+        # Test
+        result = self.config.http_pool_size()
+        self.assertEqual(result, expected)
+
+    def test_http_connect_timeout(self):
+        """Testing function http_connect_timeout."""
+        # Initialize key values
+        expected = 10.0
+
+        # Test
+        result = self.config.http_connect_timeout()
+        self.assertEqual(result, expected)
+
+    def test_http_read_timeout(self):
+        """Testing function http_read_timeout."""
+        # Initialize key values
+        expected = 30.0
+
+        # Test
+        result = self.config.http_read_timeout()
+        self.assertEqual(result, expected)
+
+    def test_http_breaker_threshold(self):
+        """Testing function http_breaker_threshold."""
+        # Initialize key values
+        expected = 5
+
+        # Test
+        result = self.config.http_breaker_threshold()
+        self.assertEqual(result, expected)
+
+    def test_http_backoff_initial(self):
+        """Testing function http_backoff_initial."""
+        # Initialize key values
+        expected = 10.0
+
+        # Test
+        result = self.config.http_backoff_initial()
+        self.assertEqual(result, expected)
+
+    def test_http_backoff_max(self):
+        """Testing function http_backoff_max."""
+        # Initialize key values
+        expected = 300.0
+
+        # Test
+        result = self.config.http_backoff_max()
+        self.assertEqual(result, expected)
+
+    def test_http_compression(self):
+        """Testing function http_compression."""
+        # Compression is disabled by default
+        result = self.config.http_compression()
+        self.assertIsNone(result)
+
+    def test_http_compression_threshold(self):
+        """Testing function http_compression_threshold."""
+        # Initialize key values
+        expected = 1024
+
+        # Test
+        result = self.config.http_compression_threshold()
+        self.assertEqual(result, expected)
+
+    def test_http_compression_level(self):
+        """Testing function http_compression_level."""
+        # Initialize key values
+        expected = 6
+
+        # Test
+        result = self.config.http_compression_level()
+        self.assertEqual(result, expected)
+
+    def test_http_codec(self):
+        """Testing function http_codec."""
+        # Initialize key values
+        expected = 'json'
+
+        # Test
+        result = self.config.http_codec()
+        self.assertEqual(result, expected)
+
+    def test_http_chunk_bytes(self):
+        """Testing function http_chunk_bytes."""
+        # Chunked transfer encoding is disabled by default
+        expected = 0
+
+        # Test
+        result = self.config.http_chunk_bytes()
+        self.assertEqual(result, expected)
+
+    def test_http_delta_encoding(self):
+        """Testing function http_delta_encoding."""
+        # Delta encoding is disabled by default
+        expected = False
+
+        # Test
+        result = self.config.http_delta_encoding()
+        self.assertEqual(result, expected)
+
+    def test_http_encryption_ttl(self):
+        """Testing function http_encryption_ttl."""
+        # Initializing key variables
+        expected = 3600.0
+
+        # Test
+        result = self.config.http_encryption_ttl()
+        self.assertEqual(result, expected)
+
+    def test_http_encryption_cipher(self):
+        """Testing function http_encryption_cipher."""
+        # Initializing key variables
+        expected = 'gnupg'
+
+        # Test
+        result = self.config.http_encryption_cipher()
+        self.assertEqual(result, expected)
+
+    def test_cache_purge_batch_bytes(self):
+        """Testing function cache_purge_batch_bytes."""
+        # Batching is disabled by default
+        expected = 0
+
+        # Test
+        result = self.config.cache_purge_batch_bytes()
+        self.assertEqual(result, expected)
+
+    def test_cache_purge_workers(self):
+        """Testing function cache_purge_workers."""
+        # Initialize key values
+        expected = 1
+
+        # Test
+        result = self.config.cache_purge_workers()
+        self.assertEqual(result, expected)
+
+    def test_cache_purge_inflight_bytes(self):
+        """Testing function cache_purge_inflight_bytes."""
+        # Initialize key values
+        expected = 16777216
+
+        # Test
+        result = self.config.cache_purge_inflight_bytes()
+        self.assertEqual(result, expected)
+
+    def test_cache_segment_bytes(self):
+        """Testing function cache_segment_bytes."""
+        # Initialize key values
+        expected = 16777216
+
+        # Test
+        result = self.config.cache_segment_bytes()
+        self.assertEqual(result, expected)
+
+    def test_cache_max_bytes(self):
+        """Testing function cache_max_bytes."""
+        # Initialize key values
+        expected = 0
+
+        # Test
+        result = self.config.cache_max_bytes()
+        self.assertEqual(result, expected)
+
+    def test_cache_max_records(self):
+        """Testing function cache_max_records."""
+        # Initialize key values
+        expected = 0
+
+        # Test
+        result = self.config.cache_max_records()
+        self.assertEqual(result, expected)
+
+    def test_cache_codec(self):
+        """Testing function cache_codec."""
+        # Initialize key values
+        expected = 'json'
+
+        # Test
+        result = self.config.cache_codec()
+        self.assertEqual(result, expected)
+
+    def test_cache_eviction_policy(self):
+        """Testing function cache_eviction_policy."""
+        # Initialize key values
+        expected = 'drop_oldest'
+
+        # Test
+        result = self.config.cache_eviction_policy()
+        self.assertEqual(result, expected)
+
+    def test_passive_agent_timeout(self):
+        """Testing function passive_agent_timeout."""
+        # Initialize key values
+        expected = 10.0
+
+        # Test
+        result = self.config.passive_agent_timeout()
+        self.assertEqual(result, expected)
+
+    def test_passive_agent_passthrough(self):
+        """Testing function passive_agent_passthrough."""
+        # Passthrough is disabled by default
+        expected = False
+
+        # Test
+        result = self.config.passive_agent_passthrough()
+        self.assertEqual(result, expected)
+
+    def test_passive_agent_workers(self):
+        """Testing function passive_agent_workers."""
+        # Initialize key values
+        expected = 10
+
+        # Test
+        result = self.config.passive_agent_workers()
+        self.assertEqual(result, expected)
+
     def test_agent_cache_directory(self):
         """Testing function agent_cache_directory."""
         # Initialize key values
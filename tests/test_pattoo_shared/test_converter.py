@@ -3,8 +3,12 @@
 
 # Standard imports
 import unittest
+import json
 import os
 import sys
+import shutil
+import tempfile
+from unittest.mock import patch
 from time import sleep
 
 # Try to create a working PYTHONPATH
@@ -22,14 +26,319 @@ else:
     sys.exit(2)
 
 # Pattoo imports
+from pattoo_shared import codec
 from pattoo_shared import converter
 from pattoo_shared.configuration import Config
 from pattoo_shared.variables import (
     DataPointMetadata, DataPoint, TargetDataPoints, AgentPolledData)
 from pattoo_shared.constants import (
     DATA_FLOAT, DATA_INT, DATA_COUNT64, DATA_COUNT, DATA_STRING, DATA_NONE,
-    DATAPOINT_KEYS, PattooDBrecord)
+    DATAPOINT_KEYS, PattooDBrecord, CACHE_KEYS, DELTA_KEYS,
+    DELTA_VOLATILE_KEYS, MAX_KEYPAIR_LENGTH)
 from tests.libraries.configuration import UnittestConfig
+from tests.resources import test_agent as ta
+
+
+def _post(agent_id='agent_1'):
+    """Create a posting dict.
+
+    Args:
+        agent_id: Agent ID
+
+    Returns:
+        result: Dict created by converter.posting_data_points
+
+    """
+    # Create
+    agentdata = ta.test_agent()
+    agentdata.agent_id = agent_id
+    result = converter.posting_data_points(
+        converter.agentdata_to_post(agentdata))
+    return result
+
+
+class TestCounter(unittest.TestCase):
+    """Checks all functions and methods."""
+
+    #########################################################################
+    # General object setup
+    #########################################################################
+
+    def test_counter(self):
+        """Testing method or function named counter."""
+        # Test
+        counter = converter.Counter()
+        self.assertEqual(counter.counter('a', 1), 0)
+        self.assertEqual(counter.counter('b', 1), 1)
+        self.assertEqual(counter.counter('a', 1), 0)
+        self.assertEqual(counter.inverse_pairs, {0: ('a', 1), 1: ('b', 1)})
+
+    def test_counters(self):
+        """Testing method or function named counters."""
+        # The same IDs are assigned as by counter
+        pairs = [('a', 1), ('b', 1), ('a', 1), ('c', 2), ('b', 1)]
+        counter = converter.Counter()
+        expected = converter.Counter()
+        self.assertEqual(
+            counter.counters(pairs),
+            [expected.counter(*pair) for pair in pairs])
+        self.assertEqual(counter.counters([('d', 3), ('a', 1)]), [3, 0])
+        self.assertEqual(counter.pairs, {
+            ('a', 1): 0, ('b', 1): 1, ('c', 2): 2, ('d', 3): 3})
+        self.assertEqual(counter.counter('e', 4), 4)
+
+
+class TestDeltaEncoder(unittest.TestCase):
+    """Checks all functions and methods."""
+
+    #########################################################################
+    # General object setup
+    #########################################################################
+
+    def test___init__(self):
+        """Testing method or function named __init__."""
+        # Test
+        encoder = converter.DeltaEncoder()
+        self.assertEqual(encoder.max_pairs, 65536)
+        self.assertEqual(encoder.acknowledged, 0)
+        self.assertTrue(bool(encoder.session))
+
+    def test_reset(self):
+        """Testing method or function named reset."""
+        # Test
+        encoder = converter.DeltaEncoder()
+        session = encoder.session
+        encoder.acknowledge(encoder.encode(_post()))
+        encoder.reset()
+        self.assertNotEqual(encoder.session, session)
+        self.assertEqual(encoder.acknowledged, 0)
+        self.assertEqual(encoder.encode(_post())['pattoo_session_base'], 0)
+
+    def test_encode(self):
+        """Testing method or function named encode."""
+        # Initialize key variables
+        encoder = converter.DeltaEncoder()
+        _data = _post()
+        datapoints = _data['pattoo_datapoints']
+
+        # The first post contains all the stable key-value pairs
+        result = encoder.encode(_data)
+        self.assertEqual(sorted(result.keys()), sorted(DELTA_KEYS))
+        self.assertEqual(result['pattoo_session'], encoder.session)
+        self.assertEqual(result['pattoo_session_base'], 0)
+        self.assertEqual(
+            len(result['pattoo_datapoint_pairs']),
+            len(datapoints['datapoint_pairs']))
+        for values in result['pattoo_datapoint_values']:
+            self.assertEqual(
+                sorted([_[0] for _ in values]), sorted(DELTA_VOLATILE_KEYS))
+        for key, _ in result['pattoo_key_value_pairs'].values():
+            self.assertFalse(key in DELTA_VOLATILE_KEYS)
+        count = len(result['pattoo_key_value_pairs'])
+
+        # Unacknowledged pairs are sent again
+        result = encoder.encode(_data)
+        self.assertEqual(result['pattoo_session_base'], 0)
+        self.assertEqual(len(result['pattoo_key_value_pairs']), count)
+
+        # Acknowledged pairs are not
+        encoder.acknowledge(result)
+        result = encoder.encode(_post())
+        self.assertEqual(result['pattoo_session_base'], count)
+        self.assertEqual(result['pattoo_key_value_pairs'], {})
+
+        # Only the new pairs of another agent are sent
+        result = encoder.encode(_post(agent_id='agent_2'))
+        self.assertTrue(0 < len(result['pattoo_key_value_pairs']) < count)
+
+        # Cached data is keyed by string integers
+        result = encoder.encode(json.loads(json.dumps(_data)))
+        self.assertEqual(result['pattoo_session_base'], count)
+
+        # A new session is started when the dictionary is too large
+        encoder = converter.DeltaEncoder(max_pairs=1)
+        encoder.acknowledge(encoder.encode(_data))
+        session = encoder.session
+        result = encoder.encode(_data)
+        self.assertNotEqual(result['pattoo_session'], session)
+        self.assertEqual(len(result['pattoo_key_value_pairs']), count)
+
+        # Test bad data
+        self.assertIsNone(encoder.encode({}))
+        self.assertIsNone(encoder.encode(None))
+        _data['pattoo_datapoints']['datapoint_pairs'].append([-1])
+        self.assertIsNone(encoder.encode(_data))
+
+    def test_acknowledge(self):
+        """Testing method or function named acknowledge."""
+        # Test
+        encoder = converter.DeltaEncoder()
+        result = encoder.encode(_post())
+        encoder.acknowledge(result)
+        self.assertEqual(
+            encoder.acknowledged, len(result['pattoo_key_value_pairs']))
+
+        # Posts of an earlier session are ignored
+        encoder.reset()
+        encoder.acknowledge(result)
+        self.assertEqual(encoder.acknowledged, 0)
+
+
+class TestDeltaDecoder(unittest.TestCase):
+    """Checks all functions and methods."""
+
+    #########################################################################
+    # General object setup
+    #########################################################################
+
+    def test___init__(self):
+        """Testing method or function named __init__."""
+        # Test
+        decoder = converter.DeltaDecoder()
+        self.assertEqual(decoder.max_sessions, 1024)
+
+    def test_decode(self):
+        """Testing method or function named decode."""
+        # Initialize key variables
+        encoder = converter.DeltaEncoder()
+        decoder = converter.DeltaDecoder()
+        posts = [_post(), _post(agent_id='agent_2'), _post()]
+        expected = [
+            converter.cache_to_keypairs(json.loads(json.dumps(_)))
+            for _ in posts]
+
+        # Decoded posts must give the same records as the originals. Simulate
+        # the conversion to JSON when posting
+        for index, _data in enumerate(posts):
+            delta = encoder.encode(_data)
+            result = decoder.decode(json.loads(json.dumps(delta)))
+            self.assertEqual(sorted(result.keys()), sorted(CACHE_KEYS))
+            self.assertEqual(
+                converter.cache_to_keypairs(result), expected[index])
+            encoder.acknowledge(delta)
+
+        # Posts that weren't acknowledged can be sent again
+        delta = json.loads(json.dumps(encoder.encode(_post(agent_id='new'))))
+        self.assertIsNotNone(decoder.decode(delta))
+        self.assertIsNotNone(decoder.decode(delta))
+
+        # The server doesn't know the session
+        self.assertIsNone(converter.DeltaDecoder().decode(delta))
+        delta['pattoo_session_base'] += 1000
+        self.assertIsNone(decoder.decode(delta))
+
+        # The agent and server disagree about a key-value pair
+        delta = json.loads(json.dumps(encoder.encode(_post(agent_id='bad'))))
+        delta['pattoo_key_value_pairs']['0'] = ['pattoo_key', 'bad']
+        self.assertIsNone(decoder.decode(delta))
+
+        # Test bad data
+        self.assertIsNone(decoder.decode({}))
+        self.assertIsNone(decoder.decode(None))
+        delta = json.loads(json.dumps(encoder.encode(_post())))
+        delta['pattoo_datapoint_pairs'].append([100000])
+        delta['pattoo_datapoint_values'].append([])
+        self.assertIsNone(decoder.decode(delta))
+
+        # Invalid posts don't change the session
+        delta = json.loads(json.dumps(encoder.encode(_post())))
+        self.assertIsNotNone(decoder.decode(delta))
+
+        # The least recently used sessions are forgotten
+        decoder = converter.DeltaDecoder(max_sessions=1)
+        first = converter.DeltaEncoder()
+        second = converter.DeltaEncoder()
+        for encoder in [first, second]:
+            delta = encoder.encode(_post())
+            self.assertIsNotNone(decoder.decode(delta))
+            encoder.acknowledge(delta)
+        self.assertIsNotNone(decoder.decode(second.encode(_post())))
+        self.assertIsNone(decoder.decode(first.encode(_post())))
+
+
+class TestRecordFactory(unittest.TestCase):
+    """Checks all functions and methods."""
+
+    #########################################################################
+    # General object setup
+    #########################################################################
+
+    def test_record(self):
+        """Testing method or function named record."""
+        # Initialize key variables
+        item = {
+            'pattoo_agent_id': 'agent_1',
+            'pattoo_agent_polled_target': 'localhost',
+            'pattoo_agent_program': 'program_1',
+            'pattoo_agent_hostname': 'swim',
+            'pattoo_agent_polling_interval': '10000',
+            'pattoo_key': 'key_1',
+            'pattoo_data_type': DATA_INT,
+            'pattoo_value': 1,
+            'pattoo_timestamp': 1575789070107,
+            'pattoo_checksum': 'checksum_1',
+            'Financial Year': '2020',
+            'Department-Name': 'x' * 600,
+            'Ignored': 1
+        }
+        factory = converter.RecordFactory()
+
+        # Test
+        result = factory.record(item)
+        self.assertEqual(result.pattoo_checksum, converter._checksum(
+            'agent_1', 'localhost', 'checksum_1'))
+        self.assertEqual(result.pattoo_value, 1)
+        self.assertEqual(result.pattoo_agent_polling_interval, '10000')
+        self.assertEqual(result.pattoo_metadata, [
+            ('department_name', 'x' * MAX_KEYPAIR_LENGTH),
+            ('financial_year', '2020')])
+        self.assertEqual(factory.record(dict(item)), result)
+
+        # Normalized keys are remembered
+        self.assertEqual(factory._names, {
+            'Department-Name': 'department_name',
+            'Financial Year': 'financial_year'})
+
+        # Test invalid items
+        for key, value in [
+                ('pattoo_data_type', 'bad'), ('pattoo_data_type', []),
+                (1, 'bad')]:
+            _item = dict(item)
+            _item[key] = value
+            self.assertIsNone(factory.record(_item))
+        _item = dict(item)
+        del _item['pattoo_agent_program']
+        self.assertIsNone(factory.record(_item))
+
+        # Checksums created by checksums() are used
+        self.assertEqual(
+            factory.record(item, checksum='checksum').pattoo_checksum,
+            'checksum')
+
+    def test_records(self):
+        """Testing method or function named records."""
+        # Initialize key variables
+        _data = json.loads(json.dumps(_post()))
+        key_value_pairs = _data['pattoo_datapoints']['key_value_pairs']
+        items = [
+            converter._datapoint_item(pair_ids, key_value_pairs, 'Invalid')
+            for pair_ids in _data['pattoo_datapoints']['datapoint_pairs']]
+        items.insert(1, None)
+        items.append({})
+        factory = converter.RecordFactory()
+
+        # The checksums of all the items are created at once
+        with patch(
+                'pattoo_shared.converter.checksums',
+                wraps=converter.checksums) as mock_checksums:
+            result = factory.records(items)
+            self.assertEqual(mock_checksums.call_count, 1)
+        self.assertEqual(len(result), len(items))
+        self.assertIsNone(result[1])
+        self.assertIsNone(result[-1])
+        self.assertEqual(
+            result[:1] + result[2:-1],
+            [factory.record(_) for _ in items[:1] + items[2:-1]])
 
 
 class TestBasicFunctions(unittest.TestCase):
@@ -123,6 +432,136 @@ class TestBasicFunctions(unittest.TestCase):
             pattoo_agent_polling_interval='10000')
         self.assertEqual(result, expected)
 
+        # Cache data encoded by any codec can be converted
+        for name in ['json', 'binary']:
+            result = converter.cache_to_keypairs(
+                codec.codec(name).encode(cache))
+            self.assertEqual(result, pattoo_db_records)
+        self.assertEqual(converter.cache_to_keypairs(b'{'), [])
+
+        # The checksums of the cache data are created at once
+        with patch(
+                'pattoo_shared.converter.checksums',
+                wraps=converter.checksums) as mock_checksums:
+            self.assertEqual(
+                converter.cache_to_keypairs(cache), pattoo_db_records)
+            self.assertEqual(mock_checksums.call_count, 1)
+
+    def test_iter_cache_to_keypairs(self):
+        """Testing method or function named iter_cache_to_keypairs."""
+        # Initialize key variables
+        _data = json.loads(json.dumps(_post()))
+        expected = converter.cache_to_keypairs(_data)
+        self.assertTrue(len(expected) > 2)
+
+        # Records are the same as cache_to_keypairs
+        result = converter.iter_cache_to_keypairs(_data)
+        self.assertFalse(isinstance(result, list))
+        self.assertEqual(list(result), expected)
+        result = list(converter.iter_cache_to_keypairs(
+            codec.codec('binary').encode(_data)))
+        self.assertEqual(result, expected)
+
+        # Test chunks
+        result = list(converter.iter_cache_to_keypairs(_data, chunk_size=2))
+        self.assertEqual(len(result), (len(expected) + 1) // 2)
+        self.assertTrue(False not in [len(_) <= 2 for _ in result])
+        self.assertEqual([_ for chunk in result for _ in chunk], expected)
+
+        # Checksums are created for each batch of datapoints
+        with patch('pattoo_shared.converter._RECORD_BATCH_SIZE', 3), patch(
+                'pattoo_shared.converter.checksums',
+                wraps=converter.checksums) as mock_checksums:
+            result = list(converter.iter_cache_to_keypairs(_data))
+            self.assertEqual(result, expected)
+            self.assertEqual(
+                mock_checksums.call_count, (len(expected) + 2) // 3)
+
+        # Invalid datapoints are skipped
+        datapoint_pairs = _data['pattoo_datapoints']['datapoint_pairs']
+        datapoint_pairs[0] = [999999]
+        datapoint_pairs[2] = None
+        datapoint_pairs[-1] = datapoint_pairs[-1][:2]
+        errors = []
+        result = list(converter.iter_cache_to_keypairs(_data, errors=errors))
+        self.assertEqual(result, expected[1:2] + expected[3:-1])
+        self.assertEqual(errors, [0, 2, len(datapoint_pairs) - 1])
+        self.assertEqual(converter.cache_to_keypairs(_data), [])
+
+        # Invalid structure yields nothing
+        for item in [None, b'{', {}, {'pattoo_datapoints': []}]:
+            errors = []
+            result = list(converter.iter_cache_to_keypairs(
+                item, errors=errors))
+            self.assertEqual(result, [])
+            self.assertEqual(errors, [])
+
+    def test_cache_files_to_keypairs(self):
+        """Testing method or function named cache_files_to_keypairs."""
+        # Initialize key variables
+        directory = tempfile.mkdtemp()
+        posts = {}
+        for index in range(4):
+            filepath = os.path.join(directory, '{}.json'.format(index))
+            posts[filepath] = _post(agent_id='agent_{}'.format(index))
+            with open(filepath, 'w') as filehandle:
+                json.dump(posts[filepath], filehandle)
+        with open(os.path.join(directory, '2.5.json'), 'w') as filehandle:
+            filehandle.write('{')
+        with open(os.path.join(directory, '5.txt'), 'w') as filehandle:
+            filehandle.write('{}')
+        filepaths = sorted(posts.keys())
+        expected = [
+            (filepath, converter.cache_to_keypairs(
+                json.loads(json.dumps(posts[filepath]))))
+            for filepath in filepaths]
+
+        # Results are in filename order
+        for workers in [1, 2, None]:
+            result = converter.cache_files_to_keypairs(
+                directory, workers=workers, die=False)
+            self.assertEqual(result, expected)
+
+        # Test count. The unreadable file isn't counted
+        for workers in [1, 2]:
+            result = converter.cache_files_to_keypairs(
+                directory, workers=workers, die=False, count=3)
+            self.assertEqual(result, expected[:3])
+
+        # Test errors
+        with self.assertRaises(SystemExit):
+            converter.cache_files_to_keypairs(directory, workers=2)
+        shutil.rmtree(directory)
+        directory = tempfile.mkdtemp()
+        self.assertEqual(converter.cache_files_to_keypairs(
+            directory, die=False), [])
+        with self.assertRaises(SystemExit):
+            converter.cache_files_to_keypairs(directory)
+        os.rmdir(directory)
+
+    def test__cache_pairs(self):
+        """Testing method or function named _cache_pairs."""
+        # Test
+        _data = _post()
+        result = converter._cache_pairs(_data)
+        self.assertEqual(result, (
+            _data['pattoo_datapoints']['key_value_pairs'],
+            _data['pattoo_datapoints']['datapoint_pairs']))
+        _data['pattoo_datapoints']['datapoint_pairs'] = {}
+        self.assertIsNone(converter._cache_pairs(_data))
+        self.assertIsNone(converter._cache_pairs(b'{'))
+
+    def test__datapoint_item(self):
+        """Testing method or function named _datapoint_item."""
+        # Test
+        key_value_pairs = {'0': ['a', 1], '1': ['b', 2], '2': ['c']}
+        self.assertEqual(
+            converter._datapoint_item([0, 1], key_value_pairs, 'Invalid'),
+            {'a': 1, 'b': 2})
+        for pair_ids in [[0, 2], [3], None]:
+            self.assertIsNone(converter._datapoint_item(
+                pair_ids, key_value_pairs, 'Invalid'))
+
     def test__make_pattoo_db_record(self):
         """Testing method or function named _make_pattoo_db_record."""
         pass
@@ -229,6 +668,31 @@ class TestBasicFunctions(unittest.TestCase):
             if key not in [5, 9]:
                 self.assertEqual(expected['key_value_pairs'][key], value)
 
+    def test_datapoints_to_dicts_targets(self):
+        """Testing method or function named datapoints_to_dicts."""
+        # Initialize key variables
+        datapoints = converter.agentdata_to_datapoints(ta.test_agent())
+        datapoints.append(DataPoint('invalid', None))
+        datapoints.append(None)
+
+        # The result is the same as assigning IDs one pair at a time
+        counter = converter.Counter()
+        datapoint_pairs = []
+        for datapoint in datapoints[:-2]:
+            pairs = list(datapoint.metadata.items()) + [
+                ('pattoo_key', datapoint.key),
+                ('pattoo_data_type', datapoint.data_type),
+                ('pattoo_value', datapoint.value),
+                ('pattoo_timestamp', datapoint.timestamp),
+                ('pattoo_checksum', datapoint.checksum)]
+            datapoint_pairs.append(
+                [counter.counter(key, value) for key, value in pairs])
+
+        result = converter.datapoints_to_dicts(datapoints)
+        self.assertEqual(result, {
+            'key_value_pairs': counter.inverse_pairs,
+            'datapoint_pairs': datapoint_pairs})
+
     def test_agentdata_to_post(self):
         """Testing method or function named agentdata_to_post."""
         # Setup AgentPolledData
@@ -324,6 +788,146 @@ class TestBasicFunctions(unittest.TestCase):
         self.assertEqual(result['pattoo_datapoints'][0].key, key)
         self.assertEqual(result['pattoo_datapoints'][0].value, value)
 
+    def test_posts_to_batch(self):
+        """Testing method or function named posts_to_batch."""
+        # Initialize key variables
+        posts = []
+        for agent_id in ['agent_1', 'agent_2']:
+            agentdata = ta.test_agent()
+            agentdata.agent_id = agent_id
+            posts.append(converter.posting_data_points(
+                converter.agentdata_to_post(agentdata)))
+
+        # Test
+        result = converter.posts_to_batch(posts)
+        self.assertEqual(
+            sorted(result.keys()),
+            ['pattoo_batch', 'pattoo_key_value_pairs'])
+        self.assertEqual(len(result['pattoo_batch']), 2)
+
+        # Key-value pairs common to both posts are only sent once
+        pairs = result['pattoo_key_value_pairs']
+        self.assertEqual(len(pairs), len(set(pairs.values())))
+        self.assertTrue(len(pairs) < sum([len(
+            _['pattoo_datapoints']['key_value_pairs']) for _ in posts]))
+
+        for index, item in enumerate(result['pattoo_batch']):
+            self.assertEqual(
+                item['pattoo_agent_id'], posts[index]['pattoo_agent_id'])
+            self.assertEqual(
+                item['pattoo_agent_timestamp'],
+                posts[index]['pattoo_agent_timestamp'])
+
+        # Invalid posts are ignored
+        result = converter.posts_to_batch([{}, posts[0], None])
+        self.assertEqual(len(result['pattoo_batch']), 1)
+
+    def test_batch_to_posts(self):
+        """Testing method or function named batch_to_posts."""
+        # Initialize key variables
+        posts = []
+        for agent_id in ['agent_1', 'agent_2']:
+            agentdata = ta.test_agent()
+            agentdata.agent_id = agent_id
+            posts.append(converter.posting_data_points(
+                converter.agentdata_to_post(agentdata)))
+
+        # Simulate the conversion to JSON when posting
+        batch = json.loads(json.dumps(converter.posts_to_batch(posts)))
+        posts = json.loads(json.dumps(posts))
+
+        # Test. The split posts must give the same records as the originals
+        result = converter.batch_to_posts(batch)
+        self.assertEqual(len(result), len(posts))
+        for index, item in enumerate(result):
+            self.assertEqual(
+                converter.cache_to_keypairs(item),
+                converter.cache_to_keypairs(posts[index]))
+
+        # Test bad data
+        self.assertEqual(converter.batch_to_posts({}), [])
+        self.assertEqual(converter.batch_to_posts(None), [])
+        batch['pattoo_key_value_pairs'].popitem()
+        self.assertEqual(converter.batch_to_posts(batch), [])
+
+    def test_iterencode(self):
+        """Testing method or function named iterencode."""
+        # Initialize key variables
+        _data = _post()
+        expected = json.dumps(_data).encode()
+
+        # Test
+        result = list(converter.iterencode(_data, chunk_bytes=100))
+        self.assertTrue(len(result) > 1)
+        self.assertEqual(b''.join(result), expected)
+        result = list(converter.iterencode(_data))
+        self.assertEqual(result, [expected])
+
+        # Keys are converted just like json.dumps
+        for item in [
+                {1: 2, 'a': [], 'b': {}, None: (1, [2]), 1.5: {'c': True}},
+                [], {}, 'string', None, [[1, 2], [3]]]:
+            self.assertEqual(
+                b''.join(converter.iterencode(item, chunk_bytes=1)),
+                json.dumps(item).encode())
+
+    def test__fragments(self):
+        """Testing method or function named _fragments."""
+        # Nested values are serialized one item at a time
+        self.assertEqual(
+            list(converter._fragments({'a': [1, [2]]}, 2)),
+            ['{"a": ', '[', '1', ', ', '[2]', ']', '}'])
+        self.assertEqual(
+            list(converter._fragments({'a': [1, [2]]}, 0)),
+            ['{"a": [1, [2]]}'])
+
+    def test_valid_envelope(self):
+        """Testing method or function named valid_envelope."""
+        # Test
+        body = json.dumps(_post()).encode()
+        self.assertTrue(converter.valid_envelope(body))
+        self.assertTrue(converter.valid_envelope(b' ' + body + b'\n'))
+        self.assertFalse(converter.valid_envelope(body[1:]))
+        self.assertFalse(converter.valid_envelope(json.loads(body)))
+        self.assertFalse(converter.valid_envelope(b'{"test": "data"}'))
+        self.assertFalse(converter.valid_envelope(
+            body.replace(b'"pattoo_agent_id"', b'"agent_id"')))
+
+    def test__valid_post(self):
+        """Testing method or function named _valid_post."""
+        # Initialize key variables
+        agentdata = ta.test_agent()
+        _data = converter.posting_data_points(
+            converter.agentdata_to_post(agentdata))
+
+        # Test
+        self.assertTrue(converter._valid_post(_data))
+        self.assertFalse(converter._valid_post(None))
+        self.assertFalse(converter._valid_post({}))
+        _data['pattoo_datapoints'] = []
+        self.assertFalse(converter._valid_post(_data))
+
+    def test_checksums(self):
+        """Testing method or function named checksums."""
+        # Test
+        keys = [(1, 2, 3), ('a', 'b', 'c'), ([1], 2, 3), (1, 2, 3)]
+        result = converter.checksums(keys)
+        self.assertEqual(
+            result, [converter._checksum(*key) for key in keys])
+        self.assertEqual(result[0], result[3])
+        self.assertEqual(converter.checksums([]), [])
+
+    def test_checksum_cache_info(self):
+        """Testing method or function named checksum_cache_info."""
+        # Test
+        converter._cached_checksum.cache_clear()
+        converter.checksums([('a', 'b', 'c'), ('a', 'b', 'c'), ('a', 'b', 1)])
+        result = converter.checksum_cache_info()
+        self.assertEqual(result.hits, 1)
+        self.assertEqual(result.misses, 2)
+        self.assertEqual(result.currsize, 2)
+        self.assertEqual(result.maxsize, converter._CHECKSUM_CACHE_SIZE)
+
     def test__keypairs(self):
         """Testing method or function named _keypairs."""
         # Test
@@ -337,6 +941,14 @@ class TestBasicFunctions(unittest.TestCase):
         expected = [('test_this_out', '7')]
         self.assertEqual(result, expected)
 
+    def test__keypair_key(self):
+        """Testing method or function named _keypair_key."""
+        # Test
+        self.assertEqual(converter._keypair_key('Alpha Bravo'), 'alpha_bravo')
+        self.assertEqual(converter._keypair_key('a-b.c'), 'a_b_c')
+        self.assertEqual(
+            len(converter._keypair_key('a' * 600)), MAX_KEYPAIR_LENGTH)
+
     def test__checksum(self):
         """Testing method or function named _checksum."""
         # Test
@@ -346,6 +958,21 @@ class TestBasicFunctions(unittest.TestCase):
 ba613b31bb5c9c36214dc9f14a42fd7a2fdb84856bca5c44c2''')
         self.assertEqual(result, expected)
 
+        # Cached results are the same
+        self.assertEqual(converter._checksum(1, 2, 3), expected)
+
+        # Values of different types aren't confused
+        self.assertNotEqual(
+            converter._checksum('a', 'b', 1),
+            converter._checksum('a', 'b', 1.0))
+
+        # Values that can't be cached are hashed
+        result = converter._checksum([1], 2, 3)
+        expected = ('''\
+afbaf880c7b27a2459a5613c1538993422f0fee698f258362866464be80c19cbcc0ce33a3959ef\
+a7f2fe65241f78901b3b2245175f8008407ac8fa6d0e60ab51''')
+        self.assertEqual(result, expected)
+
 
 if __name__ == '__main__':
     # Make sure the environment is OK to run unittests
@@ -7,6 +7,8 @@ import os
 import sys
 import shutil
 import stat
+import tempfile
+from unittest.mock import patch
 
 
 # Try to create a working PYTHONPATH
@@ -25,6 +27,7 @@ else:
 
 # Pattoo imports
 import pattoo_shared.encrypt as pgp
+from pattoo_shared import cipher
 
 
 class TestEncrypt(unittest.TestCase):
@@ -403,6 +406,42 @@ class TestEncrypt(unittest.TestCase):
         self.assertIsNotNone(fp1)
         self.assertIsNotNone(fp2)
 
+        # Unknown email addresses have no fingerprint
+        self.assertIsNone(self.gpg1.email_to_key('unknown@example.org'))
+
+    def test_invalidate_keys(self):
+        """Tests that keys are only listed when the keyring changes.
+        """
+
+        gpg = self.gpg1
+        gpg.invalidate_keys()
+
+        with patch.object(
+                gpg.gpg, 'list_keys', wraps=gpg.gpg.list_keys) as mock_list:
+            # Keys are listed once for all lookups
+            gpg.set_keyid()
+            gpg.set_email()
+            gpg.list_pub_keys()
+            self.assertEqual(gpg.email_to_key(self.email_1), gpg.fingerprint)
+            self.assertEqual(mock_list.call_count, 1)
+
+            # Keys are listed again after the keyring changes
+            gpg.trust_key(gpg.fingerprint)
+            gpg.set_keyid()
+            self.assertEqual(mock_list.call_count, 2)
+            gpg.invalidate_keys()
+            gpg.set_keyid()
+            self.assertEqual(mock_list.call_count, 3)
+
+    def test__uid_email(self):
+        """Tests that email addresses are retrieved from uids.
+        """
+
+        self.assertEqual(
+            pgp._uid_email('John Brown (Comment) <john@example.org>'),
+            'john@example.org')
+        self.assertIsNone(pgp._uid_email('John Brown'))
+
     def test_encrypt_decrypt_data(self):
         """Test both public key encryption and decryption.
         """
@@ -477,6 +516,81 @@ class TestEncrypt(unittest.TestCase):
 
         self.assertEqual(original_data, decrypted_data)
 
+    def test_sym_encrypt_decrypt_files(self):
+        """Tests both symmetric encryption and decryption of files.
+        """
+
+        # Creates files of different sizes
+        directory = tempfile.mkdtemp()
+        source = os.path.join(directory, 'source')
+        output = os.path.join(directory, 'output')
+        os.makedirs(source)
+        os.makedirs(output)
+        contents = {}
+        for index, size in enumerate([0, 10, 1000000]):
+            filename = 'file_{}.json'.format(index)
+            contents[filename] = os.urandom(size // 2).hex().encode()
+            with open(os.path.join(source, filename), 'wb') as f:
+                f.write(contents[filename])
+
+        password = self.gpg1.gen_symm_key()
+        reports = []
+
+        # Encrypts files in place
+        report = self.gpg1.sym_encrypt_files(
+            password, source, output, workers=2, progress=reports.append)
+        self.assertEqual(report.files, 3)
+        self.assertEqual(report.failures, 0)
+        self.assertEqual(report.bytes, 1000010)
+        self.assertEqual([_.files for _ in reports], [1, 2, 3])
+        self.assertEqual(sorted(os.listdir(source)), sorted(contents))
+        for filename in contents:
+            with open(os.path.join(source, filename), 'rb') as f:
+                self.assertTrue(f.read().startswith(
+                    b'-----BEGIN PGP MESSAGE-----'))
+
+        # Files can't be decrypted with the wrong password
+        report = self.gpg2.sym_decrypt_files('wrong', source, output)
+        self.assertEqual(report.failures, 3)
+        self.assertEqual(os.listdir(output), [])
+
+        # Decrypts files
+        report = self.gpg2.sym_decrypt_files(
+            password, source, output, delaf=True)
+        self.assertEqual(report.files, 3)
+        self.assertEqual(report.failures, 0)
+        self.assertEqual(os.listdir(source), [])
+        for filename, content in contents.items():
+            with open(os.path.join(output, filename), 'rb') as f:
+                self.assertEqual(f.read(), content)
+
+        # Encrypted files can be moved to the output directory
+        report = self.gpg1.sym_encrypt_files(
+            password, output, source, delaf=True)
+        self.assertEqual(report.files, 3)
+        self.assertEqual(os.listdir(output), [])
+        self.assertEqual(sorted(os.listdir(source)), sorted(contents))
+        shutil.rmtree(directory)
+
+    @unittest.skipIf(cipher.available() is False,
+                     'The "cryptography" package is required')
+    def test_symmetric_decrypt_aesgcm(self):
+        """Tests decryption of data encrypted in-process.
+        """
+
+        original_data = 'HELLO WORLD!'
+
+        # Generates random symmetric key
+        password = self.gpg1.gen_symm_key()
+
+        # Encrypts data with AES-GCM
+        encrypted_data = cipher.AESGCMCipher().encrypt(original_data, password)
+
+        # Decrypts data
+        decrypted_data = self.gpg2.symmetric_decrypt(encrypted_data, password)
+
+        self.assertEqual(original_data, decrypted_data)
+
     def test_set_email(self):
         """Set email test.
 
@@ -200,6 +200,16 @@ class TestBasicFunctions(unittest.TestCase):
         # First test, only 2 files
         self.assertEqual(len(result), 2)
 
+        # Files younger than age are skipped, and aren't included in count
+        (new, old) = sorted(filenames)
+        os.utime(old, (0, 0))
+        self.assertEqual(
+            files.read_json_files(directory, die=False, count=1),
+            [(new, dict_1)])
+        self.assertEqual(
+            files.read_json_files(directory, die=False, age=3600, count=1),
+            [(old, dict_2)])
+
         # Clean up
         for filepath, data in result:
             self.assertEqual(filepath in filenames, True)
@@ -208,6 +218,28 @@ class TestBasicFunctions(unittest.TestCase):
             os.remove(filepath)
         os.removedirs(directory)
 
+    def test_json_filepaths(self):
+        """Testing method or function named json_filepaths."""
+        # Initialize key variables
+        directory = tempfile.mkdtemp()
+        for filename in ['2.json', '1.json', '3.txt', '0.json']:
+            with open(os.path.join(directory, filename), 'w') as filehandle:
+                json.dump({}, filehandle)
+        old = os.path.join(directory, '1.json')
+        os.utime(old, (0, 0))
+
+        # Test
+        result = files.json_filepaths(directory)
+        self.assertEqual(result, [
+            os.path.join(directory, filename)
+            for filename in ['0.json', '1.json', '2.json']])
+        self.assertEqual(files.json_filepaths(directory, age=3600), [old])
+
+        # Clean up
+        shutil.rmtree(directory)
+        with self.assertRaises(SystemExit):
+            files.json_filepaths(directory)
+
     def test_read_json_file(self):
         """Testing function read_json_file."""
         # Initialize key variables
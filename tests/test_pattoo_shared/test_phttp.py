@@ -3,6 +3,7 @@
 
 # Standard imports
 import unittest
+import requests
 import requests_mock
 from unittest.mock import patch
 import json
@@ -10,6 +11,7 @@ import hashlib
 import uuid
 import os
 import sys
+import threading
 from time import time
 
 # Try to create a working PYTHONPATH
@@ -29,13 +31,189 @@ else:
 # Pattoo imports
 from pattoo_shared import phttp
 from pattoo_shared import data
+from pattoo_shared import cache
+from pattoo_shared import codec
+from pattoo_shared import cipher
 from pattoo_shared import converter
 from pattoo_shared.files import set_gnupg, get_gnupg
 from pattoo_shared.configuration import Config
 from tests.libraries.configuration import UnittestConfig
+from tests.libraries.server import StubServer
 from tests.resources import test_agent as ta
 
 
+def _save_legacy(_data, identifier, index):
+    """Create a cache file like those created before the cache spool.
+
+    Args:
+        _data: Dict to save
+        identifier: Unique identifier for the source of the data. (AgentID)
+        index: Index used to create a unique timestamp
+
+    Returns:
+        filepath: Cache file
+
+    """
+    # Save
+    cache_dir = Config().agent_cache_directory(identifier)
+    filepath = os.path.join(
+        cache_dir, '{}_{}.json'.format(1500000000000 + index, identifier))
+    with open(filepath, 'w') as f_handle:
+        json.dump(_data, f_handle)
+    return filepath
+
+
+class TestTransport(unittest.TestCase):
+    """Checks all functions and methods."""
+
+    def test___init__(self):
+        """Testing method or function named __init__."""
+        # Initialize
+        config = Config()
+        transport = phttp.Transport()
+
+        # Test
+        self.assertEqual(transport.pool_size, config.http_pool_size())
+        self.assertEqual(
+            transport.timeout,
+            (config.http_connect_timeout(), config.http_read_timeout()))
+        self.assertEqual(
+            transport.encryption_cipher, config.http_encryption_cipher())
+        self.assertTrue(isinstance(transport.session, requests.Session))
+
+    def test_new_session(self):
+        """Testing method or function named new_session."""
+        # Initialize
+        transport = phttp.Transport()
+        session_1 = transport.new_session()
+        session_2 = transport.new_session()
+
+        # Sessions are different, but share the same connection pools
+        self.assertNotEqual(session_1, session_2)
+        for prefix in ['http://', 'https://']:
+            self.assertEqual(
+                session_1.get_adapter(prefix), session_2.get_adapter(prefix))
+            self.assertEqual(
+                session_1.get_adapter(prefix),
+                transport.session.get_adapter(prefix))
+        self.assertEqual(session_1.timeout, transport.timeout)
+
+    def test_encode(self):
+        """Testing method or function named encode."""
+        # Initialize
+        transport = phttp.Transport()
+        _data = {'key_value_pairs': {
+            str(_): ('pattoo_checksum', data.hashstring(str(_), sha=512))
+            for _ in range(100)}}
+
+        # No compression by default
+        self.assertEqual(transport.encode(_data), {'json': _data})
+
+        # Test compression
+        body = json.dumps(_data).encode()
+        for encoding in ['gzip', 'deflate']:
+            transport.compression = encoding
+            result = transport.encode(_data)
+            self.assertEqual(
+                result['headers'], {
+                    'Content-Encoding': encoding,
+                    'Content-Type': 'application/json'})
+            self.assertTrue(len(result['data']) < len(body))
+            self.assertEqual(
+                phttp.decompress(result['data'], encoding), body)
+
+        # Small bodies aren't compressed
+        transport.compression_threshold = len(body) + 1
+        self.assertEqual(transport.encode(_data), {'json': _data})
+
+        # Bytes are posted unchanged
+        self.assertEqual(
+            transport.encode(body), {
+                'data': body,
+                'headers': {'Content-Type': 'application/json'}})
+        transport.compression_threshold = 0
+        result = transport.encode(body)
+        self.assertEqual(phttp.decompress(result['data'], 'deflate'), body)
+        transport.compression_threshold = len(body) + 1
+
+        # Test the binary codec
+        transport.compression = None
+        transport.codec = codec.codec('binary')
+        self.assertEqual(
+            transport.encode(_data), {
+                'data': codec.codec('binary').encode(_data),
+                'headers': {'Content-Type': 'application/x-pattoo-binary'}})
+        self.assertEqual(
+            transport.encode(_data, codec.codec('json')), {'json': _data})
+        transport.compression = 'gzip'
+        transport.compression_threshold = 0
+        result = transport.encode(_data)
+        self.assertEqual(
+            codec.decode(phttp.decompress(result['data'], 'gzip')),
+            json.loads(body))
+        transport.codec = codec.codec('json')
+
+        # Test chunked transfer encoding
+        transport.chunk_bytes = 1000
+        transport.compression = None
+        result = transport.encode(_data)
+        self.assertEqual(
+            result['headers'], {'Content-Type': 'application/json'})
+        chunks = list(result['data'])
+        self.assertTrue(len(chunks) > 1)
+        self.assertEqual(b''.join(chunks), body)
+
+        # Chunks are always compressed
+        for encoding in ['gzip', 'deflate']:
+            transport.compression = encoding
+            result = transport.encode(_data)
+            self.assertEqual(
+                result['headers'], {
+                    'Content-Encoding': encoding,
+                    'Content-Type': 'application/json'})
+            self.assertEqual(
+                phttp.decompress(b''.join(result['data']), encoding), body)
+
+    def test_post_chunked(self):
+        """Testing method or function named post with chunked data."""
+        # Initialize
+        transport = phttp.Transport()
+        transport.chunk_bytes = 10
+        url = 'http://127.0.0.6:50505/pattoo/api/v1/agent/receive/123'
+        _data = {'Test': ['data'] * 10}
+        bodies = []
+
+        def callback(request, context):
+            """Read the chunked body."""
+            bodies.append(b''.join(request.body))
+            context.status_code = 200
+            return ''
+
+        # Test
+        with requests_mock.Mocker() as m_object:
+            m_object.post(url, text=callback)
+            result = transport.post(url, **transport.encode(_data))
+            self.assertEqual(result.status_code, 200)
+            self.assertEqual(
+                m_object.last_request.headers['Transfer-Encoding'],
+                'chunked')
+        self.assertEqual(bodies, [json.dumps(_data).encode()])
+
+    def test_post(self):
+        """Testing method or function named post."""
+        # Initialize
+        transport = phttp.Transport()
+        url = 'http://127.0.0.6:50505/pattoo/api/v1/agent/receive/123'
+
+        # Default timeouts must be applied to each request
+        with patch('pattoo_shared.phttp.requests.Session.send') as mock_send:
+            mock_send.return_value.status_code = 200
+            result = transport.post(url, json={'test': 'data'})
+            self.assertEqual(result.status_code, 200)
+            self.assertEqual(
+                mock_send.call_args[1]['timeout'], transport.timeout)
+
+
 class Test_Post(unittest.TestCase):
     """Test _Post."""
 
@@ -76,6 +254,11 @@ class TestPost(unittest.TestCase):
     _mod_data = json.dumps(data)
     mod_data = json.loads(_mod_data)
 
+    def setUp(self):
+        """Start each test with closed circuit breakers."""
+        # Reset
+        phttp.BREAKERS.clear()
+
     def test___init__(self):
         """Testing method or function named __init__."""
 
@@ -96,7 +279,7 @@ class TestPost(unittest.TestCase):
         post_test = phttp.Post(self.identifier, self.data)
 
         # Magically simulate post request
-        with patch('pattoo_shared.phttp.requests.post') as mock_post:
+        with patch('pattoo_shared.phttp.requests.Session.post') as mock_post:
 
             # Magically assign post response values
             mock_post.return_value.ok = True
@@ -116,13 +299,30 @@ class TestPost(unittest.TestCase):
             # Assert that the success is True
             self.assertTrue(success)
 
+    def test_post_delta_encoding(self):
+        """Testing method or function named post with delta encoding."""
+        # Initialize
+        with patch(
+                'pattoo_shared.phttp.Config.http_delta_encoding',
+                return_value=True):
+            post_test = phttp.Post(self.identifier, self.data)
+
+        # Test
+        with patch(
+                'pattoo_shared.phttp.post_delta',
+                return_value=True) as mock_post:
+            self.assertTrue(post_test.post())
+            mock_post.assert_called_once_with(
+                'http://127.0.0.6:50505/pattoo/api/v1/agent/delta',
+                self.data, self.identifier)
+
     def test_purge(self):
         """Testing method or function named purge."""
         # Initialize
         purge_test = phttp.Post(self.identifier, self.data)
 
         # Magically simulate post request
-        with patch('pattoo_shared.phttp.requests.post') as mock_post:
+        with patch('pattoo_shared.phttp.requests.Session.post') as mock_post:
 
             # Magically assign post response values
             mock_post.return_value.ok = True
@@ -175,6 +375,12 @@ class TestEncryptedPost(unittest.TestCase):
     # Create EncryptedPost object
     encrypted_post = phttp.EncryptedPost(identifier, data, agent_gpg)
 
+    def setUp(self):
+        """Start each test with closed circuit breakers and no key."""
+        # Reset
+        phttp.BREAKERS.clear()
+        self.encrypted_post._encrypted.session = None
+
     def test___init__(self):
         """Testing method or function named __init__."""
 
@@ -466,6 +672,301 @@ class TestEncryptedPost(unittest.TestCase):
             self.assertEqual(m.call_count, 4)
 
 
+class TestCircuitBreaker(unittest.TestCase):
+    """Checks all functions and methods."""
+
+    #########################################################################
+    # General object setup
+    #########################################################################
+
+    server = 'http://127.0.0.6:50505'
+
+    def _breaker(self, threshold=2, initial=10.0, maximum=40.0):
+        """Create a CircuitBreaker object with a known configuration."""
+        with patch.multiple(
+                'pattoo_shared.phttp.BaseConfig',
+                http_breaker_threshold=lambda _: threshold,
+                http_backoff_initial=lambda _: initial,
+                http_backoff_max=lambda _: maximum):
+            result = phttp.CircuitBreaker(self.server)
+        return result
+
+    def test___init__(self):
+        """Testing method or function named __init__."""
+        # Test
+        result = self._breaker()
+        self.assertEqual(result.server, self.server)
+        self.assertEqual(result.threshold, 2)
+        self.assertEqual(result.initial, 10.0)
+        self.assertEqual(result.maximum, 40.0)
+        self.assertEqual(result.state, phttp.CLOSED)
+        self.assertEqual(result.failures, 0)
+
+    def test_allow(self):
+        """Testing method or function named allow."""
+        # Closed breakers allow everything
+        _breaker = self._breaker()
+        self.assertTrue(_breaker.allow())
+        self.assertTrue(_breaker.allow())
+
+        # Open breakers allow nothing until the delay has passed
+        _breaker.failure()
+        _breaker.failure()
+        self.assertEqual(_breaker.state, phttp.OPEN)
+        self.assertFalse(_breaker.allow())
+
+        # Only a single post tests the server afterwards
+        _breaker.retry = time() - 1
+        self.assertTrue(_breaker.allow())
+        self.assertEqual(_breaker.state, phttp.HALF_OPEN)
+        self.assertFalse(_breaker.allow())
+
+    def test_blocked(self):
+        """Testing method or function named blocked."""
+        # Test
+        _breaker = self._breaker()
+        self.assertFalse(_breaker.blocked())
+        _breaker.failure()
+        _breaker.failure()
+        self.assertTrue(_breaker.blocked())
+
+        # The state doesn't change
+        _breaker.retry = time() - 1
+        self.assertFalse(_breaker.blocked())
+        self.assertEqual(_breaker.state, phttp.OPEN)
+
+    def test_success(self):
+        """Testing method or function named success."""
+        # Test
+        _breaker = self._breaker()
+        _breaker.failure()
+        _breaker.failure()
+        _breaker.retry = time() - 1
+        self.assertTrue(_breaker.allow())
+        _breaker.success()
+        self.assertEqual(_breaker.state, phttp.CLOSED)
+        self.assertEqual(_breaker.failures, 0)
+        self.assertEqual(_breaker.opened, 0)
+        self.assertTrue(_breaker.allow())
+        self.assertTrue(_breaker.allow())
+
+    def test_failure(self):
+        """Testing method or function named failure."""
+        # Consecutive failures open the breaker
+        _breaker = self._breaker()
+        _breaker.failure()
+        self.assertEqual(_breaker.state, phttp.CLOSED)
+        now = time()
+        _breaker.failure()
+        self.assertEqual(_breaker.state, phttp.OPEN)
+        self.assertTrue(now + 5 <= _breaker.retry <= time() + 10)
+
+        # A failed test of the server doubles the delay
+        for delay in [20, 40, 40]:
+            _breaker.retry = time() - 1
+            self.assertTrue(_breaker.allow())
+            now = time()
+            _breaker.failure()
+            self.assertEqual(_breaker.state, phttp.OPEN)
+            self.assertTrue(
+                now + delay / 2 <= _breaker.retry <= time() + delay)
+
+        # A threshold of zero disables the breaker
+        _breaker = self._breaker(threshold=0)
+        for _ in range(10):
+            _breaker.failure()
+        self.assertEqual(_breaker.state, phttp.CLOSED)
+        self.assertTrue(_breaker.allow())
+
+
+class TestEncryptedSession(unittest.TestCase):
+    """Checks all functions and methods."""
+
+    #########################################################################
+    # General object setup
+    #########################################################################
+
+    # Create Pgpier object
+    agent_gpg = set_gnupg(
+        'test_agent0', Config(), 'test_agent0@example.org')
+    exchange_url = 'http://127.0.0.6:50505/pattoo/api/v1/agent/key'
+    validation_url = 'http://127.0.0.6:50505/pattoo/api/v1/agent/validation'
+    url = 'http://127.0.0.6:50505/pattoo/api/v1/agent/encrypted'
+
+    def setUp(self):
+        """Start each test with closed circuit breakers."""
+        # Reset
+        phttp.BREAKERS.clear()
+
+    def _session(self):
+        """Create an EncryptedSession object."""
+        result = phttp.EncryptedSession(
+            self.agent_gpg, self.exchange_url, self.validation_url)
+        return result
+
+    def test___init__(self):
+        """Testing method or function named __init__."""
+        # Test
+        session = self._session()
+        self.assertEqual(session.ttl, Config().http_encryption_ttl())
+        self.assertIsNone(session.session)
+        self.assertEqual(session.negotiations, 0)
+
+    def test_get(self):
+        """Testing method or function named get."""
+        # The key is negotiated once
+        session = self._session()
+        with patch(
+                'pattoo_shared.phttp.key_exchange',
+                return_value=True) as mock_exchange:
+            (symmetric_key, _session) = session.get()
+            self.assertEqual(session.get(), (symmetric_key, _session))
+            self.assertEqual(mock_exchange.call_count, 1)
+
+            # A new key is negotiated once the key expires
+            session.expires = time() - 1
+            result = session.get()
+            self.assertNotEqual(result, (symmetric_key, _session))
+            self.assertEqual(mock_exchange.call_count, 2)
+        self.assertEqual(session.negotiations, 2)
+
+        # Failed key exchanges are tried again
+        session = self._session()
+        with patch(
+                'pattoo_shared.phttp.key_exchange',
+                return_value=False) as mock_exchange:
+            self.assertIsNone(session.get())
+            self.assertIsNone(session.get())
+            self.assertEqual(mock_exchange.call_count, 2)
+
+        # No key is negotiated while the server keeps failing
+        session = self._session()
+        phttp.breaker(self.exchange_url).state = phttp.OPEN
+        phttp.breaker(self.exchange_url).retry = time() + 3600
+        with patch(
+                'pattoo_shared.phttp.key_exchange',
+                return_value=True) as mock_exchange:
+            self.assertIsNone(session.get())
+            self.assertEqual(mock_exchange.call_count, 0)
+
+        # Failed key exchanges are recorded by the circuit breaker
+        phttp.BREAKERS.clear()
+        session = self._session()
+        with patch('pattoo_shared.phttp.key_exchange', return_value=False):
+            self.assertIsNone(session.get())
+        self.assertEqual(phttp.breaker(self.exchange_url).failures, 1)
+
+        # Errors during the negotiation don't leave the breaker half-open
+        _breaker = phttp.breaker(self.exchange_url)
+        _breaker.state = phttp.OPEN
+        _breaker.retry = time() - 1
+        session = self._session()
+        with patch(
+                'pattoo_shared.phttp.key_exchange',
+                side_effect=ValueError('test')):
+            with self.assertRaises(ValueError):
+                session.get()
+        self.assertEqual(_breaker.state, phttp.OPEN)
+        self.assertFalse(session._negotiating)
+        _breaker.retry = time() - 1
+        with patch('pattoo_shared.phttp.key_exchange', return_value=True):
+            self.assertIsNotNone(session.get())
+        self.assertEqual(_breaker.state, phttp.CLOSED)
+
+    def test_get_concurrent(self):
+        """Testing method or function named get."""
+        # Initialize key variables
+        session = self._session()
+        started = threading.Event()
+        release = threading.Event()
+        results = []
+
+        def _exchange(*args):
+            started.set()
+            release.wait(10)
+            return True
+
+        def _get():
+            results.append(session.get())
+
+        with patch(
+                'pattoo_shared.phttp.key_exchange',
+                side_effect=_exchange) as mock_exchange:
+            threads = [threading.Thread(target=_get) for _ in range(3)]
+            threads[0].start()
+            self.assertTrue(started.wait(10))
+            for thread in threads[1:]:
+                thread.start()
+
+            # The lock isn't held during the key exchange
+            session.invalidate(None)
+
+            # Other threads use the key negotiated by the first thread
+            release.set()
+            for thread in threads:
+                thread.join(10)
+            self.assertEqual(mock_exchange.call_count, 1)
+        self.assertEqual(len(results), 3)
+        self.assertIsNotNone(results[0])
+        self.assertEqual(results, [results[0]] * 3)
+
+    def test_invalidate(self):
+        """Testing method or function named invalidate."""
+        # Test
+        session = self._session()
+        with patch('pattoo_shared.phttp.key_exchange', return_value=True):
+            (_, old) = session.get()
+            session.invalidate(old)
+            self.assertIsNone(session.session)
+
+            # Newer sessions aren't affected
+            (_, new) = session.get()
+            session.invalidate(old)
+            self.assertIs(session.session, new)
+
+    def test_post(self):
+        """Testing method or function named post."""
+        # Initialize key variables
+        _data = {'test': 'data'}
+        identifier = data.hashstring(str(time()))
+        session = self._session()
+
+        with patch('pattoo_shared.phttp.key_exchange', return_value=True) as (
+                mock_exchange), requests_mock.Mocker() as m_object:
+            # Each post only takes a single request
+            m_object.post(self.url, status_code=202)
+            self.assertTrue(session.post(self.url, _data, identifier))
+            self.assertTrue(session.post(self.url, _data, identifier))
+            self.assertEqual(m_object.call_count, 2)
+            self.assertEqual(mock_exchange.call_count, 1)
+
+            # A new key is negotiated when the server rejects the key
+            m_object.post(self.url, [
+                {'status_code': 409}, {'status_code': 202}])
+            self.assertTrue(session.post(self.url, _data, identifier))
+            self.assertEqual(m_object.call_count, 4)
+            self.assertEqual(mock_exchange.call_count, 2)
+
+            # Data is cached if posting fails
+            m_object.post(self.url, status_code=500)
+            self.assertFalse(session.post(self.url, _data, identifier))
+            self.assertEqual(mock_exchange.call_count, 2)
+        result = list(phttp._read_cached(identifier))
+        self.assertEqual([_[1] for _ in result], [_data])
+        phttp._remove_cached([_[0] for _ in result], self.url)
+
+        # Data is cached if the key exchange fails
+        session = self._session()
+        with patch('pattoo_shared.phttp.key_exchange', return_value=False):
+            self.assertFalse(
+                session.post(self.url, _data, identifier, save=False))
+            self.assertEqual(list(phttp._read_cached(identifier)), [])
+            self.assertFalse(session.post(self.url, _data, identifier))
+        result = list(phttp._read_cached(identifier))
+        self.assertEqual([_[1] for _ in result], [_data])
+        phttp._remove_cached([_[0] for _ in result], self.url)
+
+
 class TestPassiveAgent(unittest.TestCase):
     """Checks all functions and methods."""
 
@@ -475,15 +976,341 @@ class TestPassiveAgent(unittest.TestCase):
 
     def test___init__(self):
         """Testing method or function named __init__."""
-        pass
+        # Test
+        agent = phttp.PassiveAgent('program', 'identifier', 'http://test')
+        self.assertEqual(agent._timeout, Config().passive_agent_timeout())
+        self.assertEqual(
+            agent._passthrough, Config().passive_agent_passthrough())
+        agent = phttp.PassiveAgent(
+            'program', 'identifier', 'http://test', timeout=1)
+        self.assertEqual(agent._timeout, 1)
+
+        # The configuration is read once, and only if a default is required
+        with patch(
+                'pattoo_shared.phttp.BaseConfig', wraps=phttp.BaseConfig) as (
+                mock_config):
+            phttp.PassiveAgent('program', 'identifier', 'http://test')
+            self.assertEqual(mock_config.call_count, 1)
+            agent = phttp.PassiveAgent(
+                'program', 'identifier', 'http://test', timeout=1,
+                passthrough=True)
+            self.assertEqual(mock_config.call_count, 1)
+            self.assertTrue(agent._passthrough)
 
     def test_relay(self):
         """Testing method or function named relay."""
-        pass
+        # Initialize key variables
+        server = StubServer(body=b'{"test": "data"}').start()
+        agent = phttp.PassiveAgent(
+            'program', 'identifier', server.url('/data'))
+
+        # Data is posted and the cache is purged
+        with patch('pattoo_shared.phttp.Post.post', return_value=True) as (
+                mock_post), patch('pattoo_shared.phttp.Post.purge') as (
+                    mock_purge):
+            agent.relay()
+            self.assertEqual(mock_post.call_count, 1)
+            self.assertEqual(mock_purge.call_count, 1)
+
+        # Nothing is posted when the data hasn't changed
+        with patch('pattoo_shared.phttp.Post.post') as mock_post:
+            agent.relay()
+            self.assertEqual(mock_post.call_count, 0)
+        self.assertEqual(agent.stats().skipped, 1)
+
+        # Nothing is posted when there is no data
+        server.body = b''
+        with patch('pattoo_shared.phttp.Post.post') as mock_post:
+            agent.relay()
+            self.assertEqual(mock_post.call_count, 0)
+        server.stop()
+
+    def test_relay_passthrough(self):
+        """Testing method or function named relay without parsing data."""
+        # Initialize key variables
+        phttp.BREAKERS.clear()
+        identifier = data.hashstring(str(time()))
+        body = json.dumps(converter.posting_data_points(
+            converter.agentdata_to_post(ta.test_agent())), indent=1).encode()
+        server = StubServer(body=body).start()
+        agent = phttp.PassiveAgent(
+            'program', identifier, server.url('/data'), passthrough=True)
+        url = Config().agent_api_server_url(identifier)
+
+        # The original bytes are posted
+        with requests_mock.Mocker() as m_object:
+            m_object.post(url, status_code=200)
+            agent.relay()
+            self.assertEqual(m_object.call_count, 1)
+            self.assertEqual(m_object.last_request.body, body)
+
+            # Unchanged data isn't posted
+            agent.relay()
+            self.assertEqual(m_object.call_count, 1)
+
+            # Invalid data isn't posted, and is a failure every time
+            server.body = b'{"test": "data"}'
+            agent.relay()
+            agent.relay()
+            self.assertEqual(m_object.call_count, 1)
+            self.assertEqual(agent.stats().failures, 2)
+            self.assertEqual(agent.stats().skipped, 1)
+
+        # The original bytes are cached when posting fails
+        server.body = body
+        agent = phttp.PassiveAgent(
+            'program', identifier, server.url('/data'), passthrough=True)
+        with requests_mock.Mocker() as m_object:
+            m_object.post(url, status_code=500)
+            agent.relay()
+        result = list(phttp._read_cached(identifier))
+        self.assertEqual(len(result), 1)
+        self.assertEqual(result[0][1], json.loads(body))
+        self.assertEqual(result[0][2], len(body) + cache._HEADER.size)
+        server.stop()
+
+    def test_fetch(self):
+        """Testing method or function named fetch."""
+        # Test
+        server = StubServer(body=b'{"test": "data"}').start()
+        agent = phttp.PassiveAgent(
+            'program', 'identifier', server.url('/data'), timeout=0.5)
+        self.assertEqual(agent.fetch(), b'{"test": "data"}')
+        server.stop()
+        self.assertIsNone(agent.fetch())
+        self.assertEqual(agent.stats().failures, 1)
+
+    def test_fetch_conditional(self):
+        """Testing method or function named fetch with unchanged data."""
+        # Unchanged data is skipped using the ETag
+        server = StubServer(
+            body=b'{"test": "data"}', headers={
+                'ETag': '"1"',
+                'Last-Modified': 'Wed, 21 Oct 2015 07:28:00 GMT'}).start()
+        agent = phttp.PassiveAgent(
+            'program', 'identifier', server.url('/data'), timeout=0.5)
+        self.assertEqual(agent.fetch(), b'{"test": "data"}')
+        self.assertIsNone(agent.fetch())
+        headers = server.requests[-1][1]
+        self.assertEqual(headers['If-None-Match'], '"1"')
+        self.assertEqual(
+            headers['If-Modified-Since'], 'Wed, 21 Oct 2015 07:28:00 GMT')
+
+        # Unchanged data is skipped using its hash
+        server.headers = {}
+        self.assertIsNone(agent.fetch())
+        self.assertIsNone(agent.fetch())
+        self.assertNotIn('If-None-Match', server.requests[-1][1])
+
+        # Changed data is fetched
+        server.body = b'{"test": "changed"}'
+        self.assertEqual(agent.fetch(), b'{"test": "changed"}')
+        result = agent.stats()
+        self.assertEqual(result.polls, 5)
+        self.assertEqual(result.skipped, 3)
+        self.assertEqual(result.failures, 0)
+        server.stop()
 
     def test_get(self):
         """Testing method or function named get."""
-        pass
+        # Test
+        server = StubServer(body=b'{"test": "data"}').start()
+        agent = phttp.PassiveAgent(
+            'program', 'identifier', server.url('/data'), timeout=0.5)
+        self.assertEqual(agent.get(), {'test': 'data'})
+
+        # The same invalid JSON is a failure every time, not unchanged data
+        server.body = b'{"test": '
+        self.assertEqual(agent.get(), {})
+        self.assertEqual(agent.get(), {})
+        result = agent.stats()
+        self.assertEqual(result.failures, 2)
+        self.assertEqual(result.skipped, 0)
+
+        # Slow passive agents time out
+        server.delay = 2
+        start = time()
+        self.assertEqual(agent.get(), {})
+        self.assertTrue(time() - start < 2)
+        server.stop()
+
+    def test_stats(self):
+        """Testing method or function named stats."""
+        # Initialize key variables
+        server = StubServer(body=b'{"test": "data"}').start()
+        agent = phttp.PassiveAgent(
+            'program', 'identifier', server.url('/data'), timeout=0.5)
+        self.assertEqual(
+            agent.stats(), phttp.LatencyStats(0, 0, None, None, 0, 0))
+
+        # Test
+        agent.get()
+        server.body = b'invalid'
+        agent.get()
+        result = agent.stats()
+        self.assertEqual(result.polls, 2)
+        self.assertEqual(result.failures, 1)
+        self.assertEqual(result.skipped, 0)
+        self.assertTrue(0 < result.last <= result.maximum)
+        self.assertTrue(0 < result.mean <= result.maximum)
+        server.stop()
+
+
+class TestPassiveAgentPool(unittest.TestCase):
+    """Checks all functions and methods."""
+
+    #########################################################################
+    # General object setup
+    #########################################################################
+
+    def test___init__(self):
+        """Testing method or function named __init__."""
+        # Test
+        pool = phttp.PassiveAgentPool([
+            ('program', 'identifier_1', 'http://test_1'),
+            ('program', 'identifier_2', 'http://test_2', 1)])
+        self.assertEqual(pool.workers, Config().passive_agent_workers())
+        self.assertEqual(
+            [_._timeout for _ in pool.agents],
+            [Config().passive_agent_timeout(), 1])
+
+    def test_relay(self):
+        """Testing method or function named relay."""
+        # Initialize key variables
+        fast = StubServer(body=b'{"test": "data"}').start()
+        slow = StubServer(body=b'{"test": "data"}', delay=2).start()
+        sources = [
+            ('program', 'slow', slow.url('/data'), 0.5)]
+        sources.extend([
+            ('program', 'fast_{}'.format(_), fast.url('/data'))
+            for _ in range(5)])
+        pool = phttp.PassiveAgentPool(sources, workers=3)
+
+        # The slow passive agent doesn't delay the others
+        start = time()
+        with patch(
+                'pattoo_shared.phttp.Post.post', return_value=False) as (
+                    mock_post):
+            pool.relay()
+            self.assertEqual(mock_post.call_count, 5)
+        self.assertTrue(time() - start < 2)
+
+        # Errors are logged
+        with patch(
+                'pattoo_shared.phttp.PassiveAgent.relay',
+                side_effect=ValueError()):
+            pool.relay()
+        fast.stop()
+        slow.stop()
+
+    def test_stats(self):
+        """Testing method or function named stats."""
+        # Test
+        server = StubServer(body=b'{}').start()
+        pool = phttp.PassiveAgentPool([
+            ('program', 'identifier_{}'.format(_), server.url('/data'))
+            for _ in range(2)])
+        pool.relay()
+        result = pool.stats()
+        self.assertEqual(sorted(result.keys()), [
+            'identifier_0', 'identifier_1'])
+        for item in result.values():
+            self.assertEqual(item.polls, 1)
+            self.assertEqual(item.failures, 0)
+        server.stop()
+
+
+class TestPostBatch(unittest.TestCase):
+    """Checks all functions and methods."""
+
+    # Create agent data
+    agentdata = ta.test_agent()
+
+    def setUp(self):
+        """Start each test with closed circuit breakers."""
+        # Reset
+        phttp.BREAKERS.clear()
+
+    def _cached(self, agent_id):
+        """Create a previously cached post for an identifier."""
+        agentdata = ta.test_agent()
+        agentdata.agent_id = agent_id
+        result = json.loads(json.dumps(converter.posting_data_points(
+            converter.agentdata_to_post(agentdata))))
+        return result
+
+    def test___init__(self):
+        """Testing method or function named __init__."""
+        # Initialize
+        cached = self._cached('test_batch_agent')
+        batch = phttp.PostBatch([self.agentdata, cached, None])
+
+        # Test
+        self.assertEqual(
+            batch._url, 'http://127.0.0.6:50505/pattoo/api/v1/agent/batch')
+        self.assertEqual(len(batch._data), 2)
+        self.assertEqual(
+            batch._identifier,
+            sorted([self.agentdata.agent_id, 'test_batch_agent']))
+
+    def test_post(self):
+        """Testing method or function named post."""
+        # Initialize
+        cached = self._cached(data.hashstring(str(time())))
+        batch = phttp.PostBatch([self.agentdata, cached])
+
+        # Test
+        with requests_mock.Mocker() as m:
+            m.post(batch._url, status_code=200)
+            success = batch.post()
+            self.assertTrue(success)
+            self.assertEqual(m.call_count, 1)
+
+            # One request body contains both posts
+            posts = converter.batch_to_posts(m.last_request.json())
+            self.assertEqual(len(posts), 2)
+            self.assertEqual(
+                converter.cache_to_keypairs(posts[1]),
+                converter.cache_to_keypairs(cached))
+
+        # Each post is cached separately on failure
+        with requests_mock.Mocker() as m:
+            m.post(batch._url, status_code=500)
+            success = batch.post()
+            self.assertFalse(success)
+            for identifier in [
+                    cached['pattoo_agent_id'], self.agentdata.agent_id]:
+                cached_ = list(phttp._read_cached(identifier))
+                self.assertEqual(len(cached_), 1)
+                phttp._remove_cached([cached_[0][0]], 'url')
+
+    def test_purge(self):
+        """Testing method or function named purge."""
+        # Initialize
+        cached = [
+            self._cached(data.hashstring(str(time()))) for _ in range(2)]
+        batch = phttp.PostBatch(cached)
+        urls = {}
+        for item in cached:
+            identifier = item['pattoo_agent_id']
+            urls[identifier] = batch.config.agent_api_server_url(identifier)
+            phttp._save_data(item, identifier)
+
+        # Test
+        with requests_mock.Mocker() as m:
+            for url in urls.values():
+                m.post(url, status_code=200)
+            batch.purge()
+
+            # Each identifier's cache is posted to its own URL
+            self.assertEqual(m.call_count, len(cached))
+            for request in m.request_history:
+                identifier = request.json()['pattoo_agent_id']
+                self.assertEqual(request.url, urls[identifier])
+
+        # The cache of each identifier is empty
+        for identifier in urls:
+            self.assertEqual(list(phttp._read_cached(identifier)), [])
 
 
 class TestEncryptedPostAgent(unittest.TestCase):
@@ -504,6 +1331,12 @@ class TestEncryptedPostAgent(unittest.TestCase):
     symmetric_key = None
     nonce = None
 
+    def setUp(self):
+        """Start each test with closed circuit breakers and no keys."""
+        # Reset
+        phttp.BREAKERS.clear()
+        phttp.SESSIONS.clear()
+
     def test_agent(self):
         """Test agent post and purge"""
 
@@ -654,9 +1487,9 @@ class TestEncryptedPostAgent(unittest.TestCase):
             # Encrypted purge
             encrypted_agent.purge()
             
-            # Check that both the post and purge exchanged keys and
-            # send data
-            self.assertEqual(m.call_count, 8)
+            # Check that keys were only exchanged by the post, and that
+            # the purge reused the key to send data
+            self.assertEqual(m.call_count, 5)
 
 
 class TestBasicFunctions(unittest.TestCase):
@@ -666,6 +1499,11 @@ class TestBasicFunctions(unittest.TestCase):
     # General object setup
     #########################################################################
 
+    def setUp(self):
+        """Start each test with closed circuit breakers."""
+        # Reset
+        phttp.BREAKERS.clear()
+
     def test_post(self):
         """Testing method or function named post."""
         pass
@@ -674,6 +1512,175 @@ class TestBasicFunctions(unittest.TestCase):
         """Testing method or function named purge."""
         pass
 
+    def test__purge_batches(self):
+        """Testing method or function named _purge_batches."""
+        # Initialize key variables
+        identifier = data.hashstring(str(time()))
+        url = Config().agent_api_batch_url()
+        agentdata = ta.test_agent()
+        _data = converter.posting_data_points(
+            converter.agentdata_to_post(agentdata))
+        for _ in range(5):
+            phttp._save_data(_data, identifier)
+        cached = list(phttp._read_cached(identifier))
+        self.assertEqual(len(cached), 5)
+        batch_bytes = cached[0][2] * 2
+
+        # Nothing is deleted if the server fails
+        with requests_mock.Mocker() as m:
+            m.post(url, status_code=500)
+            phttp._purge_batches(
+                url, identifier, batch_bytes, phttp._read_cached(identifier))
+            self.assertEqual(m.call_count, 1)
+            self.assertEqual(list(phttp._read_cached(identifier)), cached)
+
+        # Data is posted in batches of two
+        with requests_mock.Mocker() as m:
+            m.post(url, status_code=200)
+            phttp._purge_batches(
+                url, identifier, batch_bytes, phttp._read_cached(identifier))
+            self.assertEqual(m.call_count, 3)
+            self.assertEqual(list(phttp._read_cached(identifier)), [])
+            counts = [len(_.json()['pattoo_batch']) for _ in m.request_history]
+            self.assertEqual(counts, [2, 2, 1])
+
+    def test_purge_batch_bytes(self):
+        """Testing function purge with cache_purge_batch_bytes set."""
+        # Initialize key variables
+        identifier = data.hashstring(str(time()))
+        config = Config()
+        url = config.agent_api_server_url(identifier)
+        for _ in range(3):
+            phttp._save_data({'test': 'data'}, identifier)
+
+        # Test
+        with patch(
+                'pattoo_shared.phttp.Config.cache_purge_batch_bytes',
+                return_value=1000000):
+            with patch('pattoo_shared.phttp.post_batch') as mock_post:
+                mock_post.return_value = True
+                phttp.purge(url, identifier)
+                mock_post.assert_called_once_with(
+                    config.agent_api_batch_url(),
+                    [{'test': 'data'}] * 3, save=False)
+        self.assertEqual(list(phttp._read_cached(identifier)), [])
+
+    def test__read_cache_files(self):
+        """Testing method or function named _read_cache_files."""
+        # Initialize key variables
+        identifier = data.hashstring(str(time()))
+        expected = []
+        for index in range(20):
+            _save_legacy({'index': index}, identifier, index)
+            expected.append({'index': index})
+        filepaths = phttp._cache_filepaths(identifier)
+        size = os.path.getsize(filepaths[0])
+
+        # Files must be returned in order regardless of the number of
+        # threads or bytes read ahead
+        for (workers, inflight_bytes) in [
+                (1, 0), (4, 0), (4, size * 3), (8, size * 100)]:
+            result = list(phttp._read_cache_files(
+                filepaths, identifier, workers, inflight_bytes))
+            self.assertEqual([_[0] for _ in result], filepaths)
+            self.assertEqual([_[1] for _ in result], expected)
+            self.assertEqual(
+                [_[2] for _ in result],
+                [os.path.getsize(_) for _ in filepaths])
+
+        # Stopping early must not raise errors
+        files = phttp._read_cache_files(filepaths, identifier, 4, size * 3)
+        self.assertEqual(next(files)[1], expected[0])
+        files.close()
+
+        # Corrupted files are deleted and return None
+        with open(filepaths[0], 'w') as f_handle:
+            f_handle.write('{')
+        result = list(phttp._read_cache_files(filepaths, identifier, 4))
+        self.assertIsNone(result[0][1])
+        self.assertFalse(os.path.exists(filepaths[0]))
+        for filepath in filepaths[1:]:
+            os.remove(filepath)
+
+    def test_purge_workers(self):
+        """Testing function purge with cache_purge_workers set."""
+        # Initialize key variables
+        identifier = data.hashstring(str(time()))
+        url = Config().agent_api_server_url(identifier)
+        for index in range(5):
+            _save_legacy({'index': index}, identifier, index)
+        for index in range(5, 10):
+            phttp._save_data({'index': index}, identifier)
+
+        # Test. Posting stops at the first failure to preserve the order
+        with patch(
+                'pattoo_shared.phttp.Config.cache_purge_workers',
+                return_value=4):
+            with requests_mock.Mocker() as m:
+                m.post(url, [
+                    {'status_code': 200}, {'status_code': 200},
+                    {'status_code': 500}])
+                phttp.purge(url, identifier)
+                self.assertEqual(m.call_count, 3)
+                self.assertEqual(
+                    len(list(phttp._read_cached(identifier))), 8)
+
+            # Cache files of older versions are posted before the spool
+            with requests_mock.Mocker() as m:
+                m.post(url, status_code=200)
+                phttp.purge(url, identifier)
+                self.assertEqual(
+                    [_.json() for _ in m.request_history],
+                    [{'index': _} for _ in range(2, 10)])
+                self.assertEqual(list(phttp._read_cached(identifier)), [])
+
+    def test__remove_cache_files(self):
+        """Testing method or function named _remove_cache_files."""
+        # Initialize key variables
+        identifier = data.hashstring(str(time()))
+        for index in range(3):
+            _save_legacy({'test': 'data'}, identifier, index)
+        filepaths = phttp._cache_filepaths(identifier)
+        journal = phttp._journal_filepath(os.path.dirname(filepaths[0]))
+
+        # Test
+        phttp._remove_cache_files(filepaths[:2], 'url')
+        self.assertEqual(phttp._cache_filepaths(identifier), filepaths[2:])
+        self.assertFalse(os.path.exists(journal))
+
+        # Simulate an interrupted deletion. The journal must be completed
+        with open(journal, 'w') as f_handle:
+            f_handle.write(filepaths[2])
+        self.assertEqual(phttp._cache_filepaths(identifier), [])
+        self.assertFalse(os.path.exists(journal))
+
+    def test__cache_filepaths(self):
+        """Testing method or function named _cache_filepaths."""
+        # Initialize key variables
+        identifier = data.hashstring(str(time()))
+        for index in range(3):
+            _save_legacy({'index': index}, identifier, index)
+        cache_dir = Config().agent_cache_directory(identifier)
+
+        # Test. The directory is only listed to create the manifest
+        filepaths = phttp._cache_filepaths(identifier)
+        with patch('pattoo_shared.phttp.os.listdir') as mock_listdir:
+            self.assertEqual(phttp._cache_filepaths(identifier), filepaths)
+            self.assertFalse(mock_listdir.called)
+        self.assertEqual(len(filepaths), 3)
+        self.assertEqual(filepaths, sorted(filepaths))
+        for filepath in filepaths:
+            self.assertEqual(os.path.dirname(filepath), cache_dir)
+            self.assertTrue(os.path.isfile(filepath))
+
+        # Files deleted elsewhere are skipped and dropped from the manifest
+        os.remove(filepaths[0])
+        self.assertIsNone(phttp._read_cache_file(filepaths[0], identifier))
+        self.assertEqual(phttp._cache_filepaths(identifier), filepaths[1:])
+        for filepath in filepaths[1:]:
+            phttp._remove_cache_file(filepath, 'url')
+        self.assertEqual(phttp._cache_filepaths(identifier), [])
+
     def test__save_data(self):
         """Testing method or function named _save_data."""
         # Initialize key variables
@@ -689,6 +1696,328 @@ class TestBasicFunctions(unittest.TestCase):
         success = phttp._save_data(_data, identifier)
         self.assertTrue(success)
 
+        # Data is appended to the spool, not to separate files
+        self.assertEqual(phttp._cache_filepaths(identifier), [])
+        self.assertEqual(
+            [_[1] for _ in phttp._read_cached(identifier)],
+            [{'Test': 'data'}, ''])
+
+        # Data that doesn't fit within the budget of the cache is discarded
+        with patch(
+                'pattoo_shared.phttp.Config.cache_max_records',
+                return_value=2), patch(
+                    'pattoo_shared.phttp.Config.cache_eviction_policy',
+                    return_value='drop_newest'):
+            success = phttp._save_data({'Test': 'data'}, identifier)
+        self.assertFalse(success)
+        self.assertEqual(len(list(phttp._read_cached(identifier))), 2)
+        phttp._spool(identifier)
+
+        # Test failure
+        with patch(
+                'pattoo_shared.phttp.cache.Spool.append',
+                side_effect=OSError('No space left on device')):
+            success = phttp._save_data({'Test': 'data'}, identifier)
+        self.assertFalse(success)
+
+    def test__read_cached(self):
+        """Testing method or function named _read_cached."""
+        # Initialize key variables
+        identifier = data.hashstring(str(time()))
+        filepath = _save_legacy({'index': 0}, identifier, 0)
+        phttp._save_data({'index': 1}, identifier)
+
+        # Test
+        result = list(phttp._read_cached(identifier))
+        self.assertEqual(len(result), 2)
+        self.assertEqual(result[0][0], filepath)
+        self.assertTrue(isinstance(result[1][0], cache.Position))
+        self.assertEqual([_[1] for _ in result], [{'index': 0}, {'index': 1}])
+        phttp._remove_cached([_[0] for _ in result], 'url')
+
+    def test__remove_cached(self):
+        """Testing method or function named _remove_cached."""
+        # Initialize key variables
+        identifier = data.hashstring(str(time()))
+        for index in range(2):
+            _save_legacy({'index': index}, identifier, index)
+        for index in range(2, 5):
+            phttp._save_data({'index': index}, identifier)
+        entries = [_[0] for _ in phttp._read_cached(identifier)]
+
+        # Test
+        phttp._remove_cached(entries[:1], 'url')
+        phttp._remove_cached(entries[1:3], 'url')
+        self.assertEqual(
+            [_[1] for _ in phttp._read_cached(identifier)],
+            [{'index': 3}, {'index': 4}])
+        phttp._remove_cached(entries[3:], 'url')
+        self.assertEqual(list(phttp._read_cached(identifier)), [])
+        self.assertFalse(os.path.exists(entries[0]))
+        self.assertFalse(os.path.exists(entries[1]))
+
+    def test__spool(self):
+        """Testing method or function named _spool."""
+        # Initialize key variables
+        identifier = data.hashstring(str(time()))
+        config = Config()
+
+        # Test
+        result = phttp._spool(identifier)
+        self.assertTrue(isinstance(result, cache.Spool))
+        self.assertEqual(
+            result.directory, os.path.join(
+                config.agent_cache_directory(identifier), 'spool'))
+        self.assertEqual(result.segment_bytes, config.cache_segment_bytes())
+
+    def test_compress(self):
+        """Testing method or function named compress."""
+        # Initialize
+        agentdata = ta.test_agent()
+        _data = converter.posting_data_points(
+            converter.agentdata_to_post(agentdata))
+        body = json.dumps(_data).encode()
+
+        # Test
+        for encoding in ['gzip', 'deflate']:
+            (result, headers) = phttp.compress(body, encoding)
+            self.assertEqual(headers, {'Content-Encoding': encoding})
+            self.assertTrue(len(result) < len(body))
+            self.assertEqual(phttp.decompress(result, encoding), body)
+
+    def test_compress_chunks(self):
+        """Testing method or function named compress_chunks."""
+        # Initialize key variables
+        body = json.dumps([data.hashstring(str(_)) for _ in range(100)])
+        chunks = [body[_:_ + 100].encode() for _ in range(0, len(body), 100)]
+
+        # Test
+        for encoding in ['gzip', 'deflate']:
+            result = b''.join(phttp.compress_chunks(chunks, encoding))
+            self.assertTrue(len(result) < len(body))
+            self.assertEqual(
+                phttp.decompress(result, encoding), body.encode())
+
+    def test_decompress(self):
+        """Testing method or function named decompress."""
+        # Unknown encodings are returned unchanged
+        body = b'test'
+        self.assertEqual(phttp.decompress(body, None), body)
+        self.assertEqual(phttp.decompress(body, 'identity'), body)
+
+    def test_post_delta(self):
+        """Testing method or function named post_delta."""
+        # Initialize key variables
+        identifier = data.hashstring(str(time()))
+        url = 'http://127.0.0.6:50505/pattoo/api/v1/agent/delta'
+        _data = converter.posting_data_points(
+            converter.agentdata_to_post(ta.test_agent()))
+        decoder = converter.DeltaDecoder()
+        requests_received = []
+
+        def callback(request, context):
+            """Decode posts like the pattoo server."""
+            requests_received.append(request.json())
+            result = decoder.decode(request.json())
+            context.status_code = 409 if result is None else 200
+            return ''
+
+        with requests_mock.Mocker() as m_object:
+            m_object.post(url, text=callback)
+
+            # Only the first post sends the key-value pairs
+            for _ in range(2):
+                success = phttp.post_delta(url, _data, identifier)
+                self.assertTrue(success)
+            self.assertTrue(
+                bool(requests_received[0]['pattoo_key_value_pairs']))
+            self.assertEqual(
+                requests_received[1]['pattoo_key_value_pairs'], {})
+
+            # A new session is started when the server forgets the old one
+            decoder = converter.DeltaDecoder()
+            success = phttp.post_delta(url, _data, identifier)
+            self.assertTrue(success)
+            self.assertEqual(m_object.call_count, 4)
+            self.assertEqual(
+                requests_received[3]['pattoo_key_value_pairs'],
+                requests_received[0]['pattoo_key_value_pairs'])
+            self.assertNotEqual(
+                requests_received[3]['pattoo_session'],
+                requests_received[0]['pattoo_session'])
+
+        # Failed posts are cached without delta encoding
+        with requests_mock.Mocker() as m_object:
+            m_object.post(url, status_code=500)
+            success = phttp.post_delta(url, _data, identifier)
+            self.assertFalse(success)
+        self.assertEqual(
+            [_[1] for _ in phttp._read_cached(identifier)],
+            [json.loads(json.dumps(_data))])
+
+    def test_post_delta_invalid(self):
+        """Testing method or function named post_delta with invalid data."""
+        # Initialize key variables
+        identifier = data.hashstring(str(time()))
+        url = 'http://127.0.0.6:50505/pattoo/api/v1/agent/delta'
+        receive_url = 'http://127.0.0.6:50505/pattoo/api/v1/agent/receive/1'
+        _breaker = phttp.breaker(url)
+        for _ in range(_breaker.threshold):
+            _breaker.failure()
+        _breaker.retry = time() - 1
+
+        # Invalid data doesn't use up the post that tests the server
+        with requests_mock.Mocker() as m_object:
+            m_object.post(url, status_code=200)
+            m_object.post(receive_url, status_code=200)
+            success = phttp.post_delta(
+                url, {'Test': 'data'}, identifier, save=False)
+            self.assertFalse(success)
+            self.assertEqual(m_object.call_count, 0)
+            self.assertEqual(_breaker.state, phttp.OPEN)
+
+            # Valid posts still reach the server
+            success = phttp.post(
+                receive_url, {'Test': 'data'}, identifier, save=False)
+            self.assertTrue(success)
+            self.assertEqual(m_object.call_count, 1)
+        self.assertEqual(_breaker.state, phttp.CLOSED)
+
+    def test__encoder(self):
+        """Testing method or function named _encoder."""
+        # The same object must be returned every time
+        url = 'http://127.0.0.6:50505/pattoo/api/v1/agent/delta'
+        result = phttp._encoder(url, 'agent_1')
+        self.assertTrue(isinstance(result, converter.DeltaEncoder))
+        self.assertEqual(id(result), id(phttp._encoder(url, 'agent_1')))
+        self.assertNotEqual(id(result), id(phttp._encoder(url, 'agent_2')))
+
+    def test_breaker(self):
+        """Testing method or function named breaker."""
+        # Servers are identified by scheme and network location
+        result = phttp.breaker('http://127.0.0.6:50505/pattoo/api/v1/agent')
+        self.assertTrue(isinstance(result, phttp.CircuitBreaker))
+        self.assertEqual(result.server, 'http://127.0.0.6:50505')
+        self.assertEqual(
+            id(result), id(phttp.breaker('http://127.0.0.6:50505/other')))
+        self.assertNotEqual(
+            id(result), id(phttp.breaker('https://127.0.0.6:50505/other')))
+
+    def test_encrypted_session(self):
+        """Testing method or function named encrypted_session."""
+        # Test
+        phttp.SESSIONS.clear()
+        gpg = set_gnupg('test_agent0', Config(), 'test_agent0@example.org')
+        result = phttp.encrypted_session(gpg, 'http://a/key', 'http://a/val')
+        self.assertTrue(isinstance(result, phttp.EncryptedSession))
+        self.assertIs(
+            phttp.encrypted_session(gpg, 'http://a/key', 'http://a/val'),
+            result)
+        self.assertIsNot(
+            phttp.encrypted_session(gpg, 'http://b/key', 'http://b/val'),
+            result)
+
+    def test__update(self):
+        """Testing method or function named _update."""
+        # Test
+        _breaker = phttp.breaker('http://127.0.0.6:50505')
+        phttp._update(_breaker, 500)
+        self.assertEqual(_breaker.failures, 1)
+        phttp._update(_breaker, 404)
+        self.assertEqual(_breaker.failures, 0)
+
+    def test__skip(self):
+        """Testing method or function named _skip."""
+        # Initialize
+        url = 'http://127.0.0.6:50505/pattoo/api/v1/agent/receive/skip'
+        identifier = data.hashstring(str(time()))
+
+        # Test
+        with patch('pattoo_shared.phttp.log.log2debug') as mock_log:
+            phttp._skip(url, identifier)
+            mock_log.assert_called_once()
+            (code, log_message) = mock_log.call_args[0]
+            self.assertEqual(code, 1113)
+            self.assertIn(url, log_message)
+            self.assertIn(identifier, log_message)
+
+    def test_post_open_circuit(self):
+        """Testing method or function named post with an open breaker."""
+        # Initialize key variables
+        identifier = data.hashstring(str(time()))
+        url = 'http://127.0.0.6:50505/pattoo/api/v1/agent/receive/123'
+        _breaker = phttp.breaker(url)
+        for _ in range(_breaker.threshold):
+            _breaker.failure()
+
+        # Data is cached without contacting the server
+        with requests_mock.Mocker() as m_object:
+            m_object.post(url, status_code=200)
+            success = phttp.post(url, {'Test': 'data'}, identifier)
+            self.assertEqual(m_object.call_count, 0)
+        self.assertFalse(success)
+        self.assertEqual(
+            [_[1] for _ in phttp._read_cached(identifier)],
+            [{'Test': 'data'}])
+
+        # Purging waits for the delay to pass
+        with requests_mock.Mocker() as m_object:
+            m_object.post(url, status_code=200)
+            phttp.purge(url, identifier)
+            self.assertEqual(m_object.call_count, 0)
+
+            # The server is tested once the delay has passed
+            _breaker.retry = time() - 1
+            phttp.purge(url, identifier)
+            self.assertEqual(m_object.call_count, 1)
+        self.assertEqual(_breaker.state, phttp.CLOSED)
+        self.assertEqual(list(phttp._read_cached(identifier)), [])
+
+    def test_encrypted_post(self):
+        """Testing method or function named encrypted_post."""
+        # Initialize key variables
+        identifier = data.hashstring(str(time()))
+        url = 'http://127.0.0.6:50505/pattoo/api/v1/agent/encrypted'
+        gpg = set_gnupg('test_agent0', Config(), 'test_agent0@example.org')
+        _transport = phttp.transport()
+        ciphers = ['gnupg']
+        if cipher.available() is True:
+            ciphers.append('aesgcm')
+
+        # Data encrypted by each cipher can be decrypted
+        for name in ciphers:
+            _transport.encryption_cipher = name
+            with requests_mock.Mocker() as m_object:
+                m_object.post(url, status_code=202)
+                success = phttp.encrypted_post(
+                    gpg, 'key', phttp.transport().session, url,
+                    {'Test': 'data'}, identifier)
+                body = json.loads(json.loads(m_object.last_request.body))
+            self.assertTrue(success)
+            self.assertEqual(
+                body['encrypted_data'].startswith(cipher.PREFIX),
+                name == 'aesgcm')
+            self.assertEqual(
+                json.loads(gpg.symmetric_decrypt(
+                    body['encrypted_data'], 'key')),
+                {'data': {'Test': 'data'}, 'source': identifier})
+        _transport.encryption_cipher = Config().http_encryption_cipher()
+
+        # The status code can be returned
+        with requests_mock.Mocker() as m_object:
+            m_object.post(url, status_code=409)
+            result = phttp.encrypted_post(
+                gpg, 'key', phttp.transport().session, url,
+                {'Test': 'data'}, identifier, save=False, status=True)
+        self.assertEqual(result, 409)
+
+    def test_transport(self):
+        """Testing method or function named transport."""
+        # The same object must be returned every time
+        result = phttp.transport()
+        self.assertTrue(isinstance(result, phttp.Transport))
+        self.assertEqual(id(result), id(phttp.transport()))
+
     def test__log(self):
         """Testing method or function named _log."""
         pass